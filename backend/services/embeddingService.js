@@ -4,7 +4,7 @@ import { RecursiveCharacterTextSplitter, preprocessText, parseTableStructure, co
 import { generateEmbeddingsBatch, storeEmbeddings } from '../utils/embeddings.js';
 import { extractAndCaptionImages, cleanupImageFiles } from '../utils/imageExtractor.js';
 import { extractTextWithPageBoundaries } from '../utils/documentProcessor.js';
-import { smartChunk, getOptimalChunkingParams } from '../utils/pythonChunker.js';
+import { smartChunk, getOptimalChunkingParams, ingestWithPythonService } from '../utils/pythonChunker.js';
 
 /**
  * Generate and store embeddings for a document (IMPROVED VERSION)
@@ -26,79 +26,25 @@ export async function generateDocumentEmbeddings(documentId, userId, rawText) {
         const document = await Document.findById(documentId);
         const documentType = path.extname(document.fileName).substring(1).toLowerCase();
 
-        // IMPROVEMENT 1: Extract text with correct page/slide boundaries
-        const pageTexts = await extractTextWithPageBoundaries(
-            document.filePath,
-            documentType,
-            rawText
-        );
-
-        console.log(`   📊 Extracted ${pageTexts.length} ${pageTexts[0]?.pageType || 'page'}s`);
-
-        // IMPROVEMENT 2: Process each page/slide with semantic chunking
         const allChunksWithPages = [];
 
-        for (const pageData of pageTexts) {
-            const cleanedText = preprocessText(pageData.text);
-
-            if (!cleanedText || cleanedText.length < 50) {
-                console.log(`   ⏭️  Skipping ${pageData.pageType} ${pageData.pageNumber} (too short)`);
-                continue;
-            }
-
-            // IMPROVEMENT 3: Use multi-strategy chunking with Python service (with fallback)
-            const chunkParams = getChunkingParams(documentType);
-            const splitter = new RecursiveCharacterTextSplitter(chunkParams);
-
-            // Try Python multi-strategy chunking first, fallback to Node.js if unavailable
-            let pageChunksWithOffsets;
-            try {
-                pageChunksWithOffsets = await smartChunk(cleanedText, documentType, splitter);
-            } catch (error) {
-                console.warn(`   ⚠️  Chunking error, using Node.js fallback: ${error.message}`);
-                pageChunksWithOffsets = splitter.splitTextWithOffsets(cleanedText);
-            }
-
-            console.log(`   📄 ${pageData.pageType} ${pageData.pageNumber}: ${pageChunksWithOffsets.length} chunks`);
-
-            // Add page metadata to each chunk
-            pageChunksWithOffsets.forEach((chunkData) => {
-                // 🎯 PHASE 2: Check if chunk contains a table
-                let chunkType = 'text';
-                let tableStructure = null;
-                let finalText = chunkData.text;
-
-                if (containsTable(chunkData.text)) {
-                    const parsed = parseTableStructure(chunkData.text);
-                    if (parsed.structured) {
-                        chunkType = 'table';
-                        tableStructure = {
-                            headers: parsed.headers,
-                            data: parsed.data,
-                            rowCount: parsed.rowCount,
-                            columnCount: parsed.columnCount,
-                            format: parsed.format
-                        };
-                        // Use searchable text for embedding
-                        finalText = parsed.searchableText;
-                        console.log(`      📊 Table detected: ${parsed.rowCount}x${parsed.columnCount}`);
-                    }
-                }
-
-                allChunksWithPages.push({
-                    text: finalText,
-                    pageNumber: pageData.pageNumber,
-                    pageType: pageData.pageType,
-                    chunkIndex: allChunksWithPages.length,
-                    chunkType,
-                    // 🎯 PHASE 2: Store character offsets
-                    startOffset: chunkData.startOffset,
-                    endOffset: chunkData.endOffset,
-                    lineRange: chunkData.lineRange,
-                    // 🎯 PHASE 2: Store table structure if applicable
-                    tableStructure
-                });
+        // Extract (with OCR fallback) and chunk in a single Python service call;
+        // the document text never leaves the service
+        const ingestParams = getOptimalChunkingParams(documentType);
+        const ingestedChunks = document.filePath
+            ? await ingestWithPythonService(document.filePath, documentType, ingestParams.chunkSize, ingestParams.chunkOverlap)
+            : null;
+
+        if (ingestedChunks && ingestedChunks.length > 0) {
+            const pageType = documentType === 'pptx' ? 'slide' : documentType === 'docx' ? 'section' : 'page';
+            ingestedChunks.forEach((chunkData) => {
+                // DOCX has no pages: number ~500-word logical sections (~3000 characters) like extractDOCXPages
+                const pageNumber = chunkData.pageNumber ?? Math.floor(chunkData.startOffset / 3000) + 1;
+                addChunk(allChunksWithPages, chunkData, pageNumber, pageType);
             });
+            console.log(`   📄 Ingested ${ingestedChunks.length} chunks`);
+        } else {
+            await chunkPages(allChunksWithPages, document, documentType, rawText);
         }
 
         console.log(`   📊 Total text chunks: ${allChunksWithPages.length}`);
@@ -153,6 +99,92 @@ export async function generateDocumentEmbeddings(documentId, userId, rawText) {
     }
 }
 
+/**
+ * Extract text with page/slide boundaries in Node and chunk each page
+ * (fallback when the Python /ingest endpoint is unavailable)
+ */
+async function chunkPages(allChunksWithPages, document, documentType, rawText) {
+    // IMPROVEMENT 1: Extract text with correct page/slide boundaries
+    const pageTexts = await extractTextWithPageBoundaries(
+        document.filePath,
+        documentType,
+        rawText
+    );
+
+    console.log(`   📊 Extracted ${pageTexts.length} ${pageTexts[0]?.pageType || 'page'}s`);
+
+    // IMPROVEMENT 2: Process each page/slide with semantic chunking
+    for (const pageData of pageTexts) {
+        const cleanedText = preprocessText(pageData.text);
+
+        if (!cleanedText || cleanedText.length < 50) {
+            console.log(`   ⏭️  Skipping ${pageData.pageType} ${pageData.pageNumber} (too short)`);
+            continue;
+        }
+
+        // IMPROVEMENT 3: Use multi-strategy chunking with Python service (with fallback)
+        const chunkParams = getChunkingParams(documentType);
+        const splitter = new RecursiveCharacterTextSplitter(chunkParams);
+
+        // Try Python multi-strategy chunking first, fallback to Node.js if unavailable
+        let pageChunksWithOffsets;
+        try {
+            pageChunksWithOffsets = await smartChunk(cleanedText, documentType, splitter);
+        } catch (error) {
+            console.warn(`   ⚠️  Chunking error, using Node.js fallback: ${error.message}`);
+            pageChunksWithOffsets = splitter.splitTextWithOffsets(cleanedText);
+        }
+
+        console.log(`   📄 ${pageData.pageType} ${pageData.pageNumber}: ${pageChunksWithOffsets.length} chunks`);
+
+        // Add page metadata to each chunk
+        pageChunksWithOffsets.forEach((chunkData) => {
+            addChunk(allChunksWithPages, chunkData, pageData.pageNumber, pageData.pageType);
+        });
+    }
+}
+
+/**
+ * Append a chunk with its page metadata, parsing it as a table when it contains one
+ */
+function addChunk(allChunksWithPages, chunkData, pageNumber, pageType) {
+    // 🎯 PHASE 2: Check if chunk contains a table
+    let chunkType = 'text';
+    let tableStructure = null;
+    let finalText = chunkData.text;
+
+    if (containsTable(chunkData.text)) {
+        const parsed = parseTableStructure(chunkData.text);
+        if (parsed.structured) {
+            chunkType = 'table';
+            tableStructure = {
+                headers: parsed.headers,
+                data: parsed.data,
+                rowCount: parsed.rowCount,
+                columnCount: parsed.columnCount,
+                format: parsed.format
+            };
+            // Use searchable text for embedding
+            finalText = parsed.searchableText;
+            console.log(`      📊 Table detected: ${parsed.rowCount}x${parsed.columnCount}`);
+        }
+    }
+
+    allChunksWithPages.push({
+        text: finalText,
+        pageNumber,
+        pageType,
+        chunkIndex: allChunksWithPages.length,
+        chunkType,
+        // 🎯 PHASE 2: Store character offsets
+        startOffset: chunkData.startOffset,
+        endOffset: chunkData.endOffset,
+        lineRange: chunkData.lineRange,
+        // 🎯 PHASE 2: Store table structure if applicable
+        tableStructure
+    });
+}
+
 /**
  * Get optimal chunking parameters for each document type
  * Different formats need different chunking strategies
@@ -1,4 +1,5 @@
 import { OpenAI } from 'openai';
+import axios from 'axios';
 import mongoose from 'mongoose';
 import Embedding from '../models/Embedding.js';
 import { crossEncoderRerank, llmBasedRerank, hybridRerank } from './reranker.js';
@@ -15,6 +16,40 @@ function getOpenAIClient() {
     return openaiClient;
 }
 
+// 'local' embeds with the Python service's offline model (/embed) instead of OpenAI.
+// Its vectors have a different dimension: re-embed existing documents after switching.
+const EMBEDDING_PROVIDER = process.env.EMBEDDING_PROVIDER || 'openai';
+const PYTHON_SERVICE_URL = process.env.PYTHON_SERVICE_URL || 'http://localhost:8000';
+// Texts per /embed request; keep at or below the service's own EMBEDDING_MAX_TEXTS
+const LOCAL_EMBEDDING_MAX_TEXTS = Math.max(1, parseInt(process.env.EMBEDDING_MAX_TEXTS, 10) || 2048);
+
+/**
+ * Embed texts with the Python service's local model
+ * @param {Array<string>} texts - Texts to embed
+ * @returns {Promise<Array<Array<number>>>} One unit-length vector per text
+ */
+async function generateLocalEmbeddings(texts) {
+    const response = await axios.post(
+        `${PYTHON_SERVICE_URL}/embed`,
+        { texts, normalize: true, format: 'binary' },
+        { responseType: 'arraybuffer', timeout: 120000 }
+    );
+
+    // count x dim little-endian float32 values, row-major
+    const count = Number(response.headers['x-embedding-count']);
+    const dim = Number(response.headers['x-embedding-dim']);
+    const buffer = Buffer.from(response.data);
+    const vectors = [];
+    for (let i = 0; i < count; i++) {
+        const row = new Array(dim);
+        for (let j = 0; j < dim; j++) {
+            row[j] = buffer.readFloatLE((i * dim + j) * 4);
+        }
+        vectors.push(row);
+    }
+    return vectors;
+}
+
 /**
  * Generate embedding for a single text chunk using OpenAI
  * @param {string} text - The text to embed
@@ -22,6 +57,11 @@ function getOpenAIClient() {
  */
 export async function generateEmbedding(text) {
     try {
+        if (EMBEDDING_PROVIDER === 'local') {
+            const [embedding] = await generateLocalEmbeddings([text.substring(0, 8000)]);
+            return embedding;
+        }
+
         const openai = getOpenAIClient();
         const response = await openai.embeddings.create({
             model: 'text-embedding-3-small', // 1536 dimensions, cheaper and faster
@@ -42,6 +82,18 @@ export async function generateEmbedding(text) {
  */
 export async function generateEmbeddingsBatch(texts) {
     try {
+        if (EMBEDDING_PROVIDER === 'local') {
+            // The service micro-batches on its side but rejects requests over its text limit,
+            // so send requests of at most that many texts, one after another
+            const localEmbeddings = [];
+            for (let i = 0; i < texts.length; i += LOCAL_EMBEDDING_MAX_TEXTS) {
+                const batch = texts.slice(i, i + LOCAL_EMBEDDING_MAX_TEXTS);
+                const embeddings = await generateLocalEmbeddings(batch.map(text => text.substring(0, 8000)));
+                localEmbeddings.push(...embeddings);
+            }
+            return localEmbeddings;
+        }
+
         const openai = getOpenAIClient();
         // OpenAI allows up to 2048 inputs per request
         const batchSize = 100;
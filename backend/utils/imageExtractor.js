@@ -19,22 +19,50 @@ function getOpenAIClient() {
     return openaiClient;
 }
 
+function getPythonServiceUrl() {
+    return process.env.PYTHON_SERVICE_URL || 'http://localhost:8000';
+}
+
+/**
+ * Load an extracted image from the Python service's artifact store,
+ * falling back to its local path for older service versions
+ * @param {Object} image - Image record from /extract-images
+ * @returns {Promise<Buffer|null>} Image bytes, or null if it is gone
+ */
+async function readExtractedImage(image) {
+    if (image.url) {
+        const axios = (await import('axios')).default;
+        try {
+            const response = await axios.get(`${getPythonServiceUrl()}${image.url}`, {
+                responseType: 'arraybuffer',
+                timeout: 30000
+            });
+            return Buffer.from(response.data);
+        } catch (error) {
+            console.error(`Error fetching image ${image.artifactId}:`, error.message);
+            return null;
+        }
+    }
+    return fs.existsSync(image.imagePath) ? fs.readFileSync(image.imagePath) : null;
+}
+
 /**
  * Generate caption for an image using GPT-4 Vision
- * @param {string} imagePath - Path to the image file
+ * @param {string|Buffer} image - Path to the image file, or its bytes
  * @param {number} pageNumber - Page number where image was found
  * @param {string} documentType - Type of document (pdf, pptx, etc.)
+ * @param {string} format - Image format when passing bytes (png, jpg, webp)
  * @returns {Promise<string>} Generated caption
  */
-export async function generateImageCaption(imagePath, pageNumber, documentType = 'pdf') {
+export async function generateImageCaption(image, pageNumber, documentType = 'pdf', format = null) {
     try {
         const openai = getOpenAIClient();
 
         // Read image and convert to base64
-        const imageBuffer = fs.readFileSync(imagePath);
+        const imageBuffer = Buffer.isBuffer(image) ? image : fs.readFileSync(image);
         const base64Image = imageBuffer.toString('base64');
-        const ext = path.extname(imagePath).toLowerCase().substring(1);
-        const mimeType = ext === 'png' ? 'image/png' : ext === 'jpg' || ext === 'jpeg' ? 'image/jpeg' : 'image/png';
+        const ext = format || (Buffer.isBuffer(image) ? 'png' : path.extname(image).toLowerCase().substring(1));
+        const mimeType = ext === 'jpg' || ext === 'jpeg' ? 'image/jpeg' : ext === 'webp' ? 'image/webp' : 'image/png';
 
         const citationType = documentType === 'pptx' ? 'slide' : 'page';
 
@@ -85,12 +113,12 @@ export async function generateImageCaption(imagePath, pageNumber, documentType =
 /**
  * Request Python service to extract images from PDF
  * @param {string} pdfPath - Path to the PDF file
- * @returns {Promise<Array>} Array of {imagePath, pageNumber}
+ * @returns {Promise<Array>} Array of {url, artifactId, imagePath, pageNumber, format}
  */
 export async function extractImagesFromPDF(pdfPath) {
     try {
         // Check if Python service is available
-        const pythonServiceUrl = process.env.PYTHON_SERVICE_URL || 'http://localhost:8000';
+        const pythonServiceUrl = getPythonServiceUrl();
 
         const FormData = (await import('form-data')).default;
         const axios = (await import('axios')).default;
@@ -149,9 +177,11 @@ export async function extractAndCaptionImages(documentPath, documentType) {
         // Generate captions for each image
         const captionedImages = [];
 
-        for (const { imagePath, pageNumber } of extractedImages) {
-            if (fs.existsSync(imagePath)) {
-                const caption = await generateImageCaption(imagePath, pageNumber, documentType);
+        for (const image of extractedImages) {
+            const { imagePath, pageNumber, format } = image;
+            const imageBuffer = await readExtractedImage(image);
+            if (imageBuffer) {
+                const caption = await generateImageCaption(imageBuffer, pageNumber, documentType, format);
 
                 captionedImages.push({
                     caption,
@@ -5,6 +5,8 @@
 
 import axios from 'axios';
 import dotenv from 'dotenv';
+import FormData from 'form-data';
+import fs from 'fs';
 
 dotenv.config();
 
@@ -17,9 +19,10 @@ const PYTHON_SERVICE_URL = process.env.PYTHON_SERVICE_URL || 'http://localhost:8
  * @param {string} fileType - Document type ('pdf', 'docx', 'pptx')
  * @param {number} chunkSize - Target chunk size in tokens (default: 800)
  * @param {number} chunkOverlap - Overlap between chunks in tokens (default: 100)
+ * @param {Array|null} blocks - Block stream from /extract/*?blocks=true for this text (optional)
  * @returns {Promise<Array>} Array of chunk objects with text, offsets, and metadata
  */
-export async function chunkWithPythonService(text, fileType, chunkSize = 800, chunkOverlap = 100) {
+export async function chunkWithPythonService(text, fileType, chunkSize = 800, chunkOverlap = 100, blocks = null) {
     try {
         console.log(`\n🐍 Calling Python chunking service for ${fileType.toUpperCase()}...`);
         console.log(`   Parameters: chunk_size=${chunkSize}, chunk_overlap=${chunkOverlap}`);
@@ -31,7 +34,8 @@ export async function chunkWithPythonService(text, fileType, chunkSize = 800, ch
                 text,
                 file_type: fileType,
                 chunk_size: chunkSize,
-                chunk_overlap: chunkOverlap
+                chunk_overlap: chunkOverlap,
+                ...(blocks ? { blocks } : {})
             },
             {
                 timeout: 60000, // 60 second timeout for large documents
@@ -78,6 +82,69 @@ export async function chunkWithPythonService(text, fileType, chunkSize = 800, ch
     }
 }
 
+/**
+ * Extract and chunk a document in one Python service call (/ingest)
+ * The document text is extracted (with OCR fallback) and chunked server-side,
+ * so it never travels to Node and back.
+ *
+ * @param {string} filePath - Path to the uploaded document
+ * @param {string} fileType - Document type ('pdf', 'docx', 'pptx', image extensions)
+ * @param {number} chunkSize - Target chunk size in tokens (default: 800)
+ * @param {number} chunkOverlap - Overlap between chunks in tokens (default: 100)
+ * @returns {Promise<Array|null>} Chunk objects with pageNumber (null for DOCX), or null to fall back
+ */
+export async function ingestWithPythonService(filePath, fileType, chunkSize = 800, chunkOverlap = 100) {
+    try {
+        console.log(`\n🐍 Calling Python ingest service for ${fileType.toUpperCase()}...`);
+
+        const formData = new FormData();
+        formData.append('file', fs.createReadStream(filePath));
+
+        const response = await axios.post(
+            `${PYTHON_SERVICE_URL}/ingest`,
+            formData,
+            {
+                params: { chunk_size: chunkSize, chunk_overlap: chunkOverlap },
+                headers: formData.getHeaders(),
+                timeout: 300000, // 5 minutes: extraction, OCR and chunking in one call
+                maxContentLength: Infinity,
+                maxBodyLength: Infinity
+            }
+        );
+
+        if (!response.data || !response.data.success) {
+            throw new Error('Python service returned unsuccessful response');
+        }
+
+        const { chunks, strategy, method, warning } = response.data;
+        console.log(`   ✅ Python ingest successful: ${chunks.length} chunks (${strategy}, ${method})`);
+        if (warning) {
+            console.warn(`   ⚠️  ${warning}`);
+        }
+
+        return chunks.map((chunk, index) => ({
+            text: chunk.text,
+            startOffset: chunk.start_offset,
+            endOffset: chunk.end_offset,
+            tokenCount: chunk.token_count,
+            chunkIndex: chunk.chunk_index || index,
+            metadata: chunk.metadata || {},
+            pageNumber: chunk.metadata?.page_number ?? null
+        }));
+    } catch (error) {
+        if (error.code === 'ECONNREFUSED') {
+            console.warn(`   ⚠️  Python service not available at ${PYTHON_SERVICE_URL}`);
+        } else if (error.response) {
+            console.error(`   ❌ Python ingest error: ${error.response.status} - ${error.response.data?.detail || error.message}`);
+        } else {
+            console.error(`   ❌ Error calling Python ingest service:`, error.message);
+        }
+
+        // Return null to signal fallback to extract-then-chunk
+        return null;
+    }
+}
+
 /**
  * Estimate line range from character offsets
  *
@@ -173,9 +240,10 @@ export function getOptimalChunkingParams(documentType) {
  * @param {string} text - Text to chunk
  * @param {string} fileType - Document type
  * @param {object} fallbackChunker - Fallback chunking function (RecursiveCharacterTextSplitter)
+ * @param {Array|null} blocks - Block stream from /extract/*?blocks=true for this text (optional)
  * @returns {Promise<Array>} Array of chunks
  */
-export async function smartChunk(text, fileType, fallbackChunker = null) {
+export async function smartChunk(text, fileType, fallbackChunker = null, blocks = null) {
     const params = getOptimalChunkingParams(fileType);
 
     // Try Python service first
@@ -183,7 +251,8 @@ export async function smartChunk(text, fileType, fallbackChunker = null) {
         text,
         fileType,
         params.chunkSize,
-        params.chunkOverlap
+        params.chunkOverlap,
+        blocks
     );
 
     if (pythonChunks && pythonChunks.length > 0) {
@@ -203,6 +272,7 @@ export async function smartChunk(text, fileType, fallbackChunker = null) {
 
 export default {
     chunkWithPythonService,
+    ingestWithPythonService,
     isPythonChunkingAvailable,
     getOptimalChunkingParams,
     smartChunk
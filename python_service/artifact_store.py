@@ -0,0 +1,224 @@
+"""
+Artifact Store
+Managed on-disk store for extracted images: per-document namespaces,
+TTL garbage collection and a global byte quota with LRU eviction
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from loguru import logger
+
+_SAFE_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$')
+
+
+def _check_name(value: str) -> str:
+    """Reject anything that is not a plain file or directory name"""
+    if not _SAFE_NAME.match(value) or '..' in value:
+        raise ValueError(f"Invalid artifact name: {value!r}")
+    return value
+
+
+class ArtifactStore:
+    """
+    Files grouped by namespace (one per source document)
+
+    - A namespace untouched (no write or read) for ttl_seconds is deleted as a whole
+    - Past max_bytes, the least-recently-used files are deleted first
+    - Artifacts are addressed as '<namespace>/<name>'
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl_seconds: float, gc_interval: float = 300.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.gc_interval = gc_interval
+
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[str, int]" = OrderedDict()  # 'namespace/name' -> size, oldest first
+        self._bytes = 0
+        self._namespace_access: Dict[str, float] = {}
+        self._stats = {'writes': 0, 'reads': 0, 'misses': 0, 'evictions': 0, 'expired_namespaces': 0}
+        self._gc_task: Optional[asyncio.Task] = None
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def _path(self, namespace: str, name: str) -> str:
+        return os.path.join(self.root, _check_name(namespace), _check_name(name))
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from files left by earlier runs, oldest first"""
+        entries = []
+        for namespace in os.listdir(self.root):
+            namespace_dir = os.path.join(self.root, namespace)
+            if not os.path.isdir(namespace_dir):
+                continue
+            for name in os.listdir(namespace_dir):
+                if name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(namespace_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, f"{namespace}/{name}", stat.st_size))
+                self._namespace_access[namespace] = max(self._namespace_access.get(namespace, 0), stat.st_mtime)
+
+        for _, artifact_id, size in sorted(entries):
+            self._files[artifact_id] = size
+            self._bytes += size
+
+        if entries:
+            logger.info(f"🗂️ Artifact store: {len(entries)} files ({self._bytes} bytes) in {len(self._namespace_access)} namespaces")
+
+    def describe(self, namespace: str, name: str, size: int) -> Dict[str, Any]:
+        """Id, URL and path an artifact of `size` bytes gets from put(), without writing it"""
+        artifact_id = f"{namespace}/{name}"
+        return {"id": artifact_id, "url": f"/artifacts/{artifact_id}", "path": self._path(namespace, name), "bytes": size}
+
+    def put(self, namespace: str, name: str, data: bytes) -> Dict[str, Any]:
+        """Write an artifact (replacing one with the same name) and return its id, URL and path"""
+        path = self._path(namespace, name)
+        artifact_id = f"{namespace}/{name}"
+
+        # Claimed under the lock, so garbage collection can neither expire the
+        # namespace nor remove its directory before the file lands in it
+        with self._lock:
+            self._namespace_access[namespace] = time.time()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._bytes -= self._files.pop(artifact_id, 0)
+            self._files[artifact_id] = len(data)
+            self._bytes += len(data)
+            self._namespace_access[namespace] = time.time()
+            self._stats['writes'] += 1
+            self._evict()
+
+        return self.describe(namespace, name, len(data))
+
+    def get_path(self, namespace: str, name: str) -> Optional[str]:
+        """Path of an artifact for serving, or None if it expired or was evicted"""
+        path = self._path(namespace, name)
+        artifact_id = f"{namespace}/{name}"
+
+        with self._lock:
+            known = artifact_id in self._files
+            if known and os.path.exists(path):
+                self._files.move_to_end(artifact_id)
+                self._namespace_access[namespace] = time.time()
+                self._stats['reads'] += 1
+                return path
+            # Deleted behind our back (e.g. a client cleaning up imagePath)
+            if known:
+                self._bytes -= self._files.pop(artifact_id)
+            self._stats['misses'] += 1
+            return None
+
+    def delete_namespace(self, namespace: str) -> int:
+        """Delete every artifact of a namespace; returns the number of files removed"""
+        namespace_dir = os.path.join(self.root, _check_name(namespace))
+        with self._lock:
+            removed = self._forget_namespace(namespace)
+            shutil.rmtree(namespace_dir, ignore_errors=True)
+        return removed
+
+    def _forget_namespace(self, namespace: str) -> int:
+        """Drop a namespace from the index (caller holds the lock)"""
+        prefix = f"{namespace}/"
+        artifact_ids = [artifact_id for artifact_id in self._files if artifact_id.startswith(prefix)]
+        for artifact_id in artifact_ids:
+            self._bytes -= self._files.pop(artifact_id)
+        self._namespace_access.pop(namespace, None)
+        return len(artifact_ids)
+
+    def _evict(self) -> None:
+        """Drop least-recently-used files until under quota (caller holds the lock)"""
+        while self._bytes > self.max_bytes and self._files:
+            artifact_id, size = self._files.popitem(last=False)
+            self._bytes -= size
+            self._stats['evictions'] += 1
+            try:
+                os.remove(os.path.join(self.root, artifact_id))
+            except OSError:
+                pass
+
+    def collect_garbage(self) -> int:
+        """Delete namespaces idle for longer than the TTL; returns how many were removed"""
+        cutoff = time.time() - self.ttl_seconds
+        # Directories are only removed under the lock, which put() holds while creating one
+        with self._lock:
+            expired = [namespace for namespace, accessed in self._namespace_access.items() if accessed < cutoff]
+            for namespace in expired:
+                self._forget_namespace(namespace)
+                shutil.rmtree(os.path.join(self.root, namespace), ignore_errors=True)
+            self._stats['expired_namespaces'] += len(expired)
+
+            # Directories emptied by LRU eviction
+            for namespace in os.listdir(self.root):
+                namespace_dir = os.path.join(self.root, namespace)
+                if namespace in self._namespace_access or not os.path.isdir(namespace_dir):
+                    continue
+                try:
+                    os.rmdir(namespace_dir)
+                except OSError:
+                    pass
+
+        if expired:
+            logger.info(f"🧹 Artifact store: expired {len(expired)} namespace(s)")
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'files': len(self._files),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'namespaces': len(self._namespace_access),
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+    async def start(self) -> None:
+        """Collect garbage now and then every gc_interval seconds in the background"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.collect_garbage)
+        self._gc_task = asyncio.create_task(self._collect_periodically())
+
+    async def stop(self) -> None:
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            self._gc_task = None
+
+    async def _collect_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.gc_interval)
+            try:
+                await loop.run_in_executor(None, self.collect_garbage)
+            except Exception as e:
+                logger.warning(f"Artifact store garbage collection failed: {str(e)}")
+
+
+def artifact_store_from_env() -> ArtifactStore:
+    """
+    Build the store configured by ARTIFACT_STORE_DIR, ARTIFACT_STORE_MAX_MB,
+    ARTIFACT_TTL_SECONDS and ARTIFACT_GC_INTERVAL_SECONDS
+    """
+    return ArtifactStore(
+        root=os.getenv('ARTIFACT_STORE_DIR', os.path.join(tempfile.gettempdir(), 'document_service_artifacts')),
+        max_bytes=int(float(os.getenv('ARTIFACT_STORE_MAX_MB', '1024')) * 1024 * 1024),
+        ttl_seconds=float(os.getenv('ARTIFACT_TTL_SECONDS', str(24 * 3600))),
+        gc_interval=float(os.getenv('ARTIFACT_GC_INTERVAL_SECONDS', '300'))
+    )
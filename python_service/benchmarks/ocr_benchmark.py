@@ -0,0 +1,91 @@
+"""
+OCR Backend Benchmark
+Compares pages/sec of the pytesseract (tesseract CLI per page) and tesserocr
+(in-process engine per thread) backends on the same page images.
+
+Usage:
+    python benchmarks/ocr_benchmark.py [--input scan.pdf | page.png ...] [--pages 20] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw  # noqa: E402
+from ocr_backends import _BACKENDS  # noqa: E402
+
+
+def synthetic_page(seed: int, width: int = 2550, height: int = 3300) -> Image.Image:
+    """A 300 DPI US Letter page of random words in the default bitmap font, scaled up"""
+    rng = random.Random(seed)
+    words = ("invoice contract party agreement total amount date signature clause "
+             "payment term section annex schedule notice").split()
+    page = Image.new('L', (width // 4, height // 4), 255)
+    draw = ImageDraw.Draw(page)
+    for line in range(60):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(6, 12)))
+        draw.text((40, 30 + line * 13), text, fill=0)
+    return page.resize((width, height), Image.Resampling.NEAREST)
+
+
+def load_pages(inputs, pages: int):
+    if not inputs:
+        return [synthetic_page(seed) for seed in range(pages)]
+
+    images = []
+    for path in inputs:
+        if path.lower().endswith('.pdf'):
+            from pdf2image import convert_from_path
+            images.extend(convert_from_path(path, dpi=300, grayscale=True, last_page=pages))
+        else:
+            images.append(Image.open(path))
+    return images[:pages]
+
+
+def run(label: str, backend, images, workers: int) -> None:
+    # One warm-up page so tesserocr's engine load is not counted against the first page
+    backend.image_to_data(images[0])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        words = sum(
+            sum(1 for level in data['level'] if level == 5)
+            for data in executor.map(backend.image_to_data, images)
+        )
+    elapsed = time.perf_counter() - started
+    rate = len(images) / elapsed if elapsed else float('inf')
+    print(f"{label:<14} {len(images):>5} pages  {words:>8} words  {elapsed:>8.2f}s  {rate:>8.2f} pages/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', nargs='*', help='Scanned PDF or page images; synthetic pages if omitted')
+    parser.add_argument('--pages', type=int, default=20, help='Pages to OCR per backend')
+    parser.add_argument('--workers', type=int, default=1, help='Parallel OCR threads')
+    args = parser.parse_args()
+
+    # Match the service: parallel pages, one OpenMP thread per tesseract
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+    images = load_pages(args.input, args.pages)
+    print(f"{len(images)} pages, {args.workers} worker(s)\n")
+
+    for name, backend_class in _BACKENDS.items():
+        try:
+            backend = backend_class()
+        except ImportError as e:
+            print(f"{name:<14} skipped ({str(e)})")
+            continue
+        if not backend.available():
+            print(f"{name:<14} skipped (tesseract or English traineddata not found)")
+            continue
+        run(name, backend, images, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Sentence Segmentation Benchmark
+Compares the legacy per-section parser path of PDFChunkingStrategy with the
+batched nlp.pipe path over the trimmed sentence pipeline.
+
+Usage:
+    python benchmarks/segmentation_benchmark.py [--input document.txt] [--model en_core_web_sm]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy  # noqa: E402
+from multi_strategy_chunker import PDFChunkingStrategy, _load_sentence_pipeline  # noqa: E402
+
+
+def synthetic_document(sections: int, sentences_per_section: int, seed: int = 7) -> str:
+    """Build a PDF-like text with numbered section headings"""
+    rng = random.Random(seed)
+    words = ("data model system result method analysis value process table figure "
+             "performance document section report sample").split()
+    parts = []
+    for index in range(1, sections + 1):
+        sentences = []
+        for _ in range(sentences_per_section):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 24)))
+            sentences.append(sentence.capitalize() + ".")
+        parts.append(f"{index}. Section Heading {index}\n" + " ".join(sentences))
+    return "\n\n".join(parts)
+
+
+def run(label: str, segment) -> None:
+    started = time.perf_counter()
+    sentence_count = segment()
+    elapsed = time.perf_counter() - started
+    rate = sentence_count / elapsed if elapsed else float('inf')
+    print(f"{label:<32} {sentence_count:>8} sentences  {elapsed:>8.2f}s  {rate:>10.0f} sentences/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help='Plain-text document (e.g. /extract/pdf output); synthetic if omitted')
+    parser.add_argument('--model', default='en_core_web_sm', help='spaCy model name or path')
+    parser.add_argument('--sections', type=int, default=200, help='Synthetic sections')
+    parser.add_argument('--sentences', type=int, default=40, help='Synthetic sentences per section')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--n-process', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = synthetic_document(args.sections, args.sentences)
+
+    # Reuse the chunker's own section detection (skipping its model load) so both paths see identical input
+    chunker = PDFChunkingStrategy.__new__(PDFChunkingStrategy)
+    sections = [section['text'] for section in chunker._detect_sections(text)]
+    print(f"{len(text)} characters in {len(sections)} sections\n")
+
+    full = spacy.load(args.model)
+    trimmed = _load_sentence_pipeline(args.model)
+    print(f"full pipeline:    {full.pipe_names}")
+    print(f"trimmed pipeline: {trimmed.pipe_names}\n")
+
+    run("per-section full parser", lambda: sum(len(list(full(section).sents)) for section in sections))
+    run("nlp.pipe full pipeline", lambda: sum(
+        len(list(doc.sents)) for doc in full.pipe(sections, batch_size=args.batch_size, n_process=args.n_process)
+    ))
+    run("nlp.pipe trimmed pipeline", lambda: sum(
+        len(list(doc.sents)) for doc in trimmed.pipe(sections, batch_size=args.batch_size, n_process=args.n_process)
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Semantic Chunking Benchmark
+Times SemanticChunkingStrategy on a large document with a cold and a warm
+embedding cache against the spaCy section chunker (PDFChunkingStrategy), and
+measures how many of the document's topic shifts each places a chunk boundary on.
+
+Usage:
+    python benchmarks/semantic_benchmark.py [--input document.txt] [--sentences 100000] [--topic-length 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A throwaway vector file, so the first run really is cold
+os.environ.setdefault('EMBEDDING_CACHE_DIR', tempfile.mkdtemp(prefix='embedding_cache_'))
+
+import embedder  # noqa: E402
+from multi_strategy_chunker_full import PDFChunkingStrategy, SemanticChunkingStrategy  # noqa: E402
+
+TOPICS = [
+    "revenue margin quarter forecast growth cost budget profit",
+    "engine piston fuel gearbox torque exhaust brake chassis",
+    "court judge lawyer trial verdict appeal jury statute",
+    "protein cell enzyme membrane gene receptor tissue mutation",
+    "server latency cache request queue thread socket cluster",
+]
+
+
+def synthetic_document(sentences: int, topic_length: int, seed: int = 5):
+    """
+    Sentences drawn from one topic vocabulary at a time, switching topic every
+    ~topic_length sentences
+
+    Returns:
+        (text, character offsets where a new topic starts)
+    """
+    rng = random.Random(seed)
+    vocabularies = [topic.split() for topic in TOPICS]
+    filler = "the of and with for this that report shows".split()
+    parts = []
+    shifts = []
+    offset = 0
+    topic = 0
+    remaining = 0
+    for _ in range(sentences):
+        if remaining == 0:
+            topic = (topic + rng.randint(1, len(TOPICS) - 1)) % len(TOPICS)
+            remaining = max(2, int(rng.gauss(topic_length, topic_length / 4)))
+            if parts:
+                shifts.append(offset)
+        words = [rng.choice(vocabularies[topic] if rng.random() < 0.6 else filler) for _ in range(rng.randint(8, 22))]
+        sentence = " ".join(words).capitalize() + "."
+        parts.append(sentence)
+        offset += len(sentence) + 1
+        remaining -= 1
+    return " ".join(parts), shifts
+
+
+def boundary_recall(chunks, shifts, tolerance: int = 0) -> float:
+    """Fraction of topic shifts that some chunk starts at (within tolerance characters)"""
+    if not shifts:
+        return 1.0
+    starts = sorted(chunk['start_offset'] for chunk in chunks)
+    found = 0
+    for shift in shifts:
+        index = bisect_left(starts, shift - tolerance)
+        if index < len(starts) and starts[index] <= shift + tolerance:
+            found += 1
+    return found / len(shifts)
+
+
+def timed(label: str, chunker, text: str, shifts):
+    started = time.perf_counter()
+    chunks = chunker.chunk(text)
+    elapsed = time.perf_counter() - started
+    recall = f"{boundary_recall(chunks, shifts):>6.1%}" if shifts is not None else "   n/a"
+    print(f"{label:<28} {len(chunks):>7} chunks  {elapsed:>8.2f}s  topic shifts on a boundary: {recall}")
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help='Plain-text document (e.g. /extract/pdf output); synthetic if omitted')
+    parser.add_argument('--sentences', type=int, default=100_000, help='Sentences in the synthetic document')
+    parser.add_argument('--topic-length', type=int, default=20, help='Mean sentences per synthetic topic')
+    parser.add_argument('--chunk-size', type=int, default=800)
+    parser.add_argument('--percentile', type=float, default=95)
+    args = parser.parse_args()
+
+    # Only the chunkers are measured
+    from loguru import logger
+    logger.remove()
+
+    try:
+        started = time.perf_counter()
+        embedder.embedding_model.get()
+        print(f"embedding model {embedder.EMBEDDING_MODEL} loaded in {time.perf_counter() - started:.2f}s")
+    except embedder.EmbeddingUnavailable as e:
+        sys.exit(f"Semantic chunking needs the local embedding model: {str(e)}")
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            text = f.read()
+        shifts = None
+    else:
+        text, shifts = synthetic_document(args.sentences, args.topic_length)
+
+    semantic = SemanticChunkingStrategy(chunk_size=args.chunk_size, breakpoint_percentile=args.percentile)
+    sentence_count = len(semantic._sentence_spans(text))
+    print(f"{len(text)} characters, {sentence_count} sentences\n")
+
+    timed("semantic (cold cache)", semantic, text, shifts)
+    timed("semantic (warm cache)", semantic, text, shifts)
+    timed("spaCy section chunker", PDFChunkingStrategy(chunk_size=args.chunk_size, chunk_overlap=0), text, shifts)
+
+    stats = embedder.embedding_cache.stats()
+    print(f"\nembedding cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+          f"{stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Table Extraction Benchmark
+Compares the exhaustive extract_tables() scan of every page with the table
+prefilter, sequentially and with candidate pages spread over a process pool,
+and checks that the prefilter finds exactly the same tables (and that its
+path-operator test accepts operators ended by a delimiter).
+
+Usage:
+    python benchmarks/table_benchmark.py [--input report.pdf ...] [--pages 200] [--table-every 20] [--workers 4]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber  # noqa: E402
+import table_extractor  # noqa: E402
+from table_extractor import extract_tables_from_pages, find_table_candidate_pages  # noqa: E402
+
+
+# Content streams the prefilter must treat as drawing paths: operators ended by a
+# delimiter rather than whitespace
+PATH_STREAMS = [
+    b'0 0 10 10 re/GS0 gs',
+    b'0 0 m 10 0 l[1 2]0 d S',
+    b'0 0 m 10 0 l%c\nS',
+    b'0 0 m 10 0 l\nS',
+    b'q 1 0 0 1 0 0 cm 0 0 m 5 5 10 5 15 0 c<</MCID 0>>BDC EMC',
+]
+# ... and streams that only place text
+TEXT_STREAMS = [
+    b'BT /F1 12 Tf 72 700 Td (Total revenue) Tj ET',
+    b'BT /F1 9 Tf [(Quarterly)-250(results)] TJ ET',
+]
+
+
+def check_path_operators() -> bool:
+    """Whether the prefilter's path test accepts every PATH_STREAMS and no TEXT_STREAMS entry"""
+    ok = True
+    for stream in PATH_STREAMS:
+        if not table_extractor._draws_paths(stream):
+            print(f"path operators missed in {stream!r}")
+            ok = False
+    for stream in TEXT_STREAMS:
+        if table_extractor._draws_paths(stream):
+            print(f"path operators wrongly found in {stream!r}")
+            ok = False
+    return ok
+
+
+def synthetic_corpus(pages: int, table_every: int, seed: int = 11) -> bytes:
+    """
+    A report-like PDF: text pages, a ruled table every table_every pages, and
+    some pages with a heading underline (a rule that is not a table)
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    rng = random.Random(seed)
+    words = ("revenue margin quarter forecast region segment contract customer "
+             "growth cost report analysis total increase").split()
+    styles = getSampleStyleSheet()
+    story = []
+    for page in range(1, pages + 1):
+        story.append(Paragraph(f"Section {page}", styles['Heading2']))
+        if page % 3 == 0:
+            story.append(HRFlowable(width="100%"))
+        for _ in range(6):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(40, 70)))
+            story.append(Paragraph(text.capitalize() + ".", styles['BodyText']))
+        if page % table_every == 0:
+            rows = [["Region", "Q1", "Q2", "Q3", "Q4"]] + [
+                [f"R{row}"] + [str(rng.randint(100, 999)) for _ in range(4)] for row in range(8)
+            ]
+            table = Table(rows)
+            table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, colors.black)]))
+            story.append(table)
+        story.append(PageBreak())
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(story)
+    return buffer.getvalue()
+
+
+def exhaustive(pdf_path: str):
+    """The original scan: extract_tables() on every page"""
+    table_extractor.TABLE_PREFILTER = False
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            return extract_tables_from_pages(pdf_path, list(range(1, len(pdf.pages) + 1)))
+    finally:
+        table_extractor.TABLE_PREFILTER = True
+
+
+def candidates(pdf_path: str):
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages), find_table_candidate_pages(pdf)
+
+
+def prefiltered(pdf_path: str):
+    _, pages = candidates(pdf_path)
+    return extract_tables_from_pages(pdf_path, pages) if pages else []
+
+
+def prefiltered_parallel(pdf_path: str, executor: ProcessPoolExecutor, workers: int):
+    _, pages = candidates(pdf_path)
+    if not pages:
+        return []
+    size = -(-len(pages) // min(len(pages), workers * 2))
+    groups = [pages[start:start + size] for start in range(0, len(pages), size)]
+    results = executor.map(extract_tables_from_pages, [pdf_path] * len(groups), groups)
+    return [table for result in results for table in result]
+
+
+def timed(label: str, fn, *args):
+    started = time.perf_counter()
+    tables = fn(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {len(tables):>5} tables  {elapsed:>8.2f}s")
+    return tables, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', nargs='*', help='PDFs to scan; a synthetic table-sparse report if omitted')
+    parser.add_argument('--pages', type=int, default=200, help='Pages in the synthetic report')
+    parser.add_argument('--table-every', type=int, default=20, help='One table page every N synthetic pages')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Process pool size')
+    args = parser.parse_args()
+
+    # Only the table scan is measured
+    from loguru import logger
+    logger.remove()
+
+    if not check_path_operators():
+        sys.exit("The table prefilter would skip pages that draw paths")
+    print(f"path operator check: {len(PATH_STREAMS)} drawing and {len(TEXT_STREAMS)} text-only streams classified")
+
+    temp_paths = []
+    paths = args.input
+    if not paths:
+        fd, path = tempfile.mkstemp(suffix='.pdf', prefix='tables_')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(synthetic_corpus(args.pages, args.table_every))
+        paths = temp_paths = [path]
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # Start the workers before timing
+            list(executor.map(abs, range(args.workers)))
+
+            for path in paths:
+                page_count, pages = candidates(path)
+                print(f"\n{os.path.basename(path)}: {page_count} pages, {len(pages)} table candidates")
+
+                baseline, baseline_time = timed("exhaustive", exhaustive, path)
+                sequential, sequential_time = timed("prefilter", prefiltered, path)
+                parallel, parallel_time = timed(f"prefilter + {args.workers} procs", prefiltered_parallel,
+                                                path, executor, args.workers)
+
+                missed = [table for table in baseline if table not in sequential]
+                extra = [table for table in sequential if table not in baseline]
+                print(f"speedup: {baseline_time / sequential_time:.1f}x sequential, "
+                      f"{baseline_time / parallel_time:.1f}x parallel")
+                print(f"missed tables: {len(missed)}, extra tables: {len(extra)}, "
+                      f"parallel matches sequential: {parallel == sequential}")
+    finally:
+        for path in temp_paths:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
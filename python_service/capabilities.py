@@ -0,0 +1,178 @@
+"""
+Capability Registry
+Probes external tools and models once, caches the results and refreshes them on a TTL
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from loguru import logger
+
+from ocr_backends import get_ocr_backend
+from multi_strategy_chunker import DEFAULT_SPACY_MODEL, nlp_registry
+
+# Seconds between background re-probes (tools installed or removed while running)
+CAPABILITY_TTL_SECONDS = float(os.getenv('CAPABILITY_TTL_SECONDS', '300'))
+
+
+def find_soffice() -> Optional[str]:
+    """Path of the LibreOffice executable, or None if it is not installed"""
+    if os.name == 'nt':  # Windows
+        libreoffice_paths = [
+            r"C:\Program Files\LibreOffice\program\soffice.exe",
+            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+            r"C:\Program Files\LibreOffice\program\soffice.com",
+        ]
+    else:  # Linux/Mac
+        libreoffice_paths = [
+            "/usr/bin/soffice",
+            "/usr/bin/libreoffice",
+            "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+        ]
+
+    for path in libreoffice_paths:
+        if os.path.exists(path):
+            return path
+    # Try finding in PATH
+    return shutil.which('soffice') or shutil.which('libreoffice')
+
+
+def probe_tesseract() -> Dict[str, Any]:
+    backend = get_ocr_backend()
+    available = backend.available()
+    return {
+        "available": available,
+        "backend": backend.name,
+        "version": backend.version() if available else None,
+        "languages": backend.languages() if available else []
+    }
+
+
+def probe_libreoffice() -> Dict[str, Any]:
+    soffice_path = find_soffice()
+    return {"available": soffice_path is not None, "path": soffice_path}
+
+
+def probe_poppler() -> Dict[str, Any]:
+    """pdf2image plus the poppler binaries it shells out to"""
+    try:
+        import pdf2image  # noqa: F401
+    except ImportError:
+        return {"available": False, "pdf2image": False, "version": None}
+
+    pdftoppm_path = shutil.which('pdftoppm')
+    if pdftoppm_path is None:
+        return {"available": False, "pdf2image": True, "version": None}
+
+    version = None
+    try:
+        # Prints e.g. "pdftoppm version 22.02.0" to stderr
+        process = subprocess.run([pdftoppm_path, '-v'], capture_output=True, text=True, timeout=10)
+        version = (process.stderr or process.stdout).splitlines()[0].split()[-1]
+    except (OSError, IndexError, subprocess.TimeoutExpired):
+        pass
+    return {"available": shutil.which('pdfinfo') is not None, "pdf2image": True, "version": version}
+
+
+def probe_spacy() -> Dict[str, Any]:
+    """Whether the chunker's spaCy model is installed, and what the registry has loaded"""
+    try:
+        import spacy.util
+        installed = spacy.util.is_package(DEFAULT_SPACY_MODEL)
+    except ImportError:
+        installed = False
+
+    loaded = {name: stats.get('loaded', False) for name, stats in nlp_registry.stats().items()}
+    return {"available": installed, "model": DEFAULT_SPACY_MODEL, "loaded": loaded}
+
+
+class CapabilityRegistry:
+    """
+    Last known result of every capability probe
+
+    Reads are in-memory and never block on a probe; results are refreshed in
+    the background every ttl seconds once start() has been awaited.
+    """
+
+    def __init__(self, probes: Dict[str, Callable[[], Dict[str, Any]]], ttl: float):
+        self.probes = probes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def refresh(self) -> None:
+        """Run every probe (blocking) and store the results"""
+        for name, probe in self.probes.items():
+            started = time.monotonic()
+            try:
+                result = probe()
+            except Exception as e:
+                logger.warning(f"Capability probe '{name}' failed: {str(e)}")
+                result = {"available": False, "error": str(e)}
+            result["checked_at"] = time.time()
+            result["probe_seconds"] = round(time.monotonic() - started, 4)
+
+            with self._lock:
+                previous = self._results.get(name)
+                self._results[name] = result
+            if previous is None or previous["available"] != result["available"]:
+                logger.info(f"🔎 {name}: {'available' if result['available'] else 'unavailable'}")
+
+    def available(self, name: str) -> bool:
+        """Last probed availability of a capability"""
+        with self._lock:
+            result = self._results.get(name)
+        if result is None:
+            # Not probed yet (used outside the app lifespan): probe once now
+            self.refresh()
+            with self._lock:
+                result = self._results[name]
+        return result["available"]
+
+    def get(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._results.get(name) or {})
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """All probe results with their age in seconds"""
+        now = time.time()
+        with self._lock:
+            return {
+                name: {**result, "age_seconds": round(now - result["checked_at"], 1)}
+                for name, result in self._results.items()
+            }
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return len(self._results) == len(self.probes)
+
+    async def start(self) -> None:
+        """Probe everything once, then keep refreshing in the background"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.refresh)
+        self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.ttl)
+            await loop.run_in_executor(None, self.refresh)
+
+
+capabilities = CapabilityRegistry({
+    'tesseract': probe_tesseract,
+    'libreoffice': probe_libreoffice,
+    'poppler': probe_poppler,
+    'spacy': probe_spacy,
+}, ttl=CAPABILITY_TTL_SECONDS)
@@ -0,0 +1,200 @@
+"""
+Document Blocks
+Typed block stream emitted by the extractors next to their flat text:
+headings, paragraphs, list items, tables, slides and page breaks, each with
+the character offsets of its text, so chunkers can use the structure as-is
+instead of re-detecting it with regexes
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from statistics import median
+from typing import Any, Dict, List, Tuple
+
+BLOCK_TYPES = ('heading', 'paragraph', 'list_item', 'table', 'slide', 'page_break')
+
+# Boundary markers: a slide or page starts here; the block spans its marker line
+MARKER_TYPES = ('slide', 'page_break')
+
+# A PDF line set this much larger than the page's body text is a heading
+PDF_HEADING_SCALE = 1.15
+# Vertical gap, in line heights, that separates two PDF paragraphs
+PDF_PARAGRAPH_GAP = 0.6
+_PDF_BULLETS = ('•', '●', '▪', '■', '◦', '‣', '∙', '–', '-', '*')
+
+# A block before its offsets are known: (type, text, extra fields)
+PendingBlock = Tuple[str, str, Dict[str, Any]]
+
+
+class BlockTextBuilder:
+    """
+    Builds an extractor's flat text and its blocks together
+
+    Every appended block's (start_offset, end_offset) is exactly where its text
+    lands, i.e. text[block['start_offset']:block['end_offset']] is the block.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self.blocks: List[Dict[str, Any]] = []
+
+    def append(self, block_type: str, text: str, separator: str = "\n\n", **fields) -> None:
+        """
+        Append a block, preceded by separator unless it is the first one
+
+        Args:
+            block_type: One of BLOCK_TYPES
+            text: The block's text as it should appear in the flat text
+            separator: Text placed between the previous block and this one
+            **fields: Extra block fields (level, page, slide_number)
+        """
+        if self._length:
+            self._parts.append(separator)
+            self._length += len(separator)
+        start = self._length
+        self._parts.append(text)
+        self._length += len(text)
+        self.blocks.append({'type': block_type, 'start_offset': start, 'end_offset': self._length, **fields})
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._parts)
+
+
+def _line_size(line: Dict[str, Any]) -> float:
+    sizes = [char['size'] for char in line.get('chars', ()) if not char['text'].isspace()]
+    return round(median(sizes), 1) if sizes else 0.0
+
+
+def _heading_level(size: float, body_size: float) -> int:
+    ratio = size / body_size
+    if ratio >= 1.6:
+        return 1
+    if ratio >= 1.3:
+        return 2
+    return 3
+
+
+def pdf_line_blocks(lines: List[Dict[str, Any]]) -> List[PendingBlock]:
+    """
+    Group the text lines of one PDF page into heading, list item and paragraph blocks
+
+    Headings are lines set in a larger font than the page's body text (the
+    size covering the most characters); list items start with a bullet glyph;
+    other lines are grouped into paragraphs by vertical spacing. Joining the
+    block texts with newlines gives back the page text line for line.
+
+    Args:
+        lines: pdfplumber Page.extract_text_lines() output (with chars)
+
+    Returns:
+        (type, text, fields) per block, in reading order
+    """
+    if not lines:
+        return []
+
+    sizes = [_line_size(line) for line in lines]
+    weights = Counter()
+    for line, size in zip(lines, sizes):
+        weights[size] += len(line['text'])
+    body_size = weights.most_common(1)[0][0] or 1.0
+
+    blocks: List[PendingBlock] = []
+    current_type = None
+    current_lines: List[str] = []
+    current_fields: Dict[str, Any] = {}
+    previous = None
+
+    def flush():
+        if current_lines:
+            blocks.append((current_type, "\n".join(current_lines), current_fields))
+
+    for line, size in zip(lines, sizes):
+        text = line['text']
+        if size >= body_size * PDF_HEADING_SCALE and len(text) < 200:
+            line_type, fields = 'heading', {'level': _heading_level(size, body_size)}
+        elif text.lstrip().startswith(_PDF_BULLETS) and text.lstrip()[1:2].isspace():
+            line_type, fields = 'list_item', {'level': 0}
+        else:
+            line_type, fields = 'paragraph', {}
+
+        height = max(line['bottom'] - line['top'], 1.0)
+        gap = line['top'] - previous['bottom'] if previous is not None else 0.0
+        continues = (
+            previous is not None
+            and gap <= height * PDF_PARAGRAPH_GAP
+            and (
+                # Multi-line heading set in one size, or wrapped list item / paragraph text
+                (line_type == 'heading' and current_type == 'heading' and fields == current_fields)
+                or (line_type == 'paragraph' and current_type in ('paragraph', 'list_item'))
+            )
+        )
+
+        if not continues:
+            flush()
+            current_type, current_lines, current_fields = line_type, [], fields
+        current_lines.append(text)
+        previous = line
+
+    flush()
+    return blocks
+
+
+def validate_blocks(text: str, blocks: List[Dict[str, Any]]) -> None:
+    """
+    Check that a client-supplied block stream fits text
+
+    Raises:
+        ValueError: On an unknown block type, or offsets that are out of range
+            or not in document order
+    """
+    previous_start = 0
+    for index, block in enumerate(blocks):
+        if block.get('type') not in BLOCK_TYPES:
+            raise ValueError(f"Block {index}: unknown type {block.get('type')!r}. Supported: {', '.join(BLOCK_TYPES)}")
+        start, end = block['start_offset'], block['end_offset']
+        if not 0 <= start <= end <= len(text):
+            raise ValueError(f"Block {index}: offsets {start}..{end} are outside the text (length {len(text)})")
+        if start < previous_start:
+            raise ValueError(f"Block {index}: blocks must be in document order")
+        previous_start = start
+
+
+def ocr_line_blocks(lines: List[Dict[str, Any]]) -> List[PendingBlock]:
+    """One paragraph block per Tesseract (block, paragraph), its lines newline-joined"""
+    blocks: List[PendingBlock] = []
+    previous_paragraph = None
+    for line in lines:
+        paragraph = (line['block'], line['paragraph'])
+        if paragraph == previous_paragraph:
+            blocks[-1] = ('paragraph', blocks[-1][1] + "\n" + line['text'], {})
+        else:
+            blocks.append(('paragraph', line['text'], {}))
+        previous_paragraph = paragraph
+    return blocks
+
+
+def attribute_pages(chunks: List[Dict[str, Any]], blocks: List[Dict[str, Any]]) -> None:
+    """
+    Add the pages (or slides) each chunk spans to its metadata, from the
+    page_break / slide markers of the block stream it was chunked from
+
+    Sets metadata['page_number'] to the first of them and metadata['pages']
+    to all of them; chunks of documents without markers (DOCX) are left as-is.
+    """
+    markers = [
+        (block['start_offset'], block.get('page', block.get('slide_number')))
+        for block in blocks
+        if block['type'] in MARKER_TYPES
+    ]
+    if not markers:
+        return
+
+    starts = [start for start, _ in markers]
+    for chunk in chunks:
+        first = max(bisect_right(starts, chunk['start_offset']) - 1, 0)
+        last = max(bisect_left(starts, chunk['end_offset']) - 1, first)
+        pages = [number for _, number in markers[first:last + 1]]
+        chunk['metadata']['page_number'] = pages[0]
+        chunk['metadata']['pages'] = pages
@@ -3,32 +3,84 @@ Document Processing Microservice
 FastAPI service for extracting text from PDF, DOCX, PPTX, and images using OCR
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 import pdfplumber
 from docx import Document as DocxDocument
 from pptx import Presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
 import pytesseract
 from PIL import Image
+import asyncio
+import base64
 import io
+import json
 import os
 import tempfile
+from collections import deque
 from pathlib import Path
 from loguru import logger
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+from contextlib import asynccontextmanager, contextmanager
 import traceback
-from table_extractor import extract_tables_from_pdf
-from multi_strategy_chunker import get_chunking_strategy
+from table_extractor import (
+    TABLE_FORMATS, extract_tables_from_pdf, extract_tables_from_page, extract_tables_from_pages,
+    find_table_candidate_pages
+)
+from multi_strategy_chunker import get_chunking_strategy, get_sentence_pipeline, nlp_registry
+from worker_pools import get_pool, run_in_pool, pool_stats, shutdown_pools
+from result_cache import cache_from_env, content_hash
+from ocr_backends import get_ocr_backend
+from capabilities import capabilities
+from libreoffice_pool import get_libreoffice_pool, libreoffice_pool_stats, shutdown_libreoffice_pool
+from artifact_store import artifact_store_from_env
+from docx_stream import iter_docx_blocks
+from embedder import (
+    EMBEDDING_MAX_TEXTS, EmbeddingUnavailable, embed_with_cache, embedding_batcher, embedding_cache, embedding_model,
+    normalize_rows
+)
+from document_blocks import (
+    BlockTextBuilder, PendingBlock, attribute_pages, ocr_line_blocks, pdf_line_blocks, validate_blocks
+)
 from pydantic import BaseModel
 
 # Configure logging
 logger.add("document_service.log", rotation="10 MB", level="INFO")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm shared resources before the first request is served"""
+    # Load the spaCy pipeline once per worker so /chunk never pays for it
+    get_sentence_pipeline()
+    # Probe tesseract, LibreOffice, poppler and spaCy once; refreshed in the background
+    await capabilities.start()
+    # Drop expired image namespaces now and periodically from then on
+    await artifact_store.start()
+    # Start LibreOffice instances in the background so the first conversion is warm
+    warm_up = None
+    if capabilities.available('libreoffice'):
+        warm_up = asyncio.create_task(get_libreoffice_pool(capabilities.get('libreoffice')['path']).warm())
+    # Merge concurrent /embed requests into CPU batches; optionally load the model now
+    await embedding_batcher.start()
+    if EMBEDDING_PRELOAD:
+        asyncio.create_task(_preload_embedding_model())
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    await embedding_batcher.stop()
+    await capabilities.stop()
+    await artifact_store.stop()
+    shutdown_libreoffice_pool()
+    shutdown_pools()
+
+
 app = FastAPI(
     title="Document Processing Service",
     description="Microservice for extracting text from various document formats",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration - Allow Node.js backend to access this service
@@ -60,6 +112,51 @@ else:
     # Linux/Mac - usually in PATH
     pytesseract.pytesseract.tesseract_cmd = 'tesseract'
 
+# Pages are OCR'd in parallel by the ocr pool; stop each tesseract process from
+# also spawning one OpenMP thread per core and oversubscribing the CPU
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+# Content-addressed cache of extraction results, keyed by upload bytes + endpoint
+# (EXTRACTION_CACHE_MEMORY_MB, EXTRACTION_CACHE_DISK_MB, EXTRACTION_CACHE_DIR)
+extraction_cache = cache_from_env('extraction', 'EXTRACTION_CACHE', memory_mb=256, disk_mb=2048)
+
+# Converted PDFs keyed by the source deck's bytes
+# (CONVERSION_CACHE_MEMORY_MB, CONVERSION_CACHE_DISK_MB, CONVERSION_CACHE_DIR)
+conversion_cache = cache_from_env('conversion', 'CONVERSION_CACHE', memory_mb=64, disk_mb=4096, codec='bytes')
+
+# Images from /extract-images and /analyze/pdf, one namespace per PDF, served by /artifacts
+# (ARTIFACT_STORE_DIR, ARTIFACT_STORE_MAX_MB, ARTIFACT_TTL_SECONDS, ARTIFACT_GC_INTERVAL_SECONDS)
+artifact_store = artifact_store_from_env()
+# Quality of images re-encoded as WebP/JPEG (image_format / thumbnail query params)
+ARTIFACT_IMAGE_QUALITY = int(os.getenv('ARTIFACT_IMAGE_QUALITY', '80'))
+
+# 'stream' reads DOCX body XML incrementally (body order, merged cells once);
+# 'python-docx' loads the full document model
+DOCX_PARSER = os.getenv('DOCX_PARSER', 'stream').lower()
+
+# PDFs with at least this many pages are extracted page-parallel in the
+# pdf_pages process pool (size it with POOL_PDF_PAGES_WORKERS)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '32'))
+
+# Table detection runs only on pages that pass the table prefilter; with at least
+# this many such pages it is spread across the pdf_pages process pool
+TABLE_PARALLEL_MIN_PAGES = int(os.getenv('TABLE_PARALLEL_MIN_PAGES', '4'))
+
+# /ocr keeps a PDF page's own text layer when it has at least this many characters
+# and only rasterizes/OCRs the pages below it (scans, signature pages, annexes)
+OCR_MIN_PAGE_CHARS = int(os.getenv('OCR_MIN_PAGE_CHARS', '100'))
+
+# Scanned PDFs are rasterized OCR_RASTER_WINDOW pages at a time and OCR'd in the
+# ocr pool; rasterization pauses while page images awaiting OCR, across all
+# concurrent requests, would exceed OCR_MEMORY_CEILING_MB, so peak memory grows
+# with neither the page count nor the number of scanned uploads
+OCR_PDF_DPI = 300
+OCR_RASTER_WINDOW = max(1, int(os.getenv('OCR_RASTER_WINDOW', '4')))
+OCR_MEMORY_CEILING_BYTES = int(float(os.getenv('OCR_MEMORY_CEILING_MB', '512')) * 1024 * 1024)
+
+# Load the local embedding model at startup instead of on the first /embed request
+EMBEDDING_PRELOAD = os.getenv('EMBEDDING_PRELOAD', '0') == '1'
+
 
 @app.get("/")
 async def root():
@@ -74,31 +171,309 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring"""
+    """Health check endpoint for monitoring (in-memory, never probes tools)"""
     return {
         "status": "healthy",
         "service": "document-processor",
-        "tesseract_available": _check_tesseract()
+        "tesseract_available": _check_tesseract(),
+        "ocr_backend": capabilities.get('tesseract').get('backend')
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness with the last probe result of every external capability
+
+    Returns 503 until the startup probes have completed.
+    """
+    ready = capabilities.ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "capabilities": capabilities.snapshot(),
+            "ttl_seconds": capabilities.ttl
+        }
+    )
+
+
+@app.get("/stats/models")
+async def model_stats():
+    """Load time and approximate memory of every NLP model loaded in this worker"""
+    return {
+        "models": nlp_registry.stats(),
+        "pid": os.getpid()
+    }
+
+
+@app.get("/stats/pools")
+async def worker_pool_stats():
+    """Queue depth, in-flight jobs and wait times of the blocking-work pools"""
+    return {
+        "pools": pool_stats(),
+        "libreoffice": libreoffice_pool_stats(),
+        "pid": os.getpid()
+    }
+
+
+@app.get("/stats/embeddings")
+async def embedding_stats():
+    """Embedding model state and the size and throughput of recent micro-batches"""
+    return {
+        "model": embedding_model.stats(),
+        "batching": embedding_batcher.stats(),
+        "pid": os.getpid()
+    }
+
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """Hit/miss counters and occupancy of the result caches and the image artifact store"""
+    return {
+        "extraction": extraction_cache.stats(),
+        "conversion": conversion_cache.stats(),
+        "artifacts": artifact_store.stats(),
+        "embeddings": embedding_cache.stats(),
+        "pid": os.getpid()
+    }
+
+
+def _cached_response(cache_key: str, filename: str) -> Optional[JSONResponse]:
+    """Serve a result already computed for identical upload bytes, if any"""
+    cached = extraction_cache.get(cache_key)
+    if cached is None:
+        return None
+    logger.info(f"⚡ Serving cached result for {filename}")
+    return JSONResponse(status_code=200, content={**cached, "filename": filename}, headers={"X-Cache": "HIT"})
+
+
+def _cache_response(cache_key: str, content: Dict[str, Any]) -> JSONResponse:
+    """Remember a successful result for future identical uploads and return it"""
+    extraction_cache.set(cache_key, content)
+    return JSONResponse(status_code=200, content=content)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _wants_stream(stream: bool, accept: Optional[str]) -> bool:
+    """Whether the client asked for a per-page NDJSON stream (?stream=true or Accept header)"""
+    return stream or (accept is not None and NDJSON_MEDIA_TYPE in accept)
+
+
+def _ndjson_response(records: AsyncIterator[Dict[str, Any]], filename: str) -> StreamingResponse:
+    """
+    Stream records as newline-delimited JSON
+
+    Headers are already sent by the time a mid-stream failure happens, so it is
+    reported as a final {"type": "error"} record instead of an HTTP 500.
+    """
+    async def body():
+        try:
+            async for record in records:
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming {filename}: {str(e)}\n{traceback.format_exc()}")
+            yield json.dumps({"type": "error", "success": False, "detail": str(e), "filename": filename}) + "\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
 def _check_tesseract() -> bool:
-    """Check if Tesseract is available"""
+    """Check if Tesseract is available (cached probe, see capabilities.py)"""
+    return capabilities.available('tesseract')
+
+
+def _extract_page_text(page) -> Optional[str]:
+    """Text of one pdfplumber page; None where extraction failed"""
     try:
-        pytesseract.get_tesseract_version()
-        return True
-    except Exception:
-        return False
+        return page.extract_text()
+    except Exception as e:
+        logger.warning(f"Error extracting page {page.page_number}: {str(e)}")
+        return None
+
+
+def _extract_page_blocks(page) -> Optional[List[PendingBlock]]:
+    """Heading, list item and paragraph blocks of one pdfplumber page; None where extraction failed"""
+    try:
+        return pdf_line_blocks(page.extract_text_lines())
+    except Exception as e:
+        logger.warning(f"Error extracting page {page.page_number}: {str(e)}")
+        return None
+
+
+def _extract_page_texts(pages, blocks: bool = False) -> List[Tuple[int, Any]]:
+    """(page number, text or blocks) for each pdfplumber page; None where extraction failed"""
+    extract = _extract_page_blocks if blocks else _extract_page_text
+    return [(page.page_number, extract(page)) for page in pages]
+
+
+def _join_page_texts(page_texts: List[Tuple[int, Optional[str]]]) -> str:
+    """Join page texts in order with the '--- Page N ---' markers chunkers rely on"""
+    return "\n\n".join(
+        f"--- Page {page_num} ---\n{page_text}"
+        for page_num, page_text in page_texts
+        if page_text
+    )
+
+
+def _join_page_blocks(page_blocks: List[Tuple[int, Optional[List[PendingBlock]]]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    The same page-marked text as _join_page_texts, with a page_break block
+    spanning each page marker followed by that page's blocks
+    """
+    builder = BlockTextBuilder()
+    for page_num, blocks in page_blocks:
+        if not blocks:
+            continue
+        builder.append("page_break", f"--- Page {page_num} ---", page=page_num)
+        for block_type, text, fields in blocks:
+            builder.append(block_type, text, separator="\n", page=page_num, **fields)
+    return builder.text, builder.blocks
+
+
+def _pdf_result(page_items: List[Tuple[int, Any]], page_count: int, blocks: bool) -> Dict[str, Any]:
+    if not blocks:
+        return {"text": _join_page_texts(page_items), "pages": page_count}
+    text, block_list = _join_page_blocks(page_items)
+    return {"text": text, "pages": page_count, "blocks": block_list}
+
+
+def _extract_pdf_page_items(content: bytes, blocks: bool = False) -> Tuple[int, List[Tuple[int, Any]]]:
+    """Page count and (page number, text or blocks) per page of PDF bytes (runs in the parse pool)"""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        # Extract text from all pages
+        return len(pdf.pages), _extract_page_texts(pdf.pages, blocks)
+
+
+def _pdf_page_count(content: bytes) -> int:
+    """Number of pages in a PDF"""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pdf_page_range(pdf_path: str, first_page: int, last_page: int,
+                            blocks: bool = False) -> List[Tuple[int, Any]]:
+    """Extract text (or blocks) from pages first_page..last_page (1-based, inclusive) in a pool worker"""
+    # Each worker opens the document itself and only loads its own pages
+    with pdfplumber.open(pdf_path, pages=list(range(first_page, last_page + 1))) as pdf:
+        return _extract_page_texts(pdf.pages, blocks)
+
+
+def _page_groups(page_numbers: List[int], workers: int) -> List[List[int]]:
+    """Split pages into contiguous groups, a couple per worker to even out slow pages"""
+    group_count = min(len(page_numbers), workers * 2)
+    group_size = -(-len(page_numbers) // group_count)
+    return [page_numbers[start:start + group_size] for start in range(0, len(page_numbers), group_size)]
+
+
+@contextmanager
+def _temp_pdf(content: bytes, prefix: str) -> Iterator[str]:
+    """Write a PDF to a temp file that pool workers open themselves instead of receiving a copy each"""
+    fd, pdf_path = tempfile.mkstemp(suffix='.pdf', prefix=prefix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        yield pdf_path
+    finally:
+        os.unlink(pdf_path)
+
+
+def _iter_pdf_page_records(content: bytes) -> Iterator[Dict[str, Any]]:
+    """Yield one NDJSON page record per PDF page as soon as it is extracted"""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        page_count = len(pdf.pages)
+        for page in pdf.pages:
+            page_text = _extract_page_text(page) or ""
+            # Release the parsed page before moving on so memory stays flat
+            page.close()
+            yield {
+                "type": "page",
+                "page": page.page_number,
+                "pages": page_count,
+                "text": page_text,
+                "char_count": len(page_text)
+            }
+
+
+async def _stream_pdf_pages(content: bytes, filename: str) -> AsyncIterator[Dict[str, Any]]:
+    """Page records from the parse pool followed by a summary record"""
+    page_count = 0
+    char_count = 0
+    async for record in get_pool('parse').iterate(_iter_pdf_page_records, content):
+        page_count = record["pages"]
+        char_count += record["char_count"]
+        yield record
+
+    summary = {
+        "type": "summary",
+        "pages": page_count,
+        "char_count": char_count,
+        "success": True,
+        "filename": filename
+    }
+    if not char_count:
+        summary["warning"] = "No text extracted. This may be a scanned PDF. Try /extract/ocr endpoint."
+    yield summary
+
+
+async def _extract_pdf_pages(content: bytes, blocks: bool = False) -> Tuple[int, List[Tuple[int, Any]]]:
+    """
+    Page count and (page number, text or pending blocks) for every PDF page
+
+    Documents with at least PDF_PARALLEL_MIN_PAGES pages are split into page
+    ranges that are extracted concurrently in the pdf_pages process pool and
+    merged back in page order; smaller ones are extracted in one parse job.
+    """
+    page_pool = get_pool('pdf_pages')
+    if page_pool.max_workers < 2:
+        return await run_in_pool('parse', _extract_pdf_page_items, content, blocks)
+
+    page_count = await run_in_pool('parse', _pdf_page_count, content)
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        return await run_in_pool('parse', _extract_pdf_page_items, content, blocks)
+
+    ranges = [(group[0], group[-1]) for group in _page_groups(list(range(1, page_count + 1)), page_pool.max_workers)]
+
+    logger.info(f"Extracting {page_count} pages in {len(ranges)} ranges across {page_pool.max_workers} workers")
+
+    with _temp_pdf(content, 'extract_') as pdf_path:
+        range_results = await asyncio.gather(*(
+            page_pool.run(_extract_pdf_page_range, pdf_path, first, last, blocks)
+            for first, last in ranges
+        ))
+
+    return page_count, [page_item for range_result in range_results for page_item in range_result]
+
+
+async def _extract_pdf(content: bytes, blocks: bool = False) -> Dict[str, Any]:
+    """Extract page-marked text from PDF bytes, with its block stream if blocks is set"""
+    page_count, page_items = await _extract_pdf_pages(content, blocks)
+    return _pdf_result(page_items, page_count, blocks)
 
 
 @app.post("/extract/pdf")
-async def extract_pdf(file: UploadFile = File(...)) -> JSONResponse:
+async def extract_pdf(
+    file: UploadFile = File(...),
+    stream: bool = False,
+    accept: Optional[str] = Header(None),
+    blocks: bool = False
+):
     """
     Extract text from PDF files using pdfplumber
 
+    With ?stream=true or "Accept: application/x-ndjson" the response is an
+    NDJSON stream: one {"type": "page", "page", "pages", "text", "char_count"}
+    record per page as it is extracted, then a {"type": "summary"} record.
+
+    With ?blocks=true the response also carries the page's structure as a
+    block stream (see document_blocks.py) that /chunk accepts as-is.
+
     Returns:
         - text: Extracted text content
         - pages: Number of pages in the PDF
+        - blocks: page_break, heading, list_item and paragraph blocks (?blocks=true)
         - success: Processing status
         - filename: Original filename
     """
@@ -108,48 +483,41 @@ async def extract_pdf(file: UploadFile = File(...)) -> JSONResponse:
         # Read file content
         content = await file.read()
 
-        # Process with pdfplumber
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            # Extract text from all pages
-            text_parts = []
-            for page_num, page in enumerate(pdf.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(f"--- Page {page_num} ---\n{page_text}")
-                except Exception as e:
-                    logger.warning(f"Error extracting page {page_num}: {str(e)}")
-                    continue
+        if _wants_stream(stream, accept):
+            return _ndjson_response(_stream_pdf_pages(content, file.filename), file.filename)
+
+        cache_key = extraction_cache.make_key(content, "extract/pdf", {"blocks": True} if blocks else None)
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
 
-            full_text = "\n\n".join(text_parts)
-            page_count = len(pdf.pages)
+        # Process with pdfplumber off the event loop
+        extracted = await _extract_pdf(content, blocks)
+        full_text = extracted["text"]
+        page_count = extracted["pages"]
 
         # Check if any text was extracted
         if not full_text.strip():
             logger.warning(f"No text extracted from PDF: {file.filename}. May be scanned/image-based.")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "text": "",
-                    "pages": page_count,
-                    "success": True,
-                    "warning": "No text extracted. This may be a scanned PDF. Try /extract/ocr endpoint.",
-                    "filename": file.filename
-                }
-            )
+            return _cache_response(cache_key, {
+                "text": "",
+                "pages": page_count,
+                **({"blocks": []} if blocks else {}),
+                "success": True,
+                "warning": "No text extracted. This may be a scanned PDF. Try /extract/ocr endpoint.",
+                "filename": file.filename
+            })
 
         logger.info(f"Successfully extracted {len(full_text)} characters from {page_count} pages")
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "text": full_text,
-                "pages": page_count,
-                "success": True,
-                "filename": file.filename,
-                "char_count": len(full_text)
-            }
-        )
+        return _cache_response(cache_key, {
+            "text": full_text,
+            "pages": page_count,
+            **({"blocks": extracted["blocks"]} if blocks else {}),
+            "success": True,
+            "filename": file.filename,
+            "char_count": len(full_text)
+        })
 
     except Exception as e:
         logger.error(f"Error processing PDF {file.filename}: {str(e)}\n{traceback.format_exc()}")
@@ -159,14 +527,91 @@ async def extract_pdf(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+def _table_rows_text(rows: List[List[str]]) -> List[str]:
+    """One 'cell | cell' line per non-empty table row"""
+    return [" | ".join(cell.replace("\n", " ") for cell in cells) for cells in rows if any(cells)]
+
+
+def _extract_docx_text(content: bytes, blocks: bool = False) -> Dict[str, Any]:
+    """
+    Extract heading, paragraph and table text and blocks from DOCX bytes in
+    body order (runs in the parse pool)
+
+    The block stream needs the stream parser, so blocks=True ignores
+    DOCX_PARSER=python-docx.
+    """
+    if DOCX_PARSER == 'python-docx' and not blocks:
+        return _extract_docx_text_dom(content)
+
+    builder = BlockTextBuilder()
+    paragraphs = 0
+    headings = 0
+    tables = 0
+    for block in iter_docx_blocks(content):
+        if block["type"] == "table":
+            builder.append("table", "\n".join(_table_rows_text(block["rows"])))
+            tables += 1
+            continue
+
+        paragraphs += 1
+        if block["type"] == "heading":
+            builder.append("heading", block["text"], level=block["level"])
+            headings += 1
+        elif "list_level" in block:
+            builder.append("list_item", block["text"], level=block["list_level"])
+        else:
+            builder.append("paragraph", block["text"])
+
+    return {
+        "text": builder.text,
+        "paragraphs": paragraphs,
+        "headings": headings,
+        "tables": tables,
+        "blocks": builder.blocks
+    }
+
+
+def _extract_docx_text_dom(content: bytes) -> Dict[str, Any]:
+    """Extract paragraph text, then table rows, through python-docx's document model"""
+    doc = DocxDocument(io.BytesIO(content))
+
+    # Extract text from paragraphs
+    paragraphs = []
+    for para in doc.paragraphs:
+        if para.text.strip():
+            paragraphs.append(para.text)
+
+    # Extract text from tables
+    table_texts = []
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = " | ".join(cell.text.strip() for cell in row.cells)
+            if row_text.strip():
+                table_texts.append(row_text)
+
+    # Combine all text
+    full_text = "\n\n".join(paragraphs)
+    if table_texts:
+        full_text += "\n\n--- Tables ---\n" + "\n".join(table_texts)
+
+    return {"text": full_text, "paragraphs": len(paragraphs), "tables": len(table_texts)}
+
+
 @app.post("/extract/docx")
-async def extract_docx(file: UploadFile = File(...)) -> JSONResponse:
+async def extract_docx(file: UploadFile = File(...), blocks: bool = False) -> JSONResponse:
     """
-    Extract text from DOCX files using python-docx
+    Extract text from DOCX files
+
+    Headings, paragraphs and tables (one "cell | cell" line per row) are
+    returned in document order, read incrementally from the DOCX XML
+    (DOCX_PARSER=python-docx restores the python-docx extraction).
 
     Returns:
         - text: Extracted text content
-        - paragraphs: Number of paragraphs
+        - paragraphs: Number of paragraphs (including headings)
+        - headings: Number of headings
+        - tables: Number of tables
+        - blocks: heading, paragraph, list_item and table blocks (?blocks=true)
         - success: Processing status
         - filename: Original filename
     """
@@ -176,54 +621,38 @@ async def extract_docx(file: UploadFile = File(...)) -> JSONResponse:
         # Read file content
         content = await file.read()
 
-        # Process with python-docx
-        doc = DocxDocument(io.BytesIO(content))
-
-        # Extract text from paragraphs
-        paragraphs = []
-        for para in doc.paragraphs:
-            if para.text.strip():
-                paragraphs.append(para.text)
-
-        # Extract text from tables
-        table_texts = []
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                if row_text.strip():
-                    table_texts.append(row_text)
+        cache_key = extraction_cache.make_key(content, "extract/docx", {"blocks": True} if blocks else None)
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
 
-        # Combine all text
-        full_text = "\n\n".join(paragraphs)
-        if table_texts:
-            full_text += "\n\n--- Tables ---\n" + "\n".join(table_texts)
+        # Parse off the event loop
+        extracted = await run_in_pool('parse', _extract_docx_text, content, blocks)
+        full_text = extracted["text"]
 
         if not full_text.strip():
             logger.warning(f"No text extracted from DOCX: {file.filename}")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "text": "",
-                    "paragraphs": 0,
-                    "success": True,
-                    "warning": "No text content found in document",
-                    "filename": file.filename
-                }
-            )
+            return _cache_response(cache_key, {
+                "text": "",
+                "paragraphs": 0,
+                **({"blocks": []} if blocks else {}),
+                "success": True,
+                "warning": "No text content found in document",
+                "filename": file.filename
+            })
 
-        logger.info(f"Successfully extracted {len(full_text)} characters from {len(paragraphs)} paragraphs")
+        logger.info(f"Successfully extracted {len(full_text)} characters from {extracted['paragraphs']} paragraphs")
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "text": full_text,
-                "paragraphs": len(paragraphs),
-                "tables": len(table_texts),
-                "success": True,
-                "filename": file.filename,
-                "char_count": len(full_text)
-            }
-        )
+        return _cache_response(cache_key, {
+            "text": full_text,
+            "paragraphs": extracted["paragraphs"],
+            "headings": extracted.get("headings", 0),
+            "tables": extracted["tables"],
+            **({"blocks": extracted["blocks"]} if blocks else {}),
+            "success": True,
+            "filename": file.filename,
+            "char_count": len(full_text)
+        })
 
     except Exception as e:
         logger.error(f"Error processing DOCX {file.filename}: {str(e)}\n{traceback.format_exc()}")
@@ -233,14 +662,74 @@ async def extract_docx(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+_PPTX_TITLE_PLACEHOLDERS = (PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.VERTICAL_TITLE)
+# Placeholders whose paragraphs are bullets by default
+_PPTX_BODY_PLACEHOLDERS = (
+    PP_PLACEHOLDER.BODY, PP_PLACEHOLDER.OBJECT, PP_PLACEHOLDER.VERTICAL_BODY, PP_PLACEHOLDER.VERTICAL_OBJECT
+)
+
+
+def _pptx_shape_blocks(shape) -> List[PendingBlock]:
+    """Blocks of one slide shape: the title as a heading, body paragraphs as list items, table rows"""
+    blocks: List[PendingBlock] = []
+
+    if hasattr(shape, "text") and shape.text.strip():
+        placeholder = shape.placeholder_format.type if shape.is_placeholder else None
+        if placeholder in _PPTX_TITLE_PLACEHOLDERS:
+            blocks.append(("heading", shape.text.strip(), {"level": 1}))
+        elif shape.has_text_frame:
+            bulleted = placeholder in _PPTX_BODY_PLACEHOLDERS
+            for paragraph in shape.text_frame.paragraphs:
+                paragraph_text = paragraph.text.strip()
+                if not paragraph_text:
+                    continue
+                if bulleted or paragraph.level > 0:
+                    blocks.append(("list_item", paragraph_text, {"level": paragraph.level}))
+                else:
+                    blocks.append(("paragraph", paragraph_text, {}))
+        else:
+            blocks.append(("paragraph", shape.text.strip(), {}))
+
+    # Extract text from tables in slides
+    if shape.has_table:
+        rows = []
+        for row in shape.table.rows:
+            row_text = " | ".join(cell.text.strip() for cell in row.cells)
+            if row_text.strip():
+                rows.append(row_text)
+        if rows:
+            blocks.append(("table", "\n".join(rows), {}))
+
+    return blocks
+
+
+def _extract_pptx_text(content: bytes) -> Dict[str, Any]:
+    """Extract slide-marked text and blocks from PPTX bytes (runs in the parse pool)"""
+    prs = Presentation(io.BytesIO(content))
+
+    # Extract text from all slides; a slide block spans each '--- Slide N ---' marker
+    builder = BlockTextBuilder()
+    for slide_num, slide in enumerate(prs.slides, 1):
+        slide_blocks = [block for shape in slide.shapes for block in _pptx_shape_blocks(shape)]
+        if not slide_blocks:
+            continue
+
+        builder.append("slide", f"--- Slide {slide_num} ---", slide_number=slide_num)
+        for block_type, text, fields in slide_blocks:
+            builder.append(block_type, text, separator="\n", slide_number=slide_num, **fields)
+
+    return {"text": builder.text, "slides": len(prs.slides), "blocks": builder.blocks}
+
+
 @app.post("/extract/pptx")
-async def extract_pptx(file: UploadFile = File(...)) -> JSONResponse:
+async def extract_pptx(file: UploadFile = File(...), blocks: bool = False) -> JSONResponse:
     """
     Extract text from PPTX files using python-pptx
 
     Returns:
         - text: Extracted text content from all slides
         - slides: Number of slides
+        - blocks: slide, heading, list_item, paragraph and table blocks (?blocks=true)
         - success: Processing status
         - filename: Original filename
     """
@@ -250,58 +739,37 @@ async def extract_pptx(file: UploadFile = File(...)) -> JSONResponse:
         # Read file content
         content = await file.read()
 
-        # Process with python-pptx
-        prs = Presentation(io.BytesIO(content))
-
-        # Extract text from all slides
-        slide_texts = []
-        for slide_num, slide in enumerate(prs.slides, 1):
-            slide_content = []
+        cache_key = extraction_cache.make_key(content, "extract/pptx", {"blocks": True} if blocks else None)
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
 
-            # Extract text from all shapes in the slide
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    slide_content.append(shape.text.strip())
-
-                # Extract text from tables in slides
-                if shape.has_table:
-                    table = shape.table
-                    for row in table.rows:
-                        row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                        if row_text.strip():
-                            slide_content.append(row_text)
-
-            if slide_content:
-                slide_text = f"--- Slide {slide_num} ---\n" + "\n".join(slide_content)
-                slide_texts.append(slide_text)
-
-        full_text = "\n\n".join(slide_texts)
+        # Process with python-pptx off the event loop
+        extracted = await run_in_pool('parse', _extract_pptx_text, content)
+        full_text = extracted["text"]
+        slide_count = extracted["slides"]
 
         if not full_text.strip():
             logger.warning(f"No text extracted from PPTX: {file.filename}")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "text": "",
-                    "slides": len(prs.slides),
-                    "success": True,
-                    "warning": "No text content found in presentation",
-                    "filename": file.filename
-                }
-            )
+            return _cache_response(cache_key, {
+                "text": "",
+                "slides": slide_count,
+                **({"blocks": []} if blocks else {}),
+                "success": True,
+                "warning": "No text content found in presentation",
+                "filename": file.filename
+            })
 
-        logger.info(f"Successfully extracted {len(full_text)} characters from {len(prs.slides)} slides")
+        logger.info(f"Successfully extracted {len(full_text)} characters from {slide_count} slides")
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "text": full_text,
-                "slides": len(prs.slides),
-                "success": True,
-                "filename": file.filename,
-                "char_count": len(full_text)
-            }
-        )
+        return _cache_response(cache_key, {
+            "text": full_text,
+            "slides": slide_count,
+            **({"blocks": extracted["blocks"]} if blocks else {}),
+            "success": True,
+            "filename": file.filename,
+            "char_count": len(full_text)
+        })
 
     except Exception as e:
         logger.error(f"Error processing PPTX {file.filename}: {str(e)}\n{traceback.format_exc()}")
@@ -311,53 +779,109 @@ async def extract_pptx(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+def _table_candidate_pages(content: bytes) -> Tuple[int, List[int]]:
+    """Page count and the pages that pass the table prefilter"""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return len(pdf.pages), find_table_candidate_pages(pdf)
+
+
+async def _extract_tables(content: bytes, formats: Tuple[str, ...] = (),
+                         max_group_tokens: int = 0) -> List[Dict[str, Any]]:
+    """
+    Extract tables from the pages that pass the table prefilter, as Markdown
+    plus any structured formats (see table_extractor.structure_table)
+
+    With at least TABLE_PARALLEL_MIN_PAGES candidate pages, detection is split
+    across the pdf_pages process pool and merged back in page order.
+    """
+    page_count, candidates = await run_in_pool('parse', _table_candidate_pages, content)
+    logger.info(f"Table candidates: {len(candidates)} of {page_count} pages")
+    if not candidates:
+        return []
+
+    page_pool = get_pool('pdf_pages')
+    if page_pool.max_workers < 2 or len(candidates) < TABLE_PARALLEL_MIN_PAGES:
+        return await run_in_pool('parse', extract_tables_from_pdf, content, candidates, formats, max_group_tokens)
+
+    groups = _page_groups(candidates, page_pool.max_workers)
+    with _temp_pdf(content, 'tables_') as pdf_path:
+        group_results = await asyncio.gather(*(
+            page_pool.run(extract_tables_from_pages, pdf_path, group, formats, max_group_tokens)
+            for group in groups
+        ))
+    return [table for group_result in group_results for table in group_result]
+
+
 @app.post("/extract-tables")
-async def extract_tables(file: UploadFile = File(...)) -> JSONResponse:
+async def extract_tables(
+    file: UploadFile = File(...),
+    formats: Optional[str] = None,
+    max_group_tokens: int = 0
+) -> JSONResponse:
     """
     TASK B: Extract tables from PDF and convert to Markdown format
 
     This endpoint extracts all tables from a PDF document and returns them
     as Markdown-formatted text, which is more suitable for embedding and RAG.
 
+    Query Args:
+        formats: Comma-separated structured formats to add per table:
+            grid (cell matrix), columns (column arrays, numbers parsed) and/or csv
+        max_group_tokens: Also split each table into row groups of at most
+            this many tokens, header row repeated in each (0 = off)
+
     Returns:
         - tables: List of extracted tables with page numbers and Markdown format
+          (plus has_header and the requested formats / row_groups)
         - total_tables: Number of tables found
         - success: Processing status
         - filename: Original filename
     """
     logger.info(f"Extracting tables from PDF: {file.filename}")
 
+    requested_formats = sorted({name.strip().lower() for name in (formats or '').split(',') if name.strip()})
+    unknown = [name for name in requested_formats if name not in TABLE_FORMATS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported table format: {', '.join(unknown)}. Supported: {', '.join(TABLE_FORMATS)}"
+        )
+    if max_group_tokens < 0:
+        raise HTTPException(status_code=400, detail="max_group_tokens must be positive or 0")
+
     try:
         # Read file content
         content = await file.read()
 
+        cache_key = extraction_cache.make_key(content, "extract-tables", {
+            "formats": requested_formats,
+            "max_group_tokens": max_group_tokens
+        } if requested_formats or max_group_tokens else None)
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
+
         # Extract tables using our table_extractor module
-        extracted_tables = extract_tables_from_pdf(content)
+        extracted_tables = await _extract_tables(content, tuple(requested_formats), max_group_tokens)
 
         if not extracted_tables:
             logger.info(f"No tables found in PDF: {file.filename}")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "tables": [],
-                    "total_tables": 0,
-                    "success": True,
-                    "message": "No tables found in document",
-                    "filename": file.filename
-                }
-            )
+            return _cache_response(cache_key, {
+                "tables": [],
+                "total_tables": 0,
+                "success": True,
+                "message": "No tables found in document",
+                "filename": file.filename
+            })
 
         logger.info(f"Successfully extracted {len(extracted_tables)} tables from {file.filename}")
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "tables": extracted_tables,
-                "total_tables": len(extracted_tables),
-                "success": True,
-                "filename": file.filename
-            }
-        )
+        return _cache_response(cache_key, {
+            "tables": extracted_tables,
+            "total_tables": len(extracted_tables),
+            "success": True,
+            "filename": file.filename
+        })
 
     except Exception as e:
         logger.error(f"Error extracting tables from {file.filename}: {str(e)}\n{traceback.format_exc()}")
@@ -367,6 +891,96 @@ async def extract_tables(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+def _prepare_ocr_image(image: Image.Image) -> Image.Image:
+    """Normalize mode and cap the size of an image before OCR"""
+    # Convert to RGB if necessary (for RGBA or other formats)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    # Resize if image is too large
+    max_dimension = 3000
+    if max(image.size) > max_dimension:
+        ratio = max_dimension / max(image.size)
+        new_size = tuple(int(dim * ratio) for dim in image.size)
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+        logger.info(f"Resized image to {new_size}")
+
+    return image
+
+
+def _ocr_lines(ocr_data: Dict[str, List]) -> Tuple[List[Dict[str, Any]], List[float]]:
+    """
+    Group Tesseract word rows (image_to_data) into text lines
+
+    Returns:
+        Lines in reading order, each with its text, mean word confidence,
+        pixel bbox [left, top, right, bottom] and (block, paragraph) ids;
+        and the confidences of all recognized words
+    """
+    lines: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+    for i, word in enumerate(ocr_data['text']):
+        # Level 5 rows are words; the other levels only carry layout boxes
+        if ocr_data['level'][i] != 5 or not str(word).strip():
+            continue
+
+        key = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
+        left, top = ocr_data['left'][i], ocr_data['top'][i]
+        right, bottom = left + ocr_data['width'][i], top + ocr_data['height'][i]
+
+        line = lines.get(key)
+        if line is None:
+            line = lines[key] = {"words": [], "confidences": [], "bbox": [left, top, right, bottom]}
+        else:
+            bbox = line["bbox"]
+            line["bbox"] = [min(bbox[0], left), min(bbox[1], top), max(bbox[2], right), max(bbox[3], bottom)]
+
+        line["words"].append(str(word).strip())
+        if ocr_data['conf'][i] != -1:
+            line["confidences"].append(float(ocr_data['conf'][i]))
+
+    grouped = [
+        {
+            "text": " ".join(line["words"]),
+            "confidence": round(sum(line["confidences"]) / len(line["confidences"]), 2) if line["confidences"] else None,
+            "bbox": line["bbox"],
+            "block": block_num,
+            "paragraph": par_num
+        }
+        for (block_num, par_num, _), line in lines.items()
+    ]
+    return grouped, [conf for line in lines.values() for conf in line["confidences"]]
+
+
+def _ocr_image(image: Image.Image) -> Dict[str, Any]:
+    """
+    Run Tesseract once on a prepared image (runs in the OCR pool)
+
+    Text, confidence and line boxes are all rebuilt from a single
+    recognition pass of the configured OCR backend.
+    """
+    ocr_data = get_ocr_backend().image_to_data(image, lang='eng')
+    lines, confidences = _ocr_lines(ocr_data)
+
+    # Lines of a paragraph are newline-separated, paragraphs blank-line separated
+    text_parts = []
+    previous_paragraph = None
+    for line in lines:
+        paragraph = (line["block"], line["paragraph"])
+        if text_parts:
+            text_parts.append("\n" if paragraph == previous_paragraph else "\n\n")
+        text_parts.append(line["text"])
+        previous_paragraph = paragraph
+
+    confidence = sum(confidences) / len(confidences) if confidences else 0
+
+    return {"text": "".join(text_parts), "confidence": confidence, "image_size": image.size, "lines": lines}
+
+
+def _ocr_image_bytes(content: bytes) -> Dict[str, Any]:
+    """Decode, prepare and OCR an uploaded image (runs in the OCR pool)"""
+    return _ocr_image(_prepare_ocr_image(Image.open(io.BytesIO(content))))
+
+
 @app.post("/extract/ocr")
 async def extract_image_ocr(file: UploadFile = File(...)) -> JSONResponse:
     """
@@ -376,12 +990,21 @@ async def extract_image_ocr(file: UploadFile = File(...)) -> JSONResponse:
     Returns:
         - text: Extracted text via OCR
         - confidence: OCR confidence score (if available)
+        - lines: Text lines with confidence and pixel bbox [left, top, right, bottom]
         - success: Processing status
         - filename: Original filename
     """
     logger.info(f"Processing image with OCR: {file.filename}")
 
     try:
+        # Read file content
+        content = await file.read()
+
+        cache_key = extraction_cache.make_key(content, "extract/ocr")
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
+
         # Check if Tesseract is available
         if not _check_tesseract():
             raise HTTPException(
@@ -389,48 +1012,20 @@ async def extract_image_ocr(file: UploadFile = File(...)) -> JSONResponse:
                 detail="Tesseract OCR is not available. Please install Tesseract-OCR."
             )
 
-        # Read file content
-        content = await file.read()
-
-        # Open image with PIL
-        image = Image.open(io.BytesIO(content))
-
-        # Convert to RGB if necessary (for RGBA or other formats)
-        if image.mode not in ('RGB', 'L'):
-            image = image.convert('RGB')
-
-        # Enhance image for better OCR (optional preprocessing)
-        # Resize if image is too large
-        max_dimension = 3000
-        if max(image.size) > max_dimension:
-            ratio = max_dimension / max(image.size)
-            new_size = tuple(int(dim * ratio) for dim in image.size)
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
-            logger.info(f"Resized image to {new_size}")
-
-        # Perform OCR
+        # Perform OCR off the event loop
         logger.info("Running Tesseract OCR...")
-        text = pytesseract.image_to_string(image, lang='eng')
-
-        # Get OCR confidence data (optional)
-        try:
-            ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            confidences = [conf for conf in ocr_data['conf'] if conf != -1]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-        except Exception:
-            avg_confidence = None
+        ocr_result = await run_in_pool('ocr', _ocr_image_bytes, content)
+        text = ocr_result["text"]
+        avg_confidence = ocr_result["confidence"]
 
         if not text.strip():
             logger.warning(f"No text extracted from image: {file.filename}")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "text": "",
-                    "success": True,
-                    "warning": "No text detected in image",
-                    "filename": file.filename
-                }
-            )
+            return _cache_response(cache_key, {
+                "text": "",
+                "success": True,
+                "warning": "No text detected in image",
+                "filename": file.filename
+            })
 
         logger.info(f"Successfully extracted {len(text)} characters via OCR")
 
@@ -439,14 +1034,17 @@ async def extract_image_ocr(file: UploadFile = File(...)) -> JSONResponse:
             "success": True,
             "filename": file.filename,
             "char_count": len(text),
-            "image_size": image.size
+            "image_size": ocr_result["image_size"],
+            "lines": ocr_result["lines"]
         }
 
         if avg_confidence is not None:
             result["confidence"] = round(avg_confidence, 2)
 
-        return JSONResponse(status_code=200, content=result)
+        return _cache_response(cache_key, result)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing image {file.filename}: {str(e)}\n{traceback.format_exc()}")
         raise HTTPException(
@@ -455,13 +1053,42 @@ async def extract_image_ocr(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers etag (weak comparison, '*' matches anything)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def _converted_pdf_response(pdf_bytes: bytes, pdf_filename: str, cache_key: str, cache_status: str) -> Response:
+    return Response(
+        content=pdf_bytes,
+        media_type='application/pdf',
+        headers={
+            'Content-Disposition': f'attachment; filename="{pdf_filename}"',
+            'ETag': f'"{cache_key}"',
+            # The URL is derived from the deck's content, so it never changes
+            'Cache-Control': 'private, max-age=31536000, immutable',
+            'Content-Location': f"/convert/pdf/{cache_key}",
+            'X-Cache': cache_status
+        }
+    )
+
+
 @app.post("/convert/pptx-to-pdf")
-async def convert_pptx_to_pdf(file: UploadFile = File(...)):
+async def convert_pptx_to_pdf(file: UploadFile = File(...), if_none_match: Optional[str] = Header(None)):
     """
     Convert PPTX to PDF using LibreOffice headless mode
 
     This preserves formatting and allows text selection in the browser.
-    Requires LibreOffice to be installed on the system.
+    Requires LibreOffice to be installed on the system. Conversions run on
+    a pool of long-lived LibreOffice instances (see libreoffice_pool.py).
+
+    Converted PDFs are cached by the deck's content hash, which is also the
+    response ETag: a repeat upload is served without LibreOffice, a matching
+    If-None-Match gets 304, and GET /convert/pdf/{etag} re-fetches the PDF
+    without uploading the deck again.
 
     Returns:
         - PDF file as bytes
@@ -469,109 +1096,42 @@ async def convert_pptx_to_pdf(file: UploadFile = File(...)):
     """
     logger.info(f"Converting PPTX to PDF: {file.filename}")
 
-    import subprocess
-    import shutil
-
-    # Check if LibreOffice is available
-    libreoffice_paths = []
-    if os.name == 'nt':  # Windows
-        libreoffice_paths = [
-            r"C:\Program Files\LibreOffice\program\soffice.exe",
-            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
-            r"C:\Program Files\LibreOffice\program\soffice.com",
-        ]
-    else:  # Linux/Mac
-        libreoffice_paths = [
-            "/usr/bin/soffice",
-            "/usr/bin/libreoffice",
-            "/Applications/LibreOffice.app/Contents/MacOS/soffice"
-        ]
-
-    # Find LibreOffice executable
-    soffice_path = None
-    for path in libreoffice_paths:
-        if os.path.exists(path):
-            soffice_path = path
-            break
-    else:
-        # Try finding in PATH
-        soffice_path = shutil.which('soffice') or shutil.which('libreoffice')
-
-    if not soffice_path:
-        logger.warning("LibreOffice not found. PPTX to PDF conversion unavailable.")
-        raise HTTPException(
-            status_code=503,
-            detail="LibreOffice is not installed. Cannot convert PPTX to PDF. Please install LibreOffice or use the text extraction endpoint."
-        )
-
     try:
-        # Create temporary directory for conversion
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded PPTX to temp file
-            pptx_path = os.path.join(temp_dir, file.filename)
-            with open(pptx_path, 'wb') as f:
-                content = await file.read()
-                f.write(content)
-
-            logger.info(f"Saved PPTX to: {pptx_path}")
-
-            # Convert PPTX to PDF using LibreOffice
-            # --headless: run without GUI
-            # --convert-to pdf: convert to PDF format
-            # --outdir: output directory
-            cmd = [
-                soffice_path,
-                '--headless',
-                '--convert-to', 'pdf',
-                '--outdir', temp_dir,
-                pptx_path
-            ]
-
-            logger.info(f"Running LibreOffice conversion: {' '.join(cmd)}")
-
-            # Run conversion with timeout
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60  # 60 second timeout
-            )
+        content = await file.read()
+        pdf_filename = Path(file.filename).stem + '.pdf'
 
-            if process.returncode != 0:
-                logger.error(f"LibreOffice conversion failed: {process.stderr}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"PDF conversion failed: {process.stderr}"
-                )
+        cache_key = conversion_cache.make_key(content, "convert/pptx-to-pdf")
+        etag = f'"{cache_key}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={'ETag': etag})
 
-            # Find generated PDF file
-            pdf_filename = Path(file.filename).stem + '.pdf'
-            pdf_path = os.path.join(temp_dir, pdf_filename)
+        pdf_bytes = conversion_cache.get(cache_key)
+        if pdf_bytes is not None:
+            logger.info(f"⚡ Serving cached PDF for {file.filename}")
+            return _converted_pdf_response(pdf_bytes, pdf_filename, cache_key, 'HIT')
 
-            if not os.path.exists(pdf_path):
-                logger.error(f"PDF file not generated: {pdf_path}")
-                raise HTTPException(
-                    status_code=500,
-                    detail="PDF conversion failed - output file not found"
-                )
+        # Check if LibreOffice is available
+        soffice_path = capabilities.get('libreoffice').get('path') if capabilities.available('libreoffice') else None
+
+        if not soffice_path:
+            logger.warning("LibreOffice not found. PPTX to PDF conversion unavailable.")
+            raise HTTPException(
+                status_code=503,
+                detail="LibreOffice is not installed. Cannot convert PPTX to PDF. Please install LibreOffice or use the text extraction endpoint."
+            )
 
-            # Read PDF file
-            with open(pdf_path, 'rb') as pdf_file:
-                pdf_bytes = pdf_file.read()
+        # Waits for an idle LibreOffice instance without blocking the event loop
+        pdf_bytes = await get_libreoffice_pool(soffice_path).convert(file.filename, content)
 
-            logger.info(f"Successfully converted PPTX to PDF: {len(pdf_bytes)} bytes")
+        logger.info(f"Successfully converted PPTX to PDF: {len(pdf_bytes)} bytes")
+        conversion_cache.set(cache_key, pdf_bytes)
 
-            # Return PDF as response
-            from fastapi.responses import Response
-            return Response(
-                content=pdf_bytes,
-                media_type='application/pdf',
-                headers={
-                    'Content-Disposition': f'attachment; filename="{pdf_filename}"'
-                }
-            )
+        # Return PDF as response
+        return _converted_pdf_response(pdf_bytes, pdf_filename, cache_key, 'MISS')
 
-    except subprocess.TimeoutExpired:
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
         logger.error("LibreOffice conversion timeout")
         raise HTTPException(
             status_code=500,
@@ -585,62 +1145,358 @@ async def convert_pptx_to_pdf(file: UploadFile = File(...)):
         )
 
 
+@app.get("/convert/pdf/{etag}")
+async def get_converted_pdf(etag: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Fetch a previously converted PDF by the ETag returned from /convert/pptx-to-pdf
+
+    Answers 304 when If-None-Match already holds it and 404 once it has been
+    evicted from the cache (convert the deck again).
+    """
+    quoted_etag = f'"{etag}"'
+    if _etag_matches(if_none_match, quoted_etag):
+        return Response(status_code=304, headers={'ETag': quoted_etag})
+
+    pdf_bytes = conversion_cache.get(etag)
+    if pdf_bytes is None:
+        raise HTTPException(status_code=404, detail="Converted PDF not found or expired. Convert the file again.")
+    return _converted_pdf_response(pdf_bytes, f"{etag[:12]}.pdf", etag, 'HIT')
+
+
+IMAGE_EXTRACTION_MODES = ('embedded', 'render')
+# 'original' keeps JPEGs as stored and everything else as PNG
+ARTIFACT_IMAGE_FORMATS = ('original', 'webp', 'jpeg')
+_ARTIFACT_MEDIA_TYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'webp': 'image/webp'}
+
+# Colour spaces whose samples map straight onto a PIL mode at 8 bits per component
+_RAW_IMAGE_MODES = {'DeviceRGB': 'RGB', 'CalRGB': 'RGB', 'DeviceGray': 'L', 'CalGray': 'L', 'DeviceCMYK': 'CMYK'}
+_ICC_COMPONENT_SPACES = {1: 'DeviceGray', 3: 'DeviceRGB', 4: 'DeviceCMYK'}
+
+
+class _ImageDedup:
+    """Images already written for one document, by content hash and by PDF object id"""
+
+    def __init__(self):
+        self.by_hash: Dict[str, Dict[str, Any]] = {}
+        self.by_object: Dict[int, Dict[str, Any]] = {}
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _colorspace_family(img: Dict[str, Any]) -> Optional[str]:
+    """Base colour space name of a pdfplumber image (ICCBased resolved by component count)"""
+    from pdfminer.pdftypes import resolve1
+
+    colorspace = img.get('colorspace') or []
+    space = resolve1(colorspace[0]) if colorspace else None
+    if isinstance(space, list) and space:
+        family = getattr(resolve1(space[0]), 'name', None)
+        if family == 'ICCBased' and len(space) > 1:
+            return _ICC_COMPONENT_SPACES.get(resolve1(space[1]).get('N'))
+        return family
+    return getattr(space, 'name', None)
+
+
+def _decode_embedded_image(img: Dict[str, Any]) -> Optional[Tuple[bytes, str, Tuple[int, int]]]:
+    """
+    Encoded bytes, file extension and pixel size of an image XObject, read
+    from its stream without rasterizing the page
+
+    JPEGs are returned as stored; other supported images are re-encoded as
+    PNG. Returns None for images that have to be rendered instead (masks,
+    indexed/separation colour, JBIG2/CCITT, unusual bit depths).
+    """
+    stream = img['stream']
+    if stream.get('ImageMask'):
+        return None
+
+    filters = [getattr(name, 'name', str(name)) for name, _ in stream.get_filters()]
+    last_filter = filters[-1] if filters else None
+    if last_filter in ('JBIG2Decode', 'CCITTFaxDecode'):
+        return None
+
+    # pdfminer undoes Flate/LZW/predictors and passes DCT/JPX payloads through
+    data = stream.get_data()
+
+    if last_filter in ('DCTDecode', 'JPXDecode'):
+        image = Image.open(io.BytesIO(data))
+        if last_filter == 'DCTDecode' and image.mode in ('RGB', 'L'):
+            return data, 'jpg', image.size
+        # CMYK JPEGs and JPEG 2000 are not viewable everywhere; normalize to PNG
+        return _encode_png(image.convert('RGB')), 'png', image.size
+
+    family = _colorspace_family(img)
+    bits = img.get('bits')
+    if bits == 1 and family in ('DeviceGray', 'CalGray'):
+        mode = '1'
+    elif bits == 8 and family in _RAW_IMAGE_MODES:
+        mode = _RAW_IMAGE_MODES[family]
+    else:
+        return None
+
+    width, height = (int(dim) for dim in img['srcsize'])
+    image = Image.frombytes(mode, (width, height), data)
+    if mode == 'CMYK':
+        image = image.convert('RGB')
+    return _encode_png(image), 'png', image.size
+
+
+def _crop_page_render(page, page_render: Image.Image, img: Dict[str, Any], resolution: int) -> Optional[Image.Image]:
+    """Cut an image's bbox (PDF points) out of a page render, clipped to the page"""
+    scale = resolution / 72
+    page_x0, page_top = page.bbox[0], page.bbox[1]
+    left = max(0, int((img['x0'] - page_x0) * scale))
+    upper = max(0, int((img['top'] - page_top) * scale))
+    right = min(page_render.width, int(round((img['x1'] - page_x0) * scale)))
+    lower = min(page_render.height, int(round((img['bottom'] - page_top) * scale)))
+    if right <= left or lower <= upper:
+        return None
+    return page_render.crop((left, upper, right, lower))
+
+
+def _encode_artifact_image(data: bytes, extension: str, image_format: str,
+                           max_size: Optional[int] = None) -> Tuple[bytes, str]:
+    """
+    Re-encode extracted image bytes for the artifact store
+
+    Args:
+        data: Image bytes as extracted (JPEG or PNG)
+        extension: Their file extension
+        image_format: One of ARTIFACT_IMAGE_FORMATS
+        max_size: Shrink to fit a max_size x max_size box (thumbnails)
+
+    Returns:
+        Encoded bytes and file extension
+    """
+    if image_format == 'original' and not max_size:
+        return data, extension
+
+    image = Image.open(io.BytesIO(data))
+    if max_size:
+        image.thumbnail((max_size, max_size))
+    if image_format == 'original':
+        image_format = 'jpeg' if extension == 'jpg' else 'png'
+
+    buffer = io.BytesIO()
+    if image_format == 'png':
+        image.save(buffer, 'PNG')
+        return buffer.getvalue(), 'png'
+
+    has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+    if image_format == 'webp':
+        image.convert('RGBA' if has_alpha else 'RGB').save(buffer, 'WEBP', quality=ARTIFACT_IMAGE_QUALITY)
+        return buffer.getvalue(), 'webp'
+
+    image.convert('L' if image.mode in ('1', 'L', 'LA') else 'RGB').save(
+        buffer, 'JPEG', quality=ARTIFACT_IMAGE_QUALITY, optimize=True
+    )
+    return buffer.getvalue(), 'jpg'
+
+
+class _ArtifactImageWriter:
+    """
+    Encodes each extracted image (and its thumbnail) for the artifact store
+    namespace of a document
+
+    Called with a file stem, the image bytes and their extension, it returns
+    the record fields pointing at the artifact. The encoded files are only
+    collected in `files`; the service process writes them with
+    _store_artifact_files, since the parse pool may be a process pool whose
+    workers must not update the store's index.
+    """
+
+    def __init__(self, namespace: str, image_format: str = 'original', thumbnail_size: int = 0):
+        self.namespace = namespace
+        self.image_format = image_format
+        self.thumbnail_size = thumbnail_size
+        self.files: List[Tuple[str, bytes]] = []
+
+    def _add(self, name: str, data: bytes) -> Dict[str, Any]:
+        self.files.append((name, data))
+        return artifact_store.describe(self.namespace, name, len(data))
+
+    def __call__(self, stem: str, data: bytes, extension: str) -> Dict[str, Any]:
+        encoded, encoded_extension = _encode_artifact_image(data, extension, self.image_format)
+        stored = self._add(f"{stem}.{encoded_extension}", encoded)
+        fields = {
+            "imagePath": stored["path"],
+            "artifactId": stored["id"],
+            "url": stored["url"],
+            "format": encoded_extension,
+            "bytes": stored["bytes"]
+        }
+        if self.thumbnail_size:
+            thumb, thumb_extension = _encode_artifact_image(data, extension, self.image_format,
+                                                            max_size=self.thumbnail_size)
+            stored = self._add(f"{stem}_thumb{self.thumbnail_size}.{thumb_extension}", thumb)
+            fields["thumbnail"] = {"artifactId": stored["id"], "url": stored["url"], "bytes": stored["bytes"]}
+        return fields
+
+
+async def _store_artifact_files(namespace: str, files: List[Tuple[str, bytes]]) -> None:
+    """Write the files collected by an _ArtifactImageWriter into the artifact store"""
+    def store() -> None:
+        for name, data in files:
+            artifact_store.put(namespace, name, data)
+
+    await asyncio.get_running_loop().run_in_executor(None, store)
+
+
+def _extract_page_images(page, write_image: Callable[[str, bytes, str], Dict[str, Any]], resolution: int = 150,
+                         mode: str = 'embedded', dedup: Optional[_ImageDedup] = None) -> List[Dict[str, Any]]:
+    """
+    Pass every image on a pdfplumber page to write_image
+
+    mode='embedded' writes each image XObject's own data without rasterizing.
+    Images it cannot decode, and all images in mode='render', are cropped from
+    a single render of the page. With a shared `dedup`, an image seen earlier
+    in the document (same object or same bytes) is not written again; its
+    existing record gains this page in pageNumbers.
+
+    Returns:
+        Records for images first seen on this page
+    """
+    page_num = page.page_number
+    extracted_images = []
+    dedup = dedup or _ImageDedup()
+
+    if not (hasattr(page, 'images') and page.images):
+        return extracted_images
+
+    page_render = None
+
+    for img_index, img in enumerate(page.images, 1):
+        try:
+            object_id = getattr(img.get('stream'), 'objid', None)
+            record = dedup.by_object.get(object_id) if mode == 'embedded' and object_id is not None else None
+
+            if record is None:
+                encoded = _decode_embedded_image(img) if mode == 'embedded' else None
+                source = 'embedded'
+                if encoded is None:
+                    if page_render is None:
+                        page_render = page.to_image(resolution=resolution).original
+                    crop = _crop_page_render(page, page_render, img, resolution)
+                    if crop is None:
+                        continue
+                    encoded = (_encode_png(crop), 'png', crop.size)
+                    source = 'render'
+
+                data, extension, (width, height) = encoded
+                digest = content_hash(data)
+                record = dedup.by_hash.get(digest)
+
+                if record is None:
+                    record = {
+                        "pageNumber": page_num,
+                        "imageIndex": img_index,
+                        "pageNumbers": [page_num],
+                        "width": width,
+                        "height": height,
+                        "format": extension,
+                        "source": source,
+                        "contentHash": digest
+                    }
+                    record.update(write_image(f"page_{page_num}_img_{img_index}", data, extension))
+                    dedup.by_hash[digest] = record
+                    extracted_images.append(record)
+                    logger.debug(f"Extracted image {img_index} from page {page_num} ({source})")
+
+                if source == 'embedded' and object_id is not None:
+                    dedup.by_object[object_id] = record
+
+            if page_num not in record["pageNumbers"]:
+                record["pageNumbers"].append(page_num)
+
+        except Exception as img_error:
+            logger.warning(f"Failed to extract image {img_index} from page {page_num}: {str(img_error)}")
+            continue
+
+    return extracted_images
+
+
+def _extract_pdf_images(content: bytes, write_image: _ArtifactImageWriter,
+                        mode: str = 'embedded') -> Tuple[List[Dict[str, Any]], List[Tuple[str, bytes]]]:
+    """
+    Encode every image in the PDF through write_image, once per distinct image (runs in the parse pool)
+
+    Returns:
+        (image records, artifact files to store)
+    """
+    extracted_images = []
+    dedup = _ImageDedup()
+
+    # Extract images using pdfplumber
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        for page in pdf.pages:
+            try:
+                extracted_images.extend(_extract_page_images(page, write_image, mode=mode, dedup=dedup))
+            except Exception as page_error:
+                logger.warning(f"Failed to extract images from page {page.page_number}: {str(page_error)}")
+            page.close()
+
+    return extracted_images, write_image.files
+
+
 @app.post("/extract-images")
-async def extract_images(file: UploadFile = File(...)) -> JSONResponse:
+async def extract_images(
+    file: UploadFile = File(...),
+    mode: str = 'embedded',
+    image_format: str = 'original',
+    thumbnail: int = 0
+) -> JSONResponse:
     """
-    Extract images from PDF files and save them to temporary files
+    Extract images from PDF files into the artifact store
+
+    Query Args:
+        mode: 'embedded' (default) saves each embedded image's own data
+            (JPEG as stored, otherwise PNG) without rasterizing, falling back
+            to a crop of the rendered page for images it cannot decode;
+            'render' crops every image from a 150 DPI page render
+        image_format: 'original' (default), 'webp' or 'jpeg'
+        thumbnail: Also store a thumbnail fitting this many pixels (0 = none)
+
+    Each distinct image is saved once; pageNumbers lists every page it appears on.
+    Images are fetched with GET /artifacts/{artifactId} (the `url` field) and
+    expire ARTIFACT_TTL_SECONDS after their document namespace was last used.
 
     Returns:
-        - images: List of extracted images with paths and page numbers
+        - images: List of extracted images with artifact ids, URLs, paths and page numbers
         - total_images: Number of images found
+        - namespace: Artifact namespace of this document
         - success: Processing status
         - filename: Original filename
     """
     logger.info(f"Extracting images from PDF: {file.filename}")
 
+    if mode not in IMAGE_EXTRACTION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported mode: {mode}. Supported: {', '.join(IMAGE_EXTRACTION_MODES)}"
+        )
+    if image_format not in ARTIFACT_IMAGE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image_format: {image_format}. Supported: {', '.join(ARTIFACT_IMAGE_FORMATS)}"
+        )
+    if thumbnail < 0:
+        raise HTTPException(status_code=400, detail="thumbnail must be a positive pixel size or 0")
+
     try:
         # Read file content
         content = await file.read()
 
-        # Create temporary directory for images
-        temp_dir = tempfile.mkdtemp(prefix='pdf_images_')
-        logger.info(f"Created temp directory: {temp_dir}")
+        # One namespace per document: re-extracting the same PDF overwrites its images
+        namespace = content_hash(content)[:32]
+        write_image = _ArtifactImageWriter(namespace, image_format, thumbnail)
 
-        extracted_images = []
-
-        # Extract images using pdfplumber
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                # Get images from page
-                if hasattr(page, 'images') and page.images:
-                    for img_index, img in enumerate(page.images, 1):
-                        try:
-                            # Extract image bbox
-                            x0, top, x1, bottom = img['x0'], img['top'], img['x1'], img['bottom']
-
-                            # Crop the image from page
-                            cropped_img = page.within_bbox((x0, top, x1, bottom))
-
-                            # Convert to PIL Image
-                            img_obj = cropped_img.to_image(resolution=150)
-                            pil_img = img_obj.original
-
-                            # Save image to temp file
-                            img_filename = f"page_{page_num}_img_{img_index}.png"
-                            img_path = os.path.join(temp_dir, img_filename)
-                            pil_img.save(img_path, 'PNG')
-
-                            extracted_images.append({
-                                "imagePath": img_path,
-                                "pageNumber": page_num,
-                                "imageIndex": img_index
-                            })
-
-                            logger.debug(f"Extracted image {img_index} from page {page_num}")
-
-                        except Exception as img_error:
-                            logger.warning(f"Failed to extract image {img_index} from page {page_num}: {str(img_error)}")
-                            continue
+        # Decode or crop images off the event loop, then store them from this process
+        extracted_images, files = await run_in_pool('parse', _extract_pdf_images, content, write_image, mode)
+        await _store_artifact_files(namespace, files)
 
         if not extracted_images:
             logger.info(f"No images found in PDF: {file.filename}")
@@ -655,16 +1511,17 @@ async def extract_images(file: UploadFile = File(...)) -> JSONResponse:
                 }
             )
 
-        logger.info(f"Successfully extracted {len(extracted_images)} images from {file.filename}")
+        logger.info(f"Successfully extracted {len(extracted_images)} images from {file.filename} into {namespace}")
 
         return JSONResponse(
             status_code=200,
             content={
                 "images": extracted_images,
                 "total_images": len(extracted_images),
+                "namespace": namespace,
                 "success": True,
                 "filename": file.filename,
-                "temp_dir": temp_dir
+                "temp_dir": os.path.join(artifact_store.root, namespace)
             }
         )
 
@@ -676,6 +1533,157 @@ async def extract_images(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+@app.get("/artifacts/{namespace}/{name}")
+async def get_artifact(namespace: str, name: str) -> FileResponse:
+    """Serve an image stored by /extract-images or /analyze/pdf"""
+    try:
+        path = artifact_store.get_path(namespace, name)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid artifact id")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found or expired")
+
+    media_type = _ARTIFACT_MEDIA_TYPES.get(Path(name).suffix.lstrip('.').lower(), 'application/octet-stream')
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": "private, max-age=3600"})
+
+
+@app.delete("/artifacts/{namespace}")
+async def delete_artifacts(namespace: str) -> Dict[str, Any]:
+    """Release every image of a document once the caller is done with them"""
+    try:
+        removed = artifact_store.delete_namespace(namespace)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid namespace")
+    return {"namespace": namespace, "deleted": removed, "success": True}
+
+
+def _analyze_pdf(content: bytes, include_text: bool, include_tables: bool,
+                 write_image: Optional[_ArtifactImageWriter]) -> Dict[str, Any]:
+    """
+    Walk every page of a PDF once, producing text, tables and images
+    from the same parsed page objects (runs in the parse pool)
+    """
+    page_texts = []
+    tables = []
+    images = []
+    image_dedup = _ImageDedup()
+
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        table_pages = set(find_table_candidate_pages(pdf)) if include_tables else set()
+
+        for page in pdf.pages:
+            if include_text:
+                page_texts.extend(_extract_page_texts([page]))
+
+            if page.page_number in table_pages:
+                try:
+                    tables.extend(extract_tables_from_page(page))
+                except Exception as e:
+                    logger.warning(f"Error extracting tables from page {page.page_number}: {str(e)}")
+
+            if write_image:
+                try:
+                    images.extend(_extract_page_images(page, write_image, dedup=image_dedup))
+                except Exception as e:
+                    logger.warning(f"Error extracting images from page {page.page_number}: {str(e)}")
+
+            # Drop this page's parsed layout objects before moving on
+            page.close()
+
+        page_count = len(pdf.pages)
+
+    return {
+        "text": _join_page_texts(page_texts),
+        "pages": page_count,
+        "tables": tables,
+        "images": images,
+        "artifact_files": write_image.files if write_image else []
+    }
+
+
+@app.post("/analyze/pdf")
+async def analyze_pdf(
+    file: UploadFile = File(...),
+    include_text: bool = True,
+    include_tables: bool = True,
+    include_images: bool = True
+) -> JSONResponse:
+    """
+    Single-pass PDF analysis: text, Markdown tables and images
+
+    Opens the document once and walks each page once, replacing separate
+    calls to /extract/pdf, /extract-tables and /extract-images.
+
+    Query Args:
+        include_text: Extract page text (default: true)
+        include_tables: Extract tables as Markdown (default: true)
+        include_images: Save embedded images to the artifact store (default: true)
+
+    Returns:
+        - text, pages, char_count: As returned by /extract/pdf (if include_text)
+        - tables, total_tables: As returned by /extract-tables (if include_tables)
+        - images, total_images, namespace: As returned by /extract-images (if include_images)
+        - success: Processing status
+        - filename: Original filename
+    """
+    logger.info(f"Analyzing PDF: {file.filename} (text={include_text}, tables={include_tables}, images={include_images})")
+
+    try:
+        # Read file content
+        content = await file.read()
+
+        # Stored images expire, so only text/table results are cacheable
+        cache_key = None
+        if not include_images:
+            cache_key = extraction_cache.make_key(content, "analyze/pdf", {
+                "text": include_text,
+                "tables": include_tables
+            })
+            cached = _cached_response(cache_key, file.filename)
+            if cached is not None:
+                return cached
+
+        namespace = content_hash(content)[:32] if include_images else None
+        write_image = _ArtifactImageWriter(namespace) if include_images else None
+
+        analysis = await run_in_pool('parse', _analyze_pdf, content, include_text, include_tables, write_image)
+        if include_images:
+            await _store_artifact_files(namespace, analysis["artifact_files"])
+
+        result = {
+            "pages": analysis["pages"],
+            "success": True,
+            "filename": file.filename
+        }
+        if include_text:
+            result["text"] = analysis["text"]
+            result["char_count"] = len(analysis["text"])
+        if include_tables:
+            result["tables"] = analysis["tables"]
+            result["total_tables"] = len(analysis["tables"])
+        if include_images:
+            result["images"] = analysis["images"]
+            result["total_images"] = len(analysis["images"])
+            result["namespace"] = namespace
+            result["temp_dir"] = os.path.join(artifact_store.root, namespace)
+
+        logger.info(
+            f"Analyzed {analysis['pages']} pages of {file.filename}: "
+            f"{len(analysis['text'])} chars, {len(analysis['tables'])} tables, {len(analysis['images'])} images"
+        )
+
+        if cache_key:
+            return _cache_response(cache_key, result)
+        return JSONResponse(status_code=200, content=result)
+
+    except Exception as e:
+        logger.error(f"Error analyzing PDF {file.filename}: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to analyze PDF: {str(e)}"
+        )
+
+
 @app.post("/extract/auto")
 async def extract_auto(file: UploadFile = File(...)) -> JSONResponse:
     """
@@ -690,7 +1698,7 @@ async def extract_auto(file: UploadFile = File(...)) -> JSONResponse:
 
     # Route to appropriate handler
     if file_ext == '.pdf':
-        return await extract_pdf(file)
+        return await extract_pdf(file, stream=False, accept=None)
     elif file_ext == '.docx':
         return await extract_docx(file)
     elif file_ext == '.pptx':
@@ -704,27 +1712,335 @@ async def extract_auto(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+def _pdf_native_page_texts(content: bytes) -> List[Tuple[int, str]]:
+    """(page number, text layer) for every PDF page; '' where a page has none"""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        page_texts = []
+        for page in pdf.pages:
+            page_texts.append((page.page_number, _extract_page_text(page) or ""))
+            page.close()
+        return page_texts
+
+
+class _ByteBudget:
+    """
+    Async admission control for page images held in memory
+
+    Waiters are admitted first come, first served. Releasing never awaits, so
+    it is safe from finally blocks and from tasks cancelled before they ran.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._waiters: "deque[Tuple[int, asyncio.Future]]" = deque()
+
+    def _fits(self, size: int) -> bool:
+        # An empty pipeline always admits one window, even an oversized one
+        return self.used == 0 or self.used + size <= self.limit
+
+    async def acquire(self, size: int) -> None:
+        if not self._waiters and self._fits(size):
+            self.used += size
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((size, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the waiter was cancelled
+                self.release(size)
+            else:
+                self._waiters.remove((size, future))
+                self._admit()
+            raise
+
+    def release(self, size: int) -> None:
+        self.resize(size, 0)
+
+    def resize(self, old_size: int, new_size: int) -> None:
+        """Replace a reservation with its actual size"""
+        self.used += new_size - old_size
+        self._admit()
+
+    def _admit(self) -> None:
+        while self._waiters and self._fits(self._waiters[0][0]):
+            size, future = self._waiters.popleft()
+            if not future.done():
+                self.used += size
+                future.set_result(None)
+
+
+# Shared by every OCR pipeline of this worker process
+_ocr_budget = _ByteBudget(OCR_MEMORY_CEILING_BYTES)
+
+
+def _page_image_bytes(page_size_pts: str) -> int:
+    """Estimated grayscale raster size of a page from pdfinfo's 'W x H pts' string"""
+    try:
+        width, _, height = page_size_pts.split()[:3]
+        return int(float(width) / 72 * OCR_PDF_DPI) * int(float(height) / 72 * OCR_PDF_DPI)
+    except (AttributeError, ValueError):
+        # US Letter
+        return int(8.5 * OCR_PDF_DPI) * int(11 * OCR_PDF_DPI)
+
+
+def _raster_windows(page_numbers: List[int], window: int) -> List[Tuple[int, int]]:
+    """Split ascending page numbers into contiguous (first, last) runs of at most `window` pages"""
+    windows = []
+    for page_num in page_numbers:
+        if windows and page_num == windows[-1][1] + 1 and page_num - windows[-1][0] < window:
+            windows[-1] = (windows[-1][0], page_num)
+        else:
+            windows.append((page_num, page_num))
+    return windows
+
+
+def _rasterize_pages(pdf_path: str, first_page: int, last_page: int) -> List[Image.Image]:
+    """Render pages first_page..last_page for OCR (runs in the OCR pool)"""
+    from pdf2image import convert_from_path
+
+    # Tesseract binarizes anyway; grayscale needs a third of the memory of RGB
+    return convert_from_path(pdf_path, dpi=OCR_PDF_DPI, first_page=first_page, last_page=last_page,
+                             grayscale=True)
+
+
+async def _ocr_pdf_pages(content: bytes,
+                         page_numbers: Optional[List[int]] = None) -> AsyncIterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    Rasterize and OCR PDF pages as a bounded pipeline
+
+    Pages are rendered a window at a time and every page image is OCR'd as its
+    own ocr pool job, so tesseract runs on several pages in parallel. Each image
+    is dropped as soon as its OCR finishes, and rendering waits while images in
+    flight, counting those of concurrent requests, would exceed
+    OCR_MEMORY_CEILING_BYTES.
+
+    Args:
+        content: PDF bytes
+        page_numbers: 1-based pages to OCR, ascending (default: all pages)
+
+    Yields (page number, page count, OCR result) in page order.
+    """
+    from pdf2image import pdfinfo_from_path
+
+    loop = asyncio.get_running_loop()
+
+    # pdftoppm reads from a path; write the upload once instead of per window
+    fd, pdf_path = tempfile.mkstemp(suffix='.pdf', prefix='ocr_')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+
+    results: Dict[int, asyncio.Future] = {}
+    tasks: List[asyncio.Future] = []
+    budget = _ocr_budget
+    # Bytes of _ocr_budget each page image still holds; whatever is left is returned on exit
+    held: Dict[int, int] = {}
+    rasterizer = None
+    try:
+        info = await run_in_pool('ocr', pdfinfo_from_path, pdf_path)
+        page_count = int(info["Pages"])
+        if page_numbers is None:
+            page_numbers = list(range(1, page_count + 1))
+        logger.info(f"Processing {len(page_numbers)} of {page_count} pages with OCR...")
+
+        results.update((page_num, loop.create_future()) for page_num in page_numbers)
+        page_bytes = _page_image_bytes(info.get("Page size"))
+
+        async def ocr_page(page_num: int, image: Image.Image) -> None:
+            try:
+                result = await run_in_pool('ocr', _ocr_image, image)
+                # The page may already have failed with its window's rasterization error
+                if not results[page_num].done():
+                    results[page_num].set_result(result)
+                logger.info(f"Processed page {page_num}/{page_count}")
+            except Exception as e:
+                if not results[page_num].done():
+                    results[page_num].set_exception(e)
+            finally:
+                del image
+                budget.release(held.pop(page_num, 0))
+
+        async def rasterize() -> None:
+            nonlocal page_bytes
+            try:
+                for first, last in _raster_windows(page_numbers, OCR_RASTER_WINDOW):
+                    estimate = page_bytes * (last - first + 1)
+                    await budget.acquire(estimate)
+                    try:
+                        images = await run_in_pool('ocr', _rasterize_pages, pdf_path, first, last)
+                    except BaseException:
+                        budget.release(estimate)
+                        raise
+
+                    if len(images) != last - first + 1:
+                        # Which page is missing is unknown, so no image can be trusted to its page
+                        budget.release(estimate)
+                        error = RuntimeError(
+                            f"Rasterizing pages {first}-{last} returned {len(images)} images"
+                        )
+                        logger.warning(str(error))
+                        for page_num in range(first, last + 1):
+                            if not results[page_num].done():
+                                results[page_num].set_exception(error)
+                        del images
+                        continue
+
+                    sizes = [image.width * image.height * len(image.getbands()) for image in images]
+                    page_bytes = max(sizes)
+                    # Swap the estimate for the real size; each page job releases its share
+                    budget.resize(estimate, sum(sizes))
+
+                    for page_num, image, size in zip(range(first, last + 1), images, sizes):
+                        held[page_num] = size
+                        tasks.append(asyncio.ensure_future(ocr_page(page_num, image)))
+                    del images
+            except Exception as e:
+                for future in results.values():
+                    if not future.done():
+                        future.set_exception(e)
+
+        rasterizer = asyncio.ensure_future(rasterize())
+
+        # Assemble in page order whatever order the workers finish in
+        for page_num in page_numbers:
+            yield page_num, page_count, await results[page_num]
+    finally:
+        if rasterizer is not None:
+            rasterizer.cancel()
+        for task in tasks:
+            task.cancel()
+        # Cancelled page jobs may never run their finally; their images are dropped here
+        budget.release(sum(held.values()))
+        held.clear()
+        # Failures of pages nobody waited for (the consumer stopped early)
+        for future in results.values():
+            if future.done() and not future.cancelled():
+                future.exception()
+        os.unlink(pdf_path)
+
+
+async def _merge_pdf_pages(content: bytes, native_texts: Dict[int, str],
+                           ocr_page_numbers: Optional[List[int]]) -> AsyncIterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    OCR the pages that lack a usable text layer and interleave them with the
+    native-text pages, yielding (page number, page count, page) in page order
+    """
+    native_queue = sorted(native_texts)
+    page_count = len(native_texts)
+
+    def native_page(page_num: int) -> Dict[str, Any]:
+        return {"text": native_texts[page_num], "confidence": None, "method": "text"}
+
+    async for page_num, page_count, page in _ocr_pdf_pages(content, ocr_page_numbers):
+        while native_queue and native_queue[0] < page_num:
+            native_num = native_queue.pop(0)
+            yield native_num, page_count, native_page(native_num)
+        yield page_num, page_count, {**page, "method": "ocr"}
+
+    for native_num in native_queue:
+        yield native_num, page_count, native_page(native_num)
+
+
+async def _stream_ocr_pages(pages: AsyncIterator[Tuple[int, int, Dict[str, Any]]],
+                            filename: str) -> AsyncIterator[Dict[str, Any]]:
+    """NDJSON page records for OCR results followed by a summary record"""
+    page_count = 0
+    char_count = 0
+    ocr_page_count = 0
+    confidences = []
+    async for page_num, page_count, page in pages:
+        char_count += len(page["text"])
+        if page["confidence"]:
+            confidences.append(page["confidence"])
+        method = page.get("method", "ocr")
+        if method == "ocr":
+            ocr_page_count += 1
+        record = {
+            "type": "page",
+            "page": page_num,
+            "pageCount": page_count,
+            "text": page["text"],
+            "charCount": len(page["text"]),
+            "method": method
+        }
+        if page["confidence"] is not None:
+            record["confidence"] = round(page["confidence"], 2)
+        if "lines" in page:
+            record["imageSize"] = page["image_size"]
+            record["lines"] = page["lines"]
+        yield record
+
+    summary = {
+        "type": "summary",
+        "success": True,
+        "pageCount": page_count,
+        "language": "en",
+        "filename": filename,
+        "charCount": char_count,
+        "method": "ocr" if ocr_page_count == page_count else "mixed",
+        "ocrPageCount": ocr_page_count
+    }
+    if confidences:
+        summary["confidence"] = round(sum(confidences) / len(confidences), 2)
+    if not char_count:
+        summary["warning"] = "No text detected"
+    yield summary
+
+
+async def _single_page(page: Dict[str, Any]) -> AsyncIterator[Tuple[int, int, Dict[str, Any]]]:
+    yield 1, 1, page
+
+
+async def _single_record(record: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    yield record
+
+
 @app.post("/ocr")
-async def comprehensive_ocr(file: UploadFile = File(...)) -> JSONResponse:
+async def comprehensive_ocr(
+    file: UploadFile = File(...),
+    stream: bool = False,
+    accept: Optional[str] = Header(None)
+):
     """
     Comprehensive OCR endpoint for managed RAG
     Handles both images and scanned PDFs
     Returns structured text with page markers
 
+    With ?stream=true or "Accept: application/x-ndjson" the response is an
+    NDJSON stream: one {"type": "page"} record per page as soon as it has been
+    OCR'd, then a {"type": "summary"} record with the average confidence.
+
     Supports:
         - Images: JPG, JPEG, PNG, GIF, BMP, TIFF
         - Scanned PDFs: Multi-page PDFs converted to images and OCR'd
+        - Mixed PDFs: pages with at least OCR_MIN_PAGE_CHARS characters of
+          native text keep it; only the remaining pages are OCR'd
 
     Returns:
         - text: Extracted text with page markers
         - pageCount: Number of pages processed
         - language: Detected language (default: 'en')
-        - confidence: Average OCR confidence
+        - confidence: Average OCR confidence (OCR'd pages only)
+        - method: 'ocr', or 'mixed' when some pages kept their text layer
+        - ocrPageCount: Number of pages that went through OCR
+        - layout: Per OCR'd page, its imageSize and text lines with pixel bbox
         - success: Processing status
     """
     logger.info(f"Processing file with OCR: {file.filename}")
 
     try:
+        # Read file content
+        content = await file.read()
+        file_ext = Path(file.filename).suffix.lower()
+        streaming = _wants_stream(stream, accept)
+
+        cache_key = extraction_cache.make_key(content, "ocr", {"min_page_chars": OCR_MIN_PAGE_CHARS})
+        cached = None if streaming else _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
+
         # Check if Tesseract is available
         if not _check_tesseract():
             raise HTTPException(
@@ -732,108 +2048,88 @@ async def comprehensive_ocr(file: UploadFile = File(...)) -> JSONResponse:
                 detail="Tesseract OCR is not available. Please install Tesseract-OCR."
             )
 
-        # Read file content
-        content = await file.read()
-        file_ext = Path(file.filename).suffix.lower()
-
         extracted_texts = []
         total_confidence = []
+        layout = []
+        method = "ocr"
 
         # Handle images
         if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif']:
             logger.info(f"Processing image file: {file.filename}")
 
-            # Open image with PIL
-            image = Image.open(io.BytesIO(content))
-
-            # Convert to RGB if necessary
-            if image.mode not in ('RGB', 'L'):
-                image = image.convert('RGB')
-
-            # Resize if too large
-            max_dimension = 3000
-            if max(image.size) > max_dimension:
-                ratio = max_dimension / max(image.size)
-                new_size = tuple(int(dim * ratio) for dim in image.size)
-                image = image.resize(new_size, Image.Resampling.LANCZOS)
-                logger.info(f"Resized image to {new_size}")
-
-            # Perform OCR
-            text = pytesseract.image_to_string(image, lang='eng')
-            extracted_texts.append(text)
-
-            # Get confidence
-            try:
-                ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-                confidences = [conf for conf in ocr_data['conf'] if conf != -1]
-                if confidences:
-                    total_confidence.append(sum(confidences) / len(confidences))
-            except Exception:
-                pass
+            # Perform OCR off the event loop
+            ocr_result = await run_in_pool('ocr', _ocr_image_bytes, content)
+            if streaming:
+                return _ndjson_response(_stream_ocr_pages(_single_page(ocr_result), file.filename), file.filename)
+            extracted_texts.append(ocr_result["text"])
+            if ocr_result["confidence"]:
+                total_confidence.append(ocr_result["confidence"])
+            layout.append({"page": 1, "imageSize": ocr_result["image_size"], "lines": ocr_result["lines"]})
 
             page_count = 1
+            ocr_page_count = 1
 
         # Handle PDFs
         elif file_ext == '.pdf':
             logger.info(f"Processing PDF file: {file.filename}")
 
-            # Try to extract text first (to detect if it's already text-based)
+            # Keep each page's own text layer where it is dense enough, OCR the rest
+            native_texts = {}
+            ocr_page_numbers = None
+            # Replaced by the rasterizer's page count once a page comes through
+            page_count = 0
             try:
-                with pdfplumber.open(io.BytesIO(content)) as pdf:
-                    total_text = ""
-                    for page in pdf.pages:
-                        text = page.extract_text() or ""
-                        total_text += text
-
-                    # If we got substantial text, it's not scanned
-                    avg_chars_per_page = len(total_text) / len(pdf.pages)
-                    if avg_chars_per_page > 100:
-                        logger.info(f"PDF appears to be text-based ({avg_chars_per_page:.0f} chars/page). Not using OCR.")
-                        return JSONResponse(
-                            status_code=200,
-                            content={
-                                "success": False,
-                                "needsOCR": False,
-                                "message": "PDF has extractable text, OCR not needed"
-                            }
+                page_texts = await run_in_pool('parse', _pdf_native_page_texts, content)
+                page_count = len(page_texts)
+                native_texts = {
+                    page_num: page_text
+                    for page_num, page_text in page_texts
+                    if len(page_text.strip()) >= OCR_MIN_PAGE_CHARS
+                }
+                ocr_page_numbers = [page_num for page_num, _ in page_texts if page_num not in native_texts]
+
+                # Every page has a text layer, nothing to OCR
+                if not ocr_page_numbers:
+                    logger.info(f"PDF is text-based ({len(page_texts)} pages with text). Not using OCR.")
+                    not_needed = {
+                        "success": False,
+                        "needsOCR": False,
+                        "message": "PDF has extractable text, OCR not needed"
+                    }
+                    if streaming:
+                        return _ndjson_response(
+                            _single_record({"type": "summary", **not_needed, "filename": file.filename}),
+                            file.filename
                         )
+                    return _cache_response(cache_key, not_needed)
             except Exception:
-                pass
-
-            # If we're here, it's a scanned PDF - convert pages to images and OCR
-            try:
-                from pdf2image import convert_from_bytes
-
-                logger.info("Converting PDF pages to images for OCR...")
-
-                # Convert PDF to images
-                images = convert_from_bytes(content, dpi=300)
-                page_count = len(images)
-
-                logger.info(f"Processing {page_count} pages with OCR...")
-
-                for page_num, image in enumerate(images, start=1):
-                    # Convert to RGB if necessary
-                    if image.mode not in ('RGB', 'L'):
-                        image = image.convert('RGB')
+                # No usable text layer information, OCR every page
+                native_texts = {}
+                ocr_page_numbers = None
+
+            if native_texts:
+                logger.info(
+                    f"Keeping the text layer of {len(native_texts)} page(s), "
+                    f"OCR'ing {len(ocr_page_numbers)} page(s) below {OCR_MIN_PAGE_CHARS} chars"
+                )
+            pages = _merge_pdf_pages(content, native_texts, ocr_page_numbers)
 
-                    # Perform OCR
-                    text = pytesseract.image_to_string(image, lang='eng')
+            if streaming:
+                return _ndjson_response(_stream_ocr_pages(pages, file.filename), file.filename)
 
+            try:
+                async for page_num, page_count, page in pages:
                     # Add page marker
                     page_marker = f"\n\n--- Page {page_num} ---\n\n"
-                    extracted_texts.append(page_marker + text)
-
-                    # Get confidence
-                    try:
-                        ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-                        confidences = [conf for conf in ocr_data['conf'] if conf != -1]
-                        if confidences:
-                            total_confidence.append(sum(confidences) / len(confidences))
-                    except Exception:
-                        pass
+                    extracted_texts.append(page_marker + page["text"])
+                    if page["confidence"]:
+                        total_confidence.append(page["confidence"])
+                    if "lines" in page:
+                        layout.append({"page": page_num, "imageSize": page["image_size"], "lines": page["lines"]})
 
-                    logger.info(f"Processed page {page_num}/{page_count}")
+                if native_texts:
+                    method = "mixed"
+                ocr_page_count = max(page_count - len(native_texts), 0)
 
             except ImportError:
                 raise HTTPException(
@@ -852,16 +2148,13 @@ async def comprehensive_ocr(file: UploadFile = File(...)) -> JSONResponse:
 
         if not combined_text.strip():
             logger.warning(f"No text extracted from {file.filename}")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "text": "",
-                    "success": True,
-                    "pageCount": page_count,
-                    "warning": "No text detected",
-                    "filename": file.filename
-                }
-            )
+            return _cache_response(cache_key, {
+                "text": "",
+                "success": True,
+                "pageCount": page_count,
+                "warning": "No text detected",
+                "filename": file.filename
+            })
 
         # Calculate average confidence
         avg_confidence = sum(total_confidence) / len(total_confidence) if total_confidence else None
@@ -875,14 +2168,18 @@ async def comprehensive_ocr(file: UploadFile = File(...)) -> JSONResponse:
             "language": "en",  # Could be enhanced with language detection
             "filename": file.filename,
             "charCount": len(combined_text),
-            "method": "ocr"
+            "method": method,
+            "ocrPageCount": ocr_page_count,
+            "layout": layout
         }
 
         if avg_confidence is not None:
             result["confidence"] = round(avg_confidence, 2)
 
-        return JSONResponse(status_code=200, content=result)
+        return _cache_response(cache_key, result)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in OCR processing {file.filename}: {str(e)}\n{traceback.format_exc()}")
         raise HTTPException(
@@ -891,6 +2188,16 @@ async def comprehensive_ocr(file: UploadFile = File(...)) -> JSONResponse:
         )
 
 
+class DocumentBlock(BaseModel):
+    """One entry of an extractor's block stream (see document_blocks.py)"""
+    type: str
+    start_offset: int
+    end_offset: int
+    level: Optional[int] = None
+    page: Optional[int] = None
+    slide_number: Optional[int] = None
+
+
 # Pydantic model for chunking request
 class ChunkRequest(BaseModel):
     """Request model for chunking endpoint"""
@@ -898,6 +2205,21 @@ class ChunkRequest(BaseModel):
     file_type: str
     chunk_size: int = 800
     chunk_overlap: int = 100
+    blocks: Optional[List[DocumentBlock]] = None
+
+
+def _chunk_text(text: str, file_type: str, chunk_size: int, chunk_overlap: int,
+                blocks: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, List[Dict]]:
+    """Chunk text with the strategy for file_type, guided by blocks when given (runs in the NLP pool)"""
+    # Get appropriate chunking strategy
+    strategy = get_chunking_strategy(
+        file_type=file_type,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    if blocks is not None:
+        return strategy.__class__.__name__, strategy.chunk_blocks(text, blocks)
+    return strategy.__class__.__name__, strategy.chunk(text)
 
 
 @app.post("/chunk")
@@ -910,12 +2232,17 @@ async def chunk_document(request: ChunkRequest) -> JSONResponse:
     - DOCX: Paragraph-based chunking with list preservation
     - PPTX: Slide-based chunking with bullet point structure
 
+    Passing the block stream from /extract/*?blocks=true along with its text
+    skips heading, list and slide detection: sections, lists and slides are
+    taken from the blocks.
+
     Args:
         request: ChunkRequest containing:
             - text: Full document text to chunk
             - file_type: Document type ('pdf', 'docx', 'pptx')
             - chunk_size: Target chunk size in tokens (default: 800)
             - chunk_overlap: Overlap between chunks in tokens (default: 100)
+            - blocks: Optional block stream whose offsets point into text
 
     Returns:
         - chunks: List of chunk objects with text, offsets, and metadata
@@ -939,16 +2266,25 @@ async def chunk_document(request: ChunkRequest) -> JSONResponse:
                 detail=f"Unsupported file type: {request.file_type}. Supported: pdf, docx, pptx"
             )
 
-        # Get appropriate chunking strategy
-        strategy = get_chunking_strategy(
-            file_type=request.file_type,
-            chunk_size=request.chunk_size,
-            chunk_overlap=request.chunk_overlap
+        blocks = None
+        if request.blocks is not None:
+            blocks = [block.model_dump(exclude_none=True) for block in request.blocks]
+            try:
+                validate_blocks(request.text, blocks)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # Perform chunking off the event loop
+        strategy_name, chunks = await run_in_pool(
+            'nlp',
+            _chunk_text,
+            request.text,
+            request.file_type,
+            request.chunk_size,
+            request.chunk_overlap,
+            blocks
         )
 
-        # Perform chunking
-        chunks = strategy.chunk(request.text)
-
         if not chunks:
             logger.warning(f"No chunks generated for {request.file_type} document")
             return JSONResponse(
@@ -956,20 +2292,20 @@ async def chunk_document(request: ChunkRequest) -> JSONResponse:
                 content={
                     "chunks": [],
                     "total_chunks": 0,
-                    "strategy": strategy.__class__.__name__,
+                    "strategy": strategy_name,
                     "success": True,
                     "warning": "No chunks generated"
                 }
             )
 
-        logger.info(f"Successfully created {len(chunks)} chunks using {strategy.__class__.__name__}")
+        logger.info(f"Successfully created {len(chunks)} chunks using {strategy_name}")
 
         return JSONResponse(
             status_code=200,
             content={
                 "chunks": chunks,
                 "total_chunks": len(chunks),
-                "strategy": strategy.__class__.__name__,
+                "strategy": strategy_name,
                 "file_type": request.file_type,
                 "success": True
             }
@@ -985,6 +2321,304 @@ async def chunk_document(request: ChunkRequest) -> JSONResponse:
         )
 
 
+INGEST_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif')
+
+
+async def _ingest_pdf(content: bytes, ocr: bool) -> Dict[str, Any]:
+    """
+    Block stream of a PDF, OCR'ing pages whose text layer is under
+    OCR_MIN_PAGE_CHARS when Tesseract and poppler are available
+
+    Returns:
+        text, blocks, pages, ocr_pages (page numbers whose text came from OCR),
+        confidence (average over OCR'd pages) and, if OCR was needed but could
+        not run, a warning and ocr_unavailable=True
+    """
+    page_count, page_items = await _extract_pdf_pages(content, blocks=True)
+    page_blocks = dict(page_items)
+    sparse_pages = [
+        page_num for page_num, blocks in page_items
+        if sum(len(text.strip()) for _, text, _ in blocks or ()) < OCR_MIN_PAGE_CHARS
+    ]
+
+    result: Dict[str, Any] = {"pages": page_count, "ocr_pages": []}
+    confidences = []
+    if sparse_pages and ocr:
+        if _check_tesseract() and capabilities.available('poppler'):
+            logger.info(f"OCR'ing {len(sparse_pages)} page(s) below {OCR_MIN_PAGE_CHARS} chars")
+            async for page_num, _, page in _ocr_pdf_pages(content, sparse_pages):
+                # Keep whatever text layer there is if OCR finds nothing better
+                if page["text"].strip():
+                    page_blocks[page_num] = ocr_line_blocks(page["lines"])
+                    result["ocr_pages"].append(page_num)
+                    if page["confidence"]:
+                        confidences.append(page["confidence"])
+        else:
+            result["warning"] = f"{len(sparse_pages)} page(s) have little or no text and OCR is not available"
+            result["ocr_unavailable"] = True
+
+    result["text"], result["blocks"] = _join_page_blocks(sorted(page_blocks.items()))
+    if confidences:
+        result["confidence"] = round(sum(confidences) / len(confidences), 2)
+    return result
+
+
+async def _ingest_image(content: bytes) -> Dict[str, Any]:
+    """Block stream of an image's OCR text, as page 1"""
+    if not _check_tesseract():
+        raise HTTPException(
+            status_code=503,
+            detail="Tesseract OCR is not available. Please install Tesseract-OCR."
+        )
+    ocr_result = await run_in_pool('ocr', _ocr_image_bytes, content)
+    text, blocks = _join_page_blocks([(1, ocr_line_blocks(ocr_result["lines"]))])
+    result = {"text": text, "blocks": blocks, "pages": 1, "ocr_pages": [1] if text else []}
+    if ocr_result["confidence"]:
+        result["confidence"] = round(ocr_result["confidence"], 2)
+    return result
+
+
+@app.post("/ingest")
+async def ingest_document(
+    file: UploadFile = File(...),
+    chunk_size: int = 800,
+    chunk_overlap: int = 100,
+    ocr: bool = True
+) -> JSONResponse:
+    """
+    Extract and chunk an upload in one request
+
+    The file is extracted with its block stream (see /extract/*?blocks=true)
+    and chunked with the strategy for its type, all inside the service, so the
+    document text never travels to the client and back. PDF pages with less
+    than OCR_MIN_PAGE_CHARS characters of text are OCR'd (unless ?ocr=false);
+    images are OCR'd and chunked as a one-page PDF.
+
+    Returns:
+        - chunks: Chunk objects as /chunk returns them; PDF, image and PPTX
+          chunks carry metadata.page_number (first page or slide) and
+          metadata.pages (every page or slide the chunk spans)
+        - total_chunks: Number of chunks created
+        - strategy: Chunking strategy used
+        - file_type: Document type the file was chunked as
+        - pages: Number of pages (PDF, image) or slides (PPTX)
+        - method: 'text', 'ocr' or 'mixed' (pages with and without OCR)
+        - ocr_pages: Pages whose text came from OCR
+        - char_count: Length of the extracted text
+        - success: Processing status
+        - filename: Original filename
+    """
+    file_ext = Path(file.filename).suffix.lower()
+    logger.info(f"Ingesting {file.filename}: chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+
+    try:
+        if file_ext not in ('.pdf', '.docx', '.pptx') + INGEST_IMAGE_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file type: {file_ext}. Supported: .pdf, .docx, .pptx, images"
+            )
+
+        content = await file.read()
+
+        cache_key = extraction_cache.make_key(content, "ingest", {
+            "ext": file_ext,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "ocr": ocr,
+            "min_page_chars": OCR_MIN_PAGE_CHARS
+        })
+        cached = _cached_response(cache_key, file.filename)
+        if cached is not None:
+            return cached
+
+        if file_ext == '.pdf':
+            file_type = 'pdf'
+            extracted = await _ingest_pdf(content, ocr)
+        elif file_ext in INGEST_IMAGE_EXTENSIONS:
+            file_type = 'pdf'
+            extracted = await _ingest_image(content)
+        elif file_ext == '.docx':
+            file_type = 'docx'
+            extracted = await run_in_pool('parse', _extract_docx_text, content, True)
+        else:
+            file_type = 'pptx'
+            extracted = await run_in_pool('parse', _extract_pptx_text, content)
+            extracted["pages"] = extracted["slides"]
+
+        text = extracted["text"]
+        ocr_pages = extracted.get("ocr_pages", [])
+        if not ocr_pages:
+            method = "text"
+        else:
+            method = "ocr" if len(ocr_pages) == extracted["pages"] else "mixed"
+
+        result = {
+            "chunks": [],
+            "total_chunks": 0,
+            "strategy": None,
+            "file_type": file_type,
+            "pages": extracted.get("pages"),
+            "method": method,
+            "ocr_pages": ocr_pages,
+            "char_count": len(text),
+            "success": True,
+            "filename": file.filename
+        }
+        if "confidence" in extracted:
+            result["confidence"] = extracted["confidence"]
+        if "warning" in extracted:
+            result["warning"] = extracted["warning"]
+
+        def respond(content: Dict[str, Any]) -> JSONResponse:
+            # A result missing its OCR pages must not outlive the missing Tesseract/poppler
+            if extracted.get("ocr_unavailable"):
+                return JSONResponse(status_code=200, content=content)
+            return _cache_response(cache_key, content)
+
+        if not text.strip():
+            logger.warning(f"No text extracted from {file.filename}")
+            result["warning"] = result.get("warning", "No text extracted")
+            return respond(result)
+
+        # Chunk off the event loop, guided by the blocks instead of re-detecting structure
+        strategy_name, chunks = await run_in_pool(
+            'nlp', _chunk_text, text, file_type, chunk_size, chunk_overlap, extracted["blocks"]
+        )
+        attribute_pages(chunks, extracted["blocks"])
+
+        logger.info(f"Ingested {file.filename}: {len(text)} characters into {len(chunks)} chunks using {strategy_name}")
+
+        result.update({"chunks": chunks, "total_chunks": len(chunks), "strategy": strategy_name})
+        return respond(result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error ingesting {file.filename}: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to ingest document: {str(e)}"
+        )
+
+
+class EmbedRequest(BaseModel):
+    """Request model for the embedding endpoint"""
+    texts: List[str]
+    normalize: bool = True
+    format: str = "binary"
+
+
+EMBED_FORMATS = ('binary', 'base64', 'json')
+
+
+async def _preload_embedding_model() -> None:
+    try:
+        await run_in_pool('embed', embedding_model.get)
+    except EmbeddingUnavailable:
+        pass
+
+
+@app.post("/embed")
+async def embed_texts(request: EmbedRequest) -> Response:
+    """
+    Embed texts with the local sentence-transformers model (CPU, offline)
+
+    Texts already in the embedding cache (same model, same normalized text)
+    skip the model. The rest are merged with concurrent requests into
+    micro-batches (EMBEDDING_MAX_BATCH texts, at most EMBEDDING_MAX_LATENCY_MS
+    of waiting for company).
+
+    Args:
+        request: EmbedRequest containing:
+            - texts: Texts to embed, in order
+            - normalize: Scale vectors to unit length (default: True)
+            - format: 'binary' (default), 'base64' or 'json'
+
+    Returns:
+        - binary: application/octet-stream of count x dimension little-endian
+          float32 values, row-major, described by the X-Embedding-* headers
+        - base64: JSON with the same bytes base64-encoded in "embeddings"
+        - json: JSON with "embeddings" as lists of floats
+        JSON responses also carry the text keys ("ids", equal to the chunk_id
+        of /chunk chunks), count, dimension, model, cache hits/misses and the
+        batch stats (null when every text was cached).
+    """
+    try:
+        if not request.texts:
+            raise HTTPException(status_code=400, detail="texts cannot be empty")
+        if len(request.texts) > EMBEDDING_MAX_TEXTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many texts: {len(request.texts)}. At most {EMBEDDING_MAX_TEXTS} per request"
+            )
+        if request.format not in EMBED_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format: {request.format}. Supported: {', '.join(EMBED_FORMATS)}"
+            )
+
+        try:
+            vectors, ids, cache = await embed_with_cache(request.texts)
+        except EmbeddingUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        if request.normalize:
+            vectors = normalize_rows(vectors)
+        count, dimension = vectors.shape
+        batch = cache.pop('batch')
+
+        if request.format == 'binary':
+            headers = {
+                "X-Embedding-Count": str(count),
+                "X-Embedding-Dim": str(dimension),
+                "X-Embedding-Dtype": "float32-le",
+                "X-Embedding-Model": embedding_model.name,
+                "X-Cache-Hits": str(cache['hits']),
+                "X-Cache-Misses": str(cache['misses'])
+            }
+            if batch is not None:
+                headers.update({
+                    "X-Batch-Texts": str(batch['texts']),
+                    "X-Batch-Requests": str(batch['requests']),
+                    "X-Batch-Texts-Per-Second": str(batch['texts_per_second'])
+                })
+            return Response(
+                content=vectors.astype('<f4', copy=False).tobytes(),
+                media_type="application/octet-stream",
+                headers=headers
+            )
+
+        if request.format == 'base64':
+            embeddings = base64.b64encode(vectors.astype('<f4', copy=False).tobytes()).decode('ascii')
+        else:
+            embeddings = vectors.tolist()
+
+        return JSONResponse(
+            status_code=200,
+            content={
+                "embeddings": embeddings,
+                "ids": ids,
+                "count": count,
+                "dimension": dimension,
+                "dtype": "float32-le",
+                "model": embedding_model.name,
+                "normalized": request.normalize,
+                "cache": cache,
+                "batch": batch,
+                "success": True
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error embedding {len(request.texts)} texts: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to embed texts: {str(e)}"
+        )
+
+
 if __name__ == "__main__":
     import uvicorn
 
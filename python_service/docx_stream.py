@@ -0,0 +1,230 @@
+"""
+DOCX Stream Parser
+Incremental reader of word/document.xml that yields headings, paragraphs and
+tables in body order without building python-docx's document model
+"""
+
+import io
+import re
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional
+from xml.etree import ElementTree
+
+# Transitional (Word) and Strict OOXML WordprocessingML namespaces
+_WORD_NAMESPACES = (
+    'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'http://purl.oclc.org/ooxml/wordprocessingml/main',
+)
+# Alternate renderings of the same content (e.g. text boxes) would be read twice
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+_HEADING_STYLE = re.compile(r'^heading\s*(\d)$')
+
+
+class _Tags:
+    """Qualified tag and attribute names for one WordprocessingML namespace"""
+
+    def __init__(self, namespace: str):
+        for name in ('body', 'p', 'tbl', 'tr', 'tc', 't', 'tab', 'br', 'cr', 'noBreakHyphen', 'pPr', 'pStyle',
+                     'outlineLvl', 'numPr', 'ilvl', 'tcPr', 'vMerge', 'sdt', 'sdtContent', 'customXml',
+                     'style', 'name'):
+            setattr(self, name, f"{{{namespace}}}{name}")
+        self.val = f"{{{namespace}}}val"
+        self.style_id = f"{{{namespace}}}styleId"
+
+
+def _read_styles(archive: zipfile.ZipFile, tags: _Tags) -> Dict[str, Dict[str, Any]]:
+    """Heading level and list level per paragraph style id, from word/styles.xml"""
+    try:
+        root = ElementTree.fromstring(archive.read('word/styles.xml'))
+    except KeyError:
+        return {}
+
+    styles = {}
+    for style in root.iter(tags.style):
+        name_element = style.find(tags.name)
+        name = (name_element.get(tags.val) if name_element is not None else '') or ''
+        name = name.strip().lower()
+        level = None
+        match = _HEADING_STYLE.match(name)
+        if match:
+            level = int(match.group(1))
+        elif name == 'title':
+            level = 0
+        else:
+            outline = style.find(f"{tags.pPr}/{tags.outlineLvl}")
+            if outline is not None and outline.get(tags.val, '9').isdigit() and int(outline.get(tags.val)) < 9:
+                level = int(outline.get(tags.val)) + 1
+        list_level = None
+        numbering = style.find(f"{tags.pPr}/{tags.numPr}")
+        if numbering is not None:
+            indent = numbering.find(tags.ilvl)
+            list_level = int(indent.get(tags.val, '0')) if indent is not None else 0
+        elif name.startswith('list'):
+            list_level = 0
+        styles[style.get(tags.style_id)] = {'heading_level': level, 'list_level': list_level}
+    return styles
+
+
+def _collect_text(element, tags: _Tags, parts: List[str]) -> None:
+    for child in element:
+        tag = child.tag
+        if tag == tags.t:
+            parts.append(child.text or '')
+        elif tag == tags.tab:
+            parts.append('\t')
+        elif tag in (tags.br, tags.cr):
+            parts.append('\n')
+        elif tag == tags.noBreakHyphen:
+            parts.append('-')
+        elif tag == _MC_FALLBACK:
+            continue
+        else:
+            _collect_text(child, tags, parts)
+            # Paragraphs nested in text boxes end a line of the outer paragraph
+            if tag == tags.p:
+                parts.append('\n')
+
+
+def _paragraph_text(paragraph, tags: _Tags) -> str:
+    parts: List[str] = []
+    _collect_text(paragraph, tags, parts)
+    return ''.join(parts).strip()
+
+
+def _paragraph_block(paragraph, tags: _Tags, styles: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    text = _paragraph_text(paragraph, tags)
+    if not text:
+        return None
+
+    properties = paragraph.find(tags.pPr)
+    style = {}
+    level = None
+    list_level = None
+    if properties is not None:
+        style_element = properties.find(tags.pStyle)
+        if style_element is not None:
+            style = styles.get(style_element.get(tags.val), {})
+        level = style.get('heading_level')
+
+        outline = properties.find(tags.outlineLvl)
+        if outline is not None and outline.get(tags.val, '9').isdigit() and int(outline.get(tags.val)) < 9:
+            level = int(outline.get(tags.val)) + 1
+
+        numbering = properties.find(tags.numPr)
+        if numbering is not None:
+            indent = numbering.find(tags.ilvl)
+            list_level = int(indent.get(tags.val, '0')) if indent is not None else 0
+        else:
+            list_level = style.get('list_level')
+
+    if level is not None:
+        return {"type": "heading", "text": text, "level": level}
+    block = {"type": "paragraph", "text": text}
+    if list_level is not None:
+        block["list_level"] = list_level
+    return block
+
+
+def _content_children(element, tags: _Tags) -> Iterator:
+    """Children of a container, looking through content controls and custom XML wrappers"""
+    for child in element:
+        if child.tag in (tags.sdt, tags.sdtContent, tags.customXml):
+            yield from _content_children(child, tags)
+        else:
+            yield child
+
+
+def _cell_text(cell, tags: _Tags) -> str:
+    lines = []
+    for child in _content_children(cell, tags):
+        if child.tag == tags.p:
+            text = _paragraph_text(child, tags)
+            if text:
+                lines.append(text)
+        elif child.tag == tags.tbl:
+            # Nested tables are flattened into the cell
+            lines.extend(" | ".join(cells) for cells in _table_rows(child, tags) if any(cells))
+    return "\n".join(lines)
+
+
+def _table_rows(table, tags: _Tags) -> List[List[str]]:
+    """
+    Cell text per row, one entry per w:tc
+
+    A cell spanning several grid columns (gridSpan) appears once, and cells
+    continuing a vertical merge (vMerge without 'restart') are empty, so
+    merged text is not repeated the way python-docx's row.cells repeats it.
+    """
+    rows = []
+    for row in _content_children(table, tags):
+        if row.tag != tags.tr:
+            continue
+        cells = []
+        for cell in _content_children(row, tags):
+            if cell.tag != tags.tc:
+                continue
+            merge = cell.find(f"{tags.tcPr}/{tags.vMerge}")
+            if merge is not None and merge.get(tags.val, 'continue') != 'restart':
+                cells.append("")
+            else:
+                cells.append(_cell_text(cell, tags))
+        rows.append(cells)
+    return rows
+
+
+def iter_docx_blocks(content: bytes) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the body of a DOCX as blocks, in document order
+
+    Only the current top-level paragraph or table is held in memory; each is
+    discarded once yielded.
+
+    Yields:
+        {"type": "heading", "text": str, "level": int} (0 = title)
+        {"type": "paragraph", "text": str, "list_level": int (list items only)}
+        {"type": "table", "rows": [[str]]}
+
+    Raises:
+        ValueError: If the file is not a Word document
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        document = archive.open('word/document.xml')
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Not a Word document: {str(e)}")
+
+    with archive, document:
+        tags = None
+        styles: Dict[str, Dict[str, Any]] = {}
+        stack = []
+        block_depth = None
+
+        for event, element in ElementTree.iterparse(document, events=('start', 'end')):
+            if event == 'start':
+                if tags is None:
+                    namespace = element.tag[1:].split('}', 1)[0]
+                    if namespace not in _WORD_NAMESPACES:
+                        raise ValueError(f"Unsupported WordprocessingML namespace: {namespace}")
+                    tags = _Tags(namespace)
+                    styles = _read_styles(archive, tags)
+                stack.append(element)
+                # Top-level blocks sit in w:body, possibly inside content controls
+                if block_depth is None and element.tag in (tags.p, tags.tbl) and any(
+                    parent.tag == tags.body for parent in stack[:-1]
+                ):
+                    block_depth = len(stack)
+                continue
+
+            if block_depth == len(stack):
+                block_depth = None
+                if element.tag == tags.p:
+                    block = _paragraph_block(element, tags, styles)
+                else:
+                    rows = _table_rows(element, tags)
+                    block = {"type": "table", "rows": rows} if any(any(cells) for cells in rows) else None
+                # Drop the parsed block so memory does not grow with the document
+                stack[-2].remove(element)
+                if block is not None:
+                    yield block
+            stack.pop()
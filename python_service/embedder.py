@@ -0,0 +1,384 @@
+"""
+Local Embeddings
+Offline sentence-transformers model behind a dynamic micro-batching queue:
+concurrent /embed requests are merged into one CPU batch, bounded by a batch
+size and a maximum wait, and every batch's throughput is recorded. Texts
+embedded before are served from the embedding cache without the model.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from embedding_cache import embedding_cache_from_env, normalize_text, text_key
+from worker_pools import run_in_pool
+
+# Never reach out to the Hugging Face Hub: the model must already be on disk
+# (EMBEDDING_OFFLINE=0 allows a one-time download into EMBEDDING_MODEL_DIR)
+EMBEDDING_OFFLINE = os.getenv('EMBEDDING_OFFLINE', '1') != '0'
+if EMBEDDING_OFFLINE:
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# Model name (resolved in EMBEDDING_MODEL_DIR / the Hugging Face cache) or a local path
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+EMBEDDING_MODEL_DIR = os.getenv('EMBEDDING_MODEL_DIR') or None
+
+# A batch is encoded once it holds this many texts...
+EMBEDDING_MAX_BATCH = int(os.getenv('EMBEDDING_MAX_BATCH', '64'))
+# ...or once its first request has waited this long for company
+EMBEDDING_MAX_LATENCY_MS = float(os.getenv('EMBEDDING_MAX_LATENCY_MS', '10'))
+# Texts accepted in one /embed request
+EMBEDDING_MAX_TEXTS = int(os.getenv('EMBEDDING_MAX_TEXTS', '2048'))
+# torch intra-op threads used by a batch (0 keeps torch's default)
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', '0'))
+
+# Recent batches kept for /stats/embeddings
+_BATCH_HISTORY = 100
+
+
+class EmbeddingUnavailable(RuntimeError):
+    """The local model cannot be loaded (dependency or weights missing)"""
+
+
+class LocalEmbeddingModel:
+    """
+    The sentence-transformers model of this worker process, loaded on first use
+
+    A failed load is remembered so a missing model is reported once, not on
+    every request.
+    """
+
+    def __init__(self, name: str = EMBEDDING_MODEL, cache_folder: Optional[str] = EMBEDDING_MODEL_DIR):
+        self.name = name
+        self.cache_folder = cache_folder
+        self._model = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {'loaded': False}
+
+    def get(self):
+        """
+        Return the loaded model
+
+        Raises:
+            EmbeddingUnavailable: If sentence-transformers or the model files are missing
+        """
+        if self._model is not None:
+            return self._model
+
+        with self._lock:
+            if self._model is not None:
+                return self._model
+            if self._error is not None:
+                raise EmbeddingUnavailable(self._error)
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                self._error = "sentence-transformers is not installed"
+                raise EmbeddingUnavailable(self._error)
+
+            if EMBEDDING_THREADS > 0:
+                import torch
+                torch.set_num_threads(EMBEDDING_THREADS)
+
+            started = time.perf_counter()
+            try:
+                model = SentenceTransformer(
+                    self.name,
+                    device='cpu',
+                    cache_folder=self.cache_folder,
+                    local_files_only=EMBEDDING_OFFLINE
+                )
+            except Exception as e:
+                self._error = f"Embedding model '{self.name}' could not be loaded: {str(e)}"
+                logger.warning(f"{self._error}. Download it once with EMBEDDING_OFFLINE=0 "
+                               f"or point EMBEDDING_MODEL at a local directory")
+                raise EmbeddingUnavailable(self._error)
+
+            load_seconds = time.perf_counter() - started
+            self._stats = {
+                'loaded': True,
+                'load_seconds': round(load_seconds, 4),
+                'dimension': model.get_sentence_embedding_dimension(),
+                'max_seq_length': model.max_seq_length,
+            }
+            logger.info(f"🧠 Loaded embedding model '{self.name}' in {load_seconds:.2f}s "
+                        f"({self._stats['dimension']} dimensions)")
+            self._model = model
+            return model
+
+    @property
+    def dimension(self) -> int:
+        return self.get().get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts in one forward pass per EMBEDDING_MAX_BATCH texts (blocking)
+
+        Returns:
+            float32 array of shape (len(texts), dimension), not normalized
+        """
+        vectors = self.get().encode(
+            texts,
+            batch_size=EMBEDDING_MAX_BATCH,
+            convert_to_numpy=True,
+            normalize_embeddings=False,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'model': self.name, 'error': self._error, **self._stats}
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale every row to unit length (zero rows stay zero)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+class _PendingRequest:
+    __slots__ = ('texts', 'future', 'enqueued')
+
+    def __init__(self, texts: List[str], future: asyncio.Future):
+        self.texts = texts
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    Merges concurrent embedding requests into CPU batches
+
+    Requests queue up while the previous batch is encoding. A new batch takes
+    queued requests until it holds max_batch texts or max_latency has passed
+    since its first request arrived, then runs as a single model.encode() in
+    the 'embed' worker pool. A request is never split across batches: one that
+    would overflow a started batch waits for the next, and one larger than
+    max_batch forms a batch of its own.
+    """
+
+    def __init__(self, model: LocalEmbeddingModel, max_batch: int = EMBEDDING_MAX_BATCH,
+                 max_latency_ms: float = EMBEDDING_MAX_LATENCY_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Dequeued but held back because it would have overflowed the previous batch
+        self._carried: Optional[_PendingRequest] = None
+        self._lock = threading.Lock()
+        self._batches: Deque[Dict[str, Any]] = deque(maxlen=_BATCH_HISTORY)
+        self._totals = {'batches': 0, 'requests': 0, 'texts': 0, 'encode_seconds': 0.0, 'failed_batches': 0}
+
+    async def start(self) -> None:
+        """Start collecting batches on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Requests still queued will never be batched
+        leftover = [self._carried] if self._carried is not None else []
+        self._carried = None
+        while self._queue is not None and not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        for pending in leftover:
+            if not pending.future.done():
+                pending.future.set_exception(EmbeddingUnavailable("Embedding service is shutting down"))
+
+    async def embed(self, texts: List[str]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Embed texts together with whatever other requests are queued
+
+        Returns:
+            (float32 vectors of shape (len(texts), dimension), stats of the batch they ran in)
+
+        Raises:
+            EmbeddingUnavailable: If the model cannot be loaded
+        """
+        if self._task is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(texts, future))
+        return await future
+
+    async def _collect(self) -> List[_PendingRequest]:
+        """Wait for a first request, then take more until the batch is full or its deadline passes"""
+        if self._carried is not None:
+            batch, self._carried = [self._carried], None
+        else:
+            batch = [await self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = batch[0].enqueued + self.max_latency
+        while size < self.max_batch:
+            if not self._queue.empty():
+                pending = self._queue.get_nowait()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if size + len(pending.texts) > self.max_batch:
+                self._carried = pending
+                break
+            batch.append(pending)
+            size += len(pending.texts)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            texts = [text for pending in batch for text in pending.texts]
+            formed = time.monotonic()
+            try:
+                vectors = await run_in_pool('embed', self.model.encode, texts)
+            except Exception as e:
+                with self._lock:
+                    self._totals['failed_batches'] += 1
+                if not isinstance(e, EmbeddingUnavailable):
+                    logger.error(f"❌ Embedding batch of {len(texts)} texts failed: {str(e)}")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            seconds = time.monotonic() - formed
+            batch_stats = {
+                'requests': len(batch),
+                'texts': len(texts),
+                'characters': sum(len(text) for text in texts),
+                'queue_wait_ms': round(max(formed - pending.enqueued for pending in batch) * 1000, 2),
+                'encode_seconds': round(seconds, 4),
+                'texts_per_second': round(len(texts) / seconds, 1) if seconds > 0 else None,
+            }
+            with self._lock:
+                self._batches.append(batch_stats)
+                self._totals['batches'] += 1
+                self._totals['requests'] += len(batch)
+                self._totals['texts'] += len(texts)
+                self._totals['encode_seconds'] += seconds
+
+            offset = 0
+            for pending in batch:
+                count = len(pending.texts)
+                if not pending.future.done():
+                    pending.future.set_result((vectors[offset:offset + count], batch_stats))
+                offset += count
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals and the most recent batches, with their size and throughput"""
+        with self._lock:
+            totals = dict(self._totals)
+            recent = list(self._batches)
+        encode_seconds = totals.pop('encode_seconds')
+        return {
+            **totals,
+            'encode_seconds': round(encode_seconds, 4),
+            'texts_per_second': round(totals['texts'] / encode_seconds, 1) if encode_seconds > 0 else None,
+            'mean_batch_texts': round(totals['texts'] / totals['batches'], 2) if totals['batches'] else None,
+            'queued': (self._queue.qsize() if self._queue is not None else 0) + (self._carried is not None),
+            'max_batch': self.max_batch,
+            'max_latency_ms': self.max_latency * 1000,
+            'recent_batches': recent,
+        }
+
+
+# One model, one queue and one cache per worker process
+embedding_model = LocalEmbeddingModel()
+embedding_batcher = MicroBatcher(embedding_model)
+embedding_cache = embedding_cache_from_env(EMBEDDING_MODEL)
+
+
+def _lookup(texts: List[str]) -> Tuple[List[str], List[Optional[np.ndarray]], Dict[str, int], List[str]]:
+    """
+    Text keys, cached vectors (None for misses), and the distinct missing keys
+    with the normalized texts the model still has to embed
+    """
+    keys = [text_key(text) for text in texts]
+    cached = embedding_cache.get_many(keys)
+
+    missing: Dict[str, int] = {}
+    missing_texts: List[str] = []
+    for key, text, vector in zip(keys, texts, cached):
+        if vector is None and key not in missing:
+            missing[key] = len(missing_texts)
+            missing_texts.append(normalize_text(text))
+    return keys, cached, missing, missing_texts
+
+
+def _assemble(keys: List[str], cached: List[Optional[np.ndarray]], missing: Dict[str, int],
+              computed: Optional[np.ndarray]) -> np.ndarray:
+    rows = [vector if vector is not None else computed[missing[key]] for key, vector in zip(keys, cached)]
+    return np.vstack(rows).astype(np.float32, copy=False)
+
+
+async def embed_with_cache(texts: List[str]) -> Tuple[np.ndarray, List[str], Dict[str, Any]]:
+    """
+    Embed texts, running the model only for those not in the embedding cache
+
+    Texts are embedded in their normalized form (normalize_text), so every
+    text with the same key maps to the same vector; repeated texts in one
+    request are embedded once.
+
+    Returns:
+        (float32 vectors of shape (len(texts), dimension), text key per text,
+        {"hits": int, "misses": int, "batch": stats of the model batch or None})
+
+    Raises:
+        EmbeddingUnavailable: If texts need the model and it cannot be loaded
+    """
+    keys, cached, missing, missing_texts = _lookup(texts)
+
+    batch = None
+    computed = None
+    if missing_texts:
+        computed, batch = await embedding_batcher.embed(missing_texts)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, embedding_cache.set_many, list(missing), computed)
+
+    hits = sum(vector is not None for vector in cached)
+    return _assemble(keys, cached, missing, computed), keys, {
+        'hits': hits, 'misses': len(texts) - hits, 'batch': batch
+    }
+
+
+def encode_with_cache(texts: List[str]) -> Tuple[np.ndarray, int]:
+    """
+    Blocking embed_with_cache for code already running in a worker (chunkers)
+
+    Misses are encoded directly rather than through the micro-batching queue,
+    which only merges requests arriving on the event loop.
+
+    Returns:
+        (float32 vectors of shape (len(texts), dimension), number of cache hits)
+
+    Raises:
+        EmbeddingUnavailable: If texts need the model and it cannot be loaded
+    """
+    keys, cached, missing, missing_texts = _lookup(texts)
+
+    computed = None
+    if missing_texts:
+        computed = embedding_model.encode(missing_texts)
+        embedding_cache.set_many(list(missing), computed)
+
+    return _assemble(keys, cached, missing, computed), sum(vector is not None for vector in cached)
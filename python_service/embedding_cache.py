@@ -0,0 +1,335 @@
+"""
+Embedding Cache
+Vectors keyed by (model id, normalized text hash) in two tiers: an in-memory
+LRU and a memory-mapped vector file per model that survives restarts
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from loguru import logger
+
+# Locks the vector file against other processes sharing the directory (not available on Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+# Bytes of a raw SHA-256 digest, the on-disk form of a text key
+_DIGEST_BYTES = 32
+# Rows the vector file starts with; it doubles up to its quota as needed
+_INITIAL_ROWS = 1024
+
+
+def normalize_text(text: str) -> str:
+    """Text as it is hashed: NFC, whitespace runs collapsed to one space, trimmed"""
+    return _WHITESPACE_RUN.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def text_key(text: str) -> str:
+    """
+    SHA-256 hex digest of the normalized text
+
+    This is the chunker's chunk_id and, together with the model id, the
+    embedding cache key, so a chunk's vector can be looked up by its id.
+    """
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class VectorFile:
+    """
+    Fixed-width vectors of one model in a memory-mapped file
+
+    <dir>/vectors.f32 holds float32 rows and <dir>/keys.bin the 32-byte text
+    digest of each row; both grow by doubling up to max_rows. Once full, the
+    oldest rows are overwritten first. A row's key is cleared before its vector
+    is rewritten, so an interrupted write never pairs a key with the wrong vector.
+
+    Service worker processes may share the directory: writes happen inside
+    locked(), which picks up the size and write position left by the others,
+    and a row is only returned while its key still matches, since another
+    process may have reused it since it was indexed here.
+    """
+
+    def __init__(self, directory: str, model_id: str, max_bytes: int):
+        self.directory = directory
+        self.model_id = model_id
+        self.max_bytes = max_bytes
+        self.dimension: Optional[int] = None
+        self.max_rows = 0
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._index: Dict[bytes, int] = {}
+        self._rows = 0
+        self._next_row = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._open_existing()
+
+    @property
+    def entries(self) -> int:
+        return len(self._index)
+
+    @property
+    def size_bytes(self) -> int:
+        if self.dimension is None:
+            return 0
+        return self._rows * (self.dimension * 4 + _DIGEST_BYTES)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open_existing(self) -> None:
+        """Re-open the files of an earlier run and rebuild the key index"""
+        meta = self._read_meta()
+        if meta is None:
+            return
+        if meta.get('model') != self.model_id:
+            logger.warning(f"Embedding cache in {self.directory} belongs to {meta.get('model')}; starting over")
+            return
+
+        try:
+            self._map(int(meta['dimension']), int(meta['rows']))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Embedding cache in {self.directory} is unreadable ({str(e)}); starting over")
+            self.dimension, self._vectors, self._keys = None, None, None
+            return
+        self._next_row = int(meta.get('next_row', 0)) % max(self._rows, 1)
+
+        empty = bytes(_DIGEST_BYTES)
+        for row, digest in enumerate(self._keys):
+            digest = digest.tobytes()
+            if digest != empty:
+                self._index[digest] = row
+        if self._index:
+            logger.info(f"💾 Embedding cache: {len(self._index)} vectors of {self.model_id} on disk")
+
+    def _map(self, dimension: int, rows: int) -> None:
+        """(Re)map both files at `rows` rows, extending them with zeros as needed"""
+        self.dimension = dimension
+        self.max_rows = max(1, self.max_bytes // (dimension * 4 + _DIGEST_BYTES))
+        rows = min(rows, self.max_rows)
+        for name, row_bytes in (('vectors.f32', dimension * 4), ('keys.bin', _DIGEST_BYTES)):
+            with open(self._path(name), 'ab') as f:
+                if f.tell() < rows * row_bytes:
+                    f.truncate(rows * row_bytes)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._keys.flush()
+        self._vectors = np.memmap(self._path('vectors.f32'), dtype='<f4', mode='r+', shape=(rows, dimension))
+        self._keys = np.memmap(self._path('keys.bin'), dtype=np.uint8, mode='r+', shape=(rows, _DIGEST_BYTES))
+        self._rows = rows
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path('meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the directory's lock file and catch up with writes by other processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._path('.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _catch_up(self) -> None:
+        """Adopt the size and next row another process recorded (caller holds the lock)"""
+        meta = self._read_meta()
+        if meta is None or meta.get('model') != self.model_id:
+            return
+        try:
+            dimension, rows = int(meta['dimension']), int(meta['rows'])
+        except (ValueError, KeyError):
+            return
+        if self.dimension is not None and dimension != self.dimension:
+            return
+        if rows > self._rows:
+            self._map(dimension, rows)
+        self._next_row = int(meta.get('next_row', 0)) % max(self._rows, 1)
+
+    def _write_meta(self) -> None:
+        meta = {'model': self.model_id, 'dimension': self.dimension, 'rows': self._rows, 'next_row': self._next_row}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path('meta.json'))
+
+    def _holds(self, row: int, digest: bytes) -> bool:
+        return self._keys[row].tobytes() == digest
+
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        row = self._index.get(digest)
+        if row is None:
+            return None
+        vector = np.array(self._vectors[row])
+        # Checked after the copy: a writer clears the key before touching the vector
+        if not self._holds(row, digest):
+            del self._index[digest]
+            return None
+        return vector
+
+    def put(self, digest: bytes, vector: np.ndarray) -> None:
+        """Store a vector (inside locked() when other processes share the directory)"""
+        row = self._index.get(digest)
+        if row is not None and self._holds(row, digest):
+            return
+        if self.dimension is None:
+            self._map(len(vector), _INITIAL_ROWS)
+        elif len(vector) != self.dimension:
+            return
+
+        if len(self._index) >= self._rows and self._rows < self.max_rows:
+            previous_rows = self._rows
+            self._map(self.dimension, self._rows * 2)
+            self._next_row = previous_rows
+
+        row = self._next_row
+        evicted = self._keys[row].tobytes()
+        if self._index.get(evicted) == row:
+            del self._index[evicted]
+        self._keys[row] = 0
+        self._vectors[row] = vector
+        self._keys[row] = np.frombuffer(digest, dtype=np.uint8)
+        self._index[digest] = row
+        self._next_row = (row + 1) % self._rows
+
+    def flush(self) -> None:
+        if self._vectors is None:
+            return
+        self._vectors.flush()
+        self._keys.flush()
+        self._write_meta()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of one model's embeddings, keyed by text_key()
+
+    - Memory tier: LRU bounded by the bytes of its vectors
+    - Disk tier: VectorFile, read through the page cache without loading it
+
+    Vectors are stored as the model returned them (float32, not normalized).
+    """
+
+    def __init__(self, model_id: str, memory_max_bytes: int, disk_dir: Optional[str], disk_max_bytes: int):
+        self.model_id = model_id
+        self.memory_max_bytes = memory_max_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+        self._disk: Optional[VectorFile] = None
+        if disk_dir and disk_max_bytes > 0:
+            directory = os.path.join(disk_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_id))
+            try:
+                self._disk = VectorFile(directory, model_id, disk_max_bytes)
+            except OSError as e:
+                logger.warning(f"Embedding cache: disk tier disabled ({str(e)})")
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector per key, None for misses"""
+        found: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                elif self._disk is not None:
+                    vector = self._disk.get(bytes.fromhex(key))
+                    if vector is not None:
+                        self._stats['disk_hits'] += 1
+                        self._remember(key, vector)
+                if vector is None:
+                    self._stats['misses'] += 1
+                found.append(vector)
+        return found
+
+    def set_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        """Store freshly computed vectors in both tiers"""
+        with self._lock:
+            stored = []
+            for key, vector in zip(keys, vectors):
+                vector = np.array(vector, dtype=np.float32)
+                self._stats['stores'] += 1
+                self._remember(key, vector)
+                stored.append((key, vector))
+            if self._disk is not None:
+                try:
+                    with self._disk.locked():
+                        for key, vector in stored:
+                            self._disk.put(bytes.fromhex(key), vector)
+                        self._disk.flush()
+                except OSError as e:
+                    logger.warning(f"Embedding cache: failed to write vectors: {str(e)}")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the memory tier (caller holds the lock)"""
+        if vector.nbytes > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counts and hit rate per tier, and tier occupancy"""
+        with self._lock:
+            lookups = self._stats['memory_hits'] + self._stats['disk_hits'] + self._stats['misses']
+            # A disk lookup only happens after a memory miss
+            disk_lookups = lookups - self._stats['memory_hits']
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            return {
+                'model': self.model_id,
+                **self._stats,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_hit_rate': round(self._stats['memory_hits'] / lookups, 4) if lookups else 0.0,
+                'disk_hit_rate': round(self._stats['disk_hits'] / disk_lookups, 4) if disk_lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_max_bytes': self.memory_max_bytes,
+                'disk_entries': self._disk.entries if self._disk is not None else 0,
+                'disk_bytes': self._disk.size_bytes if self._disk is not None else 0,
+                'disk_max_bytes': self._disk.max_bytes if self._disk is not None else 0,
+            }
+
+
+def embedding_cache_from_env(model_id: str, memory_mb: int = 64, disk_mb: int = 1024) -> EmbeddingCache:
+    """
+    Build the EmbeddingCache of model_id configured by EMBEDDING_CACHE_MEMORY_MB,
+    EMBEDDING_CACHE_DISK_MB and EMBEDDING_CACHE_DIR
+
+    Setting EMBEDDING_CACHE_DISK_MB=0 keeps the cache in memory only.
+    """
+    default_dir = os.path.join(tempfile.gettempdir(), 'document_service_cache', 'embeddings')
+    return EmbeddingCache(
+        model_id=model_id,
+        memory_max_bytes=int(float(os.getenv('EMBEDDING_CACHE_MEMORY_MB', memory_mb)) * 1024 * 1024),
+        disk_dir=os.getenv('EMBEDDING_CACHE_DIR', default_dir),
+        disk_max_bytes=int(float(os.getenv('EMBEDDING_CACHE_DISK_MB', disk_mb)) * 1024 * 1024)
+    )
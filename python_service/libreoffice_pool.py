@@ -0,0 +1,315 @@
+"""
+LibreOffice Pool
+Long-running headless LibreOffice instances, each with its own user profile,
+that convert office documents to PDF
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from worker_pools import run_in_pool
+
+# The UNO bridge ships with LibreOffice's Python ("python3-uno" on Debian/Ubuntu).
+# Without it every job starts soffice in convert mode, still with an isolated profile.
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
+LIBREOFFICE_WORKERS = max(1, int(os.getenv('LIBREOFFICE_WORKERS', '2')))
+# Seconds a single conversion may take before its instance is killed and restarted
+LIBREOFFICE_TIMEOUT = float(os.getenv('LIBREOFFICE_TIMEOUT', '60'))
+# Conversions per instance before it is restarted, bounding leaks in long-lived soffice
+LIBREOFFICE_MAX_JOBS = int(os.getenv('LIBREOFFICE_MAX_JOBS', '200'))
+LIBREOFFICE_STARTUP_TIMEOUT = 30.0
+LIBREOFFICE_PROFILE_DIR = os.getenv(
+    'LIBREOFFICE_PROFILE_DIR',
+    os.path.join(tempfile.gettempdir(), 'document_service_libreoffice')
+)
+
+PDF_EXPORT_FILTERS = {
+    '.ppt': 'impress_pdf_Export',
+    '.pptx': 'impress_pdf_Export',
+    '.odp': 'impress_pdf_Export',
+    '.doc': 'writer_pdf_Export',
+    '.docx': 'writer_pdf_Export',
+    '.odt': 'writer_pdf_Export',
+    '.xls': 'calc_pdf_Export',
+    '.xlsx': 'calc_pdf_Export',
+    '.ods': 'calc_pdf_Export',
+}
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """Kill soffice and the soffice.bin it forks (started in its own session)"""
+    if os.name != 'nt':
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        return
+    process.kill()
+
+
+def _property(name: str, value: Any):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+class LibreOfficeWorker:
+    """
+    One soffice instance and its private UserInstallation profile
+
+    Concurrent soffice processes sharing a profile lock each other out or
+    corrupt it, so every worker gets its own directory, reused across restarts.
+    """
+
+    def __init__(self, index: int, soffice_path: str, profile_root: str):
+        self.index = index
+        self.soffice_path = soffice_path
+        self.profile_url = Path(os.path.join(profile_root, f"profile_{index}")).absolute().as_uri()
+        self.process: Optional[subprocess.Popen] = None
+        self.bridge = None
+        self.desktop = None
+        self.jobs = 0
+        self.starts = 0
+        # Held for the whole job so a recycled worker's next job waits for the killed one to unwind
+        self._job_lock = threading.Lock()
+
+    def _base_command(self) -> List[str]:
+        return [
+            self.soffice_path,
+            f"-env:UserInstallation={self.profile_url}",
+            '--headless', '--invisible', '--nologo', '--norestore', '--nodefault', '--nolockcheck'
+        ]
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        """Launch a listening soffice and connect to it over UNO (blocking)"""
+        port = _free_port()
+        self.process = subprocess.Popen(
+            self._base_command() + [f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        # Connector + BridgeFactory rather than UnoUrlResolver, to keep the bridge
+        # that stop() disposes to abort a call blocked on a hung instance
+        local_context = uno.getComponentContext()
+        service_manager = local_context.ServiceManager
+        connector = service_manager.createInstanceWithContext("com.sun.star.connection.Connector", local_context)
+        bridge_factory = service_manager.createInstanceWithContext("com.sun.star.bridge.BridgeFactory", local_context)
+        started = time.monotonic()
+        while True:
+            try:
+                connection = connector.connect(f"socket,host=127.0.0.1,port={port}")
+                break
+            except Exception:
+                if not self.alive() or time.monotonic() - started > LIBREOFFICE_STARTUP_TIMEOUT:
+                    self.stop()
+                    raise RuntimeError(f"LibreOffice worker {self.index} failed to start")
+                time.sleep(0.25)
+
+        self.bridge = bridge_factory.createBridge("", "urp", connection, None)
+        context = self.bridge.getInstance("StarOffice.ComponentContext")
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+        self.jobs = 0
+        self.starts += 1
+        logger.info(f"📽️ LibreOffice worker {self.index} ready on port {port} ({time.monotonic() - started:.1f}s)")
+
+    def _ensure_started(self) -> None:
+        if self.alive() and self.desktop is not None and self.jobs < LIBREOFFICE_MAX_JOBS:
+            return
+        self.stop()
+        self.start()
+
+    def warm(self) -> None:
+        """Start the instance ahead of its first job (blocking)"""
+        with self._job_lock:
+            self._ensure_started()
+
+    def convert(self, input_path: str, output_path: str) -> None:
+        """Convert input_path to PDF at output_path (blocking, runs in the convert pool)"""
+        with self._job_lock:
+            if not UNO_AVAILABLE:
+                self._convert_with_cli(input_path, output_path)
+                return
+
+            self._ensure_started()
+
+            filter_name = PDF_EXPORT_FILTERS.get(Path(input_path).suffix.lower(), 'impress_pdf_Export')
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(input_path), "_blank", 0, (_property("Hidden", True),)
+            )
+            try:
+                document.storeToURL(uno.systemPathToFileUrl(output_path), (_property("FilterName", filter_name),))
+            finally:
+                document.close(True)
+            self.jobs += 1
+
+    def _convert_with_cli(self, input_path: str, output_path: str) -> None:
+        """Cold-start soffice in convert mode, still on this worker's own profile"""
+        out_dir = os.path.dirname(output_path)
+        process = self.process = subprocess.Popen(
+            self._base_command() + ['--convert-to', 'pdf', '--outdir', out_dir, input_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+        _, stderr = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"PDF conversion failed: {stderr.strip()}")
+
+        generated = os.path.join(out_dir, Path(input_path).stem + '.pdf')
+        if generated != output_path and os.path.exists(generated):
+            os.replace(generated, output_path)
+        self.jobs += 1
+
+    def stop(self) -> None:
+        """
+        Kill the instance; the next job starts a fresh one (safe from any thread)
+
+        Disposing the bridge makes a UNO call still waiting on it raise at once,
+        so the convert thread running a timed-out job unwinds and frees _job_lock.
+        """
+        process, self.process, self.desktop = self.process, None, None
+        bridge, self.bridge = self.bridge, None
+        if bridge is not None:
+            try:
+                bridge.dispose()
+            except Exception as e:
+                logger.debug(f"LibreOffice worker {self.index}: disposing the UNO bridge failed: {str(e)}")
+        if process is not None and process.poll() is None:
+            _kill(process)
+
+
+class LibreOfficePool:
+    """
+    Queue of LibreOffice workers
+
+    Jobs wait on an asyncio queue for an idle worker instead of blocking the
+    event loop. A job that fails or exceeds the timeout gets its worker killed;
+    the worker restarts on its next job.
+    """
+
+    def __init__(self, soffice_path: str, size: int = LIBREOFFICE_WORKERS, timeout: float = LIBREOFFICE_TIMEOUT):
+        os.makedirs(LIBREOFFICE_PROFILE_DIR, exist_ok=True)
+        self.timeout = timeout
+        self.workers = [LibreOfficeWorker(index, soffice_path, LIBREOFFICE_PROFILE_DIR) for index in range(size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+        self._stats = {'conversions': 0, 'failures': 0, 'timeouts': 0, 'recycled': 0}
+
+    async def warm(self) -> None:
+        """Start every instance ahead of the first conversion"""
+        if not UNO_AVAILABLE:
+            return
+
+        async def warm_worker(worker: LibreOfficeWorker) -> None:
+            try:
+                await run_in_pool('convert', worker.warm)
+            except Exception as e:
+                logger.warning(f"LibreOffice worker {worker.index} warm-up failed: {str(e)}")
+
+        await asyncio.gather(*(warm_worker(worker) for worker in self.workers))
+
+    async def convert(self, filename: str, content: bytes) -> bytes:
+        """Convert an uploaded office document to PDF bytes"""
+        worker = await self._idle.get()
+        try:
+            with tempfile.TemporaryDirectory(prefix='convert_') as temp_dir:
+                # Never use the client's filename as a path, only its extension
+                input_path = os.path.join(temp_dir, 'input' + Path(filename).suffix.lower())
+                output_path = os.path.join(temp_dir, 'output', 'input.pdf')
+                os.makedirs(os.path.dirname(output_path))
+                with open(input_path, 'wb') as f:
+                    f.write(content)
+
+                try:
+                    await asyncio.wait_for(
+                        run_in_pool('convert', worker.convert, input_path, output_path),
+                        timeout=self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._recycle(worker, 'timeouts', f"timed out after {self.timeout:.0f}s")
+                    raise
+                except Exception as e:
+                    self._recycle(worker, 'failures', str(e))
+                    raise
+
+                if not os.path.exists(output_path):
+                    self._stats['failures'] += 1
+                    raise RuntimeError("PDF conversion failed - output file not found")
+
+                with open(output_path, 'rb') as pdf_file:
+                    self._stats['conversions'] += 1
+                    return pdf_file.read()
+        finally:
+            self._idle.put_nowait(worker)
+
+    def _recycle(self, worker: LibreOfficeWorker, counter: str, reason: str) -> None:
+        logger.warning(f"LibreOffice worker {worker.index} {reason}; restarting it")
+        self._stats[counter] += 1
+        self._stats['recycled'] += 1
+        worker.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'mode': 'uno' if UNO_AVAILABLE else 'cli',
+            'workers': len(self.workers),
+            'idle': self._idle.qsize(),
+            'alive': sum(1 for worker in self.workers if worker.alive()),
+            'starts': sum(worker.starts for worker in self.workers),
+        }
+
+    def shutdown(self) -> None:
+        for worker in self.workers:
+            worker.stop()
+
+
+_pool: Optional[LibreOfficePool] = None
+
+
+def get_libreoffice_pool(soffice_path: str) -> LibreOfficePool:
+    """Shared pool for this worker process, created on first use"""
+    global _pool
+    if _pool is None:
+        _pool = LibreOfficePool(soffice_path)
+        logger.info(f"📽️ LibreOffice pool: {len(_pool.workers)} worker(s), {'UNO' if UNO_AVAILABLE else 'CLI'} mode")
+    return _pool
+
+
+def libreoffice_pool_stats() -> Optional[Dict[str, Any]]:
+    return _pool.stats() if _pool is not None else None
+
+
+def shutdown_libreoffice_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -5,12 +5,18 @@ Uses advanced NLP libraries (spaCy, NLTK) for intelligent text segmentation.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Tuple, Callable
+import os
 import re
+import threading
+import time
 import spacy
+from spacy.language import Language
 import nltk
 from loguru import logger
 
+from embedding_cache import text_key
+
 # Download required NLTK data (run once)
 try:
     nltk.data.find('tokenizers/punkt')
@@ -22,6 +28,160 @@ try:
 except LookupError:
     nltk.download('punkt_tab', quiet=True)
 
+DEFAULT_SPACY_MODEL = "en_core_web_sm"
+
+# Token estimate used by every strategy: 1 token ~= 4 characters
+CHARS_PER_TOKEN = 4
+
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+# Sentence segmentation: 'pipe' streams all sections of a document through a
+# trimmed pipeline with nlp.pipe; 'parser' runs the full pipeline per section
+SEGMENTATION_MODE = os.getenv('CHUNKER_SEGMENTATION', 'pipe')
+PIPE_BATCH_SIZE = int(os.getenv('CHUNKER_PIPE_BATCH_SIZE', '64'))
+PIPE_N_PROCESS = int(os.getenv('CHUNKER_PIPE_N_PROCESS', '1'))
+
+# Components that never influence sentence boundaries
+_SEGMENTATION_EXCLUDE = [
+    'tagger', 'morphologizer', 'attribute_ruler', 'lemmatizer', 'trainable_lemmatizer',
+    'ner', 'entity_ruler', 'entity_linker', 'textcat', 'textcat_multilabel', 'spancat',
+]
+
+
+def _trim_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """Shrink (start, end) past surrounding whitespace; None if nothing is left"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux only, None elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _load_sentence_pipeline(name: str) -> Language:
+    """
+    Load `name` with only the components sentence boundaries depend on
+
+    Prefers the lightweight `senter` component shipped (disabled) with the core
+    models; falls back to parser-derived boundaries, then to the rule-based
+    sentencizer.
+    """
+    nlp = spacy.load(name, exclude=_SEGMENTATION_EXCLUDE + ['parser'])
+    if 'senter' in nlp.disabled:
+        nlp.enable_pipe('senter')
+
+    if 'senter' not in nlp.pipe_names:
+        nlp = spacy.load(name, exclude=_SEGMENTATION_EXCLUDE)
+        if 'parser' not in nlp.pipe_names:
+            nlp.add_pipe('sentencizer')
+
+    # A shared tok2vec nobody listens to any more is pure overhead
+    if 'tok2vec' in nlp.pipe_names and not nlp.get_pipe('tok2vec').listening_components:
+        nlp.remove_pipe('tok2vec')
+
+    # Without the parser, long sections no longer need spaCy's 1M character guard
+    nlp.max_length = max(nlp.max_length, 10_000_000)
+    return nlp
+
+
+class NLPModelRegistry:
+    """
+    Process-wide registry of loaded spaCy pipelines
+
+    Each pipeline is loaded at most once per worker process and the same
+    instance is handed to every chunking strategy. Failed loads are remembered
+    too, so a missing model is reported once instead of on every request.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Optional[Language]] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str = DEFAULT_SPACY_MODEL, trimmed: bool = False) -> Optional[Language]:
+        """
+        Return the shared pipeline for `name`, loading it on first use
+
+        Args:
+            name: spaCy model package name
+            trimmed: Load only what sentence segmentation needs (see _load_sentence_pipeline)
+
+        Returns:
+            Loaded Language object, or None if the model is not installed
+        """
+        key = f"{name}[sentences]" if trimmed else name
+        if key in self._models:
+            return self._models[key]
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if key in self._models:
+                return self._models[key]
+
+            rss_before = _current_rss_bytes()
+            started = time.perf_counter()
+            try:
+                nlp = _load_sentence_pipeline(name) if trimmed else spacy.load(name)
+            except OSError:
+                logger.warning(f"spaCy model '{name}' not found. Run: python -m spacy download {name}")
+                nlp = None
+            load_seconds = time.perf_counter() - started
+            rss_after = _current_rss_bytes()
+
+            memory_bytes = None
+            if nlp is not None and rss_before is not None and rss_after is not None:
+                memory_bytes = max(0, rss_after - rss_before)
+
+            self._stats[key] = {
+                'loaded': nlp is not None,
+                'load_seconds': round(load_seconds, 4),
+                'memory_bytes': memory_bytes,
+                'pipeline': list(nlp.pipe_names) if nlp is not None else [],
+            }
+            self._models[key] = nlp
+
+            if nlp is not None:
+                memory_mb = f"{memory_bytes / (1024 * 1024):.1f} MB" if memory_bytes is not None else "unknown"
+                logger.info(f"🧠 Loaded spaCy model '{key}' in {load_seconds:.2f}s (~{memory_mb})")
+
+            return nlp
+
+    def warm(self, names: Iterable[str] = (DEFAULT_SPACY_MODEL,), trimmed: bool = False) -> None:
+        """Load the given models ahead of the first request"""
+        for name in names:
+            self.get(name, trimmed=trimmed)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Load time, approximate memory (RSS delta) and components per model"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# Shared by every strategy instance in this worker process
+nlp_registry = NLPModelRegistry()
+
+
+def get_sentence_pipeline(segmentation: str = SEGMENTATION_MODE) -> Optional[Language]:
+    """
+    Shared pipeline used for sentence boundaries
+
+    Args:
+        segmentation: 'pipe' for the trimmed pipeline streamed through nlp.pipe,
+            'parser' for the full en_core_web_sm pipeline run per section
+
+    Returns:
+        Loaded Language object, or None if the model is not installed
+    """
+    return nlp_registry.get(DEFAULT_SPACY_MODEL, trimmed=segmentation != 'parser')
+
 
 class ChunkingStrategy(ABC):
     """Base abstract class for document-type-specific chunking strategies"""
@@ -52,21 +212,125 @@ class ChunkingStrategy(ABC):
         """
         pass
 
+    def chunk_blocks(self, text: str, blocks: List[Dict], metadata: Optional[Dict] = None) -> List[Dict]:
+        """
+        Chunk text using the block stream its extractor emitted (see document_blocks.py)
+
+        Strategies override this to take structure from the blocks instead of
+        re-detecting it in the text; the default ignores them.
+
+        Args:
+            text: Text the block offsets point into
+            blocks: Typed blocks in document order
+            metadata: Optional metadata about the document
+
+        Returns:
+            List of chunk dictionaries with text, offset, and metadata
+        """
+        return self.chunk(text, metadata)
+
+    def _block_spans(self, text: str, blocks: List[Dict],
+                     types: Tuple[str, ...] = ('heading', 'paragraph', 'list_item', 'table')) -> List[Tuple[int, int, Dict]]:
+        """Whitespace-trimmed (start, end, block) of the content blocks of the given types"""
+        spans = []
+        for block in blocks:
+            if block['type'] in types:
+                span = _trim_span(text, block['start_offset'], block['end_offset'])
+                if span:
+                    spans.append((span[0], span[1], block))
+        return spans
+
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count (rough approximation: 1 token ~= 4 chars)"""
-        return len(text) // 4
+        return len(text) // CHARS_PER_TOKEN
 
-    def _create_chunk(self, text: str, start_offset: int, chunk_index: int, metadata: Optional[Dict] = None) -> Dict:
-        """Create a standardized chunk dictionary"""
+    def _create_chunk(self, text: str, start_offset: int, chunk_index: int, metadata: Optional[Dict] = None,
+                      end_offset: Optional[int] = None) -> Dict:
+        """Create a standardized chunk dictionary; chunk_id is the chunk's embedding cache key"""
         return {
+            'chunk_id': text_key(text),
             'text': text.strip(),
             'start_offset': start_offset,
-            'end_offset': start_offset + len(text),
+            'end_offset': end_offset if end_offset is not None else start_offset + len(text),
             'token_count': self._estimate_tokens(text),
             'chunk_index': chunk_index,
             'metadata': metadata or {}
         }
 
+    def _paragraph_spans(self, text: str, separator: str = '\n\n') -> List[Tuple[int, int]]:
+        """(start, end) spans of the non-empty, whitespace-trimmed paragraphs of text"""
+        spans = []
+        pos = 0
+        while pos <= len(text):
+            end = text.find(separator, pos)
+            if end == -1:
+                end = len(text)
+            span = _trim_span(text, pos, end)
+            if span:
+                spans.append(span)
+            pos = end + len(separator)
+        return spans
+
+    def _overlap_start(self, text: str, chunk_start: int, chunk_end: int) -> int:
+        """
+        Start of the trailing window of text[chunk_start:chunk_end] that holds
+        chunk_overlap tokens, moved forward to a word boundary
+        """
+        if self.chunk_overlap <= 0:
+            return chunk_end
+
+        start = max(chunk_start, chunk_end - self.chunk_overlap * CHARS_PER_TOKEN)
+        if start > chunk_start and not text[start - 1].isspace():
+            # Never open the next chunk in the middle of a word
+            match = _WHITESPACE_RUN.search(text, start, chunk_end)
+            start = match.end() if match else chunk_end
+        return start
+
+    def _pack_spans(self, text: str, spans: List[Tuple[int, int]], reserved_tokens: int = 0,
+                    overlap: bool = True, fresh_start: Optional[Callable[[int], bool]] = None) -> List[Tuple[int, int]]:
+        """
+        Greedily pack consecutive unit spans (sentences, paragraphs) into chunk spans
+
+        Units are contiguous regions of `text`, so a chunk's size is just the width
+        of its span and is checked in O(1) per unit; no text is copied here.
+
+        Args:
+            text: Source text the spans point into
+            spans: Ordered, non-overlapping (start, end) unit spans
+            reserved_tokens: Tokens taken by a prefix added to every chunk (e.g. heading)
+            overlap: Start each new chunk with the last chunk_overlap tokens of the previous one
+            fresh_start: Optional predicate on a unit index; when true the chunk opened
+                by that unit starts without overlap
+
+        Returns:
+            List of (start, end) chunk spans into text
+        """
+        chunk_spans = []
+        chunk_start = None
+        chunk_end = None
+
+        for unit_index, (start, end) in enumerate(spans):
+            if chunk_start is None:
+                chunk_start, chunk_end = start, end
+                continue
+
+            if (end - chunk_start) // CHARS_PER_TOKEN + reserved_tokens > self.chunk_size:
+                chunk_spans.append((chunk_start, chunk_end))
+
+                if overlap and not (fresh_start and fresh_start(unit_index)):
+                    chunk_start = self._overlap_start(text, chunk_start, chunk_end)
+                    if chunk_start >= chunk_end:
+                        chunk_start = start
+                else:
+                    chunk_start = start
+
+            chunk_end = end
+
+        if chunk_start is not None:
+            chunk_spans.append((chunk_start, chunk_end))
+
+        return chunk_spans
+
 
 class PDFChunkingStrategy(ChunkingStrategy):
     """
@@ -77,14 +341,11 @@ class PDFChunkingStrategy(ChunkingStrategy):
     - Handles multi-column layouts
     """
 
-    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100):
+    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100, segmentation: str = SEGMENTATION_MODE):
         super().__init__(chunk_size, chunk_overlap)
-        # Load spaCy model for sentence segmentation
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.warning("spaCy model 'en_core_web_sm' not found. Run: python -m spacy download en_core_web_sm")
-            self.nlp = None
+        self.segmentation = segmentation
+        # Shared spaCy model for sentence segmentation (loaded once per process)
+        self.nlp = get_sentence_pipeline(segmentation)
 
     def chunk(self, text: str, metadata: Optional[Dict] = None) -> List[Dict]:
         """Chunk PDF text with section awareness"""
@@ -94,18 +355,35 @@ class PDFChunkingStrategy(ChunkingStrategy):
         logger.info(f"📄 PDF Chunking: {len(text)} characters")
 
         # Step 1: Detect sections (headings, numbered sections)
-        sections = self._detect_sections(text)
+        return self._chunk_sections(self._detect_sections(text))
+
+    def chunk_blocks(self, text: str, blocks: List[Dict], metadata: Optional[Dict] = None) -> List[Dict]:
+        """Chunk PDF text into sections that start exactly at the extractor's heading blocks"""
+        if not text or not text.strip():
+            return []
+
+        logger.info(f"📄 PDF Chunking: {len(text)} characters, {len(blocks)} blocks")
+        return self._chunk_sections(self._sections_from_blocks(text, blocks))
+
+    def _chunk_sections(self, sections: List[Dict]) -> List[Dict]:
+        """Sentence-aware chunks of each section, numbered across the document"""
+        # Step 2: Segment sentences, batching all sections through nlp.pipe when enabled
+        if self.nlp and self.segmentation == 'pipe':
+            section_sentences = self._pipe_sentence_spans([section['text'] for section in sections])
+        else:
+            section_sentences = [None] * len(sections)
 
-        # Step 2: Chunk each section independently
+        # Step 3: Chunk each section independently
         chunks = []
         chunk_index = 0
 
-        for section in sections:
+        for section, sentence_spans in zip(sections, section_sentences):
             section_chunks = self._chunk_section(
                 section['text'],
                 section['start_offset'],
                 section.get('heading'),
-                chunk_index
+                chunk_index,
+                sentence_spans
             )
             chunks.extend(section_chunks)
             chunk_index += len(section_chunks)
@@ -126,37 +404,41 @@ class PDFChunkingStrategy(ChunkingStrategy):
             r'^\d+\.\d+\s+[A-Z]',     # 1.1 Subsections
         ]
 
-        lines = text.split('\n')
-        current_section = {'text': '', 'start_offset': 0, 'heading': None}
-        current_offset = 0
+        # Sections are slices of the original text, so offsets stay exact
+        section_start = 0
+        heading = None
+        line_start = 0
+        text_length = len(text)
 
-        for line in lines:
-            is_heading = False
+        while line_start <= text_length:
+            line_end = text.find('\n', line_start)
+            if line_end == -1:
+                line_end = text_length
+            line = text[line_start:line_end].strip()
 
             # Check if line matches heading pattern
-            for pattern in heading_patterns:
-                if re.match(pattern, line.strip()):
-                    # Save previous section if it has content
-                    if current_section['text'].strip():
-                        sections.append(current_section)
-
-                    # Start new section
-                    current_section = {
-                        'text': line + '\n',
-                        'start_offset': current_offset,
-                        'heading': line.strip()
-                    }
-                    is_heading = True
-                    break
-
-            if not is_heading:
-                current_section['text'] += line + '\n'
-
-            current_offset += len(line) + 1  # +1 for newline
+            if any(re.match(pattern, line) for pattern in heading_patterns):
+                # Save previous section if it has content
+                if _trim_span(text, section_start, line_start):
+                    sections.append({
+                        'text': text[section_start:line_start],
+                        'start_offset': section_start,
+                        'heading': heading
+                    })
+
+                # Start new section
+                section_start = line_start
+                heading = line
+
+            line_start = line_end + 1
 
         # Add final section
-        if current_section['text'].strip():
-            sections.append(current_section)
+        if _trim_span(text, section_start, text_length):
+            sections.append({
+                'text': text[section_start:],
+                'start_offset': section_start,
+                'heading': heading
+            })
 
         # If no sections detected, treat entire text as one section
         if not sections:
@@ -165,54 +447,100 @@ class PDFChunkingStrategy(ChunkingStrategy):
         logger.debug(f"Detected {len(sections)} sections in PDF")
         return sections
 
-    def _chunk_section(self, text: str, start_offset: int, heading: Optional[str], base_index: int) -> List[Dict]:
+    def _sections_from_blocks(self, text: str, blocks: List[Dict]) -> List[Dict]:
+        """
+        Sections of text split at heading blocks, in the shape _detect_sections returns
+
+        A section ends with its last content block, so page markers between
+        sections do not become chunks or trail the previous section.
+        """
+        sections = []
+        section_start = None
+        section_end = None
+        heading = None
+
+        def close_section():
+            if section_end is not None and _trim_span(text, section_start, section_end):
+                sections.append({
+                    'text': text[section_start:section_end],
+                    'start_offset': section_start,
+                    'heading': heading
+                })
+
+        for block in blocks:
+            if block['type'] in ('page_break', 'slide'):
+                continue
+            if block['type'] == 'heading':
+                close_section()
+                section_start = block['start_offset']
+                heading = ' '.join(text[block['start_offset']:block['end_offset']].split())
+            elif section_start is None:
+                section_start = block['start_offset']
+            section_end = block['end_offset']
+
+        close_section()
+        return sections or [{'text': text, 'start_offset': 0, 'heading': None}]
+
+    def _sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) spans of the sentences in text"""
+        # Use spaCy for sentence segmentation if available
+        if self.nlp:
+            doc = self.nlp(text)
+            spans = (_trim_span(text, sent.start_char, sent.end_char) for sent in doc.sents)
+            return [span for span in spans if span]
+
+        # Fallback to NLTK, locating each sentence in the source text
+        spans = []
+        pos = 0
+        for sentence in nltk.sent_tokenize(text):
+            start = text.find(sentence, pos)
+            if start == -1:
+                continue
+            pos = start + len(sentence)
+            spans.append((start, pos))
+        return spans
+
+    def _pipe_sentence_spans(self, texts: List[str]) -> List[List[Tuple[int, int]]]:
+        """Sentence spans for many texts in one streamed, batched nlp.pipe pass"""
+        docs = self.nlp.pipe(texts, batch_size=PIPE_BATCH_SIZE, n_process=PIPE_N_PROCESS)
+        return [
+            [span for span in (_trim_span(text, sent.start_char, sent.end_char) for sent in doc.sents) if span]
+            for text, doc in zip(texts, docs)
+        ]
+
+    def _chunk_section(self, text: str, start_offset: int, heading: Optional[str], base_index: int,
+                       sentence_spans: Optional[List[Tuple[int, int]]] = None) -> List[Dict]:
         """Chunk a single section with sentence-aware splitting"""
         if not text.strip():
             return []
 
+        if sentence_spans is None:
+            sentence_spans = self._sentence_spans(text)
+        if not sentence_spans:
+            return []
+
+        heading_prefix = heading + '\n\n' if heading else ''
+        chunk_spans = self._pack_spans(
+            text,
+            sentence_spans,
+            reserved_tokens=self._estimate_tokens(heading_prefix)
+        )
+
         chunks = []
+        section_start = sentence_spans[0][0]
+
+        for chunk_start, chunk_end in chunk_spans:
+            chunk_text = text[chunk_start:chunk_end]
+            # The first chunk already opens with the heading line; later ones get it as context
+            if heading_prefix and chunk_start > section_start:
+                chunk_text = heading_prefix + chunk_text
 
-        # Use spaCy for sentence segmentation if available
-        if self.nlp:
-            doc = self.nlp(text)
-            sentences = [sent.text for sent in doc.sents]
-        else:
-            # Fallback to NLTK
-            sentences = nltk.sent_tokenize(text)
-
-        current_chunk = heading + '\n\n' if heading else ''
-        current_offset = start_offset
-        chunk_start_offset = start_offset
-
-        for sentence in sentences:
-            # Check if adding sentence would exceed chunk size
-            potential_chunk = current_chunk + sentence + ' '
-
-            if self._estimate_tokens(potential_chunk) > self.chunk_size and current_chunk.strip():
-                # Save current chunk
-                chunks.append(self._create_chunk(
-                    current_chunk,
-                    chunk_start_offset,
-                    base_index + len(chunks),
-                    {'section_heading': heading}
-                ))
-
-                # Start new chunk with overlap (last sentence + current sentence)
-                overlap_text = sentences[max(0, len(chunks) - 1)] if chunks else ''
-                current_chunk = (heading + '\n\n' if heading else '') + overlap_text + sentence + ' '
-                chunk_start_offset = current_offset - len(overlap_text)
-            else:
-                current_chunk += sentence + ' '
-
-            current_offset += len(sentence) + 1
-
-        # Add final chunk
-        if current_chunk.strip():
             chunks.append(self._create_chunk(
-                current_chunk,
-                chunk_start_offset,
+                chunk_text,
+                start_offset + chunk_start,
                 base_index + len(chunks),
-                {'section_heading': heading}
+                {'section_heading': heading},
+                end_offset=start_offset + chunk_end
             ))
 
         return chunks
@@ -229,11 +557,7 @@ class DOCXChunkingStrategy(ChunkingStrategy):
 
     def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100):
         super().__init__(chunk_size, chunk_overlap)
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.warning("spaCy model not found")
-            self.nlp = None
+        self.nlp = get_sentence_pipeline()
 
     def chunk(self, text: str, metadata: Optional[Dict] = None) -> List[Dict]:
         """Chunk DOCX text with paragraph awareness"""
@@ -242,56 +566,43 @@ class DOCXChunkingStrategy(ChunkingStrategy):
 
         logger.info(f"📝 DOCX Chunking: {len(text)} characters")
 
-        # Split by double newlines (paragraph boundaries in DOCX)
-        paragraphs = text.split('\n\n')
+        # Paragraph boundaries in DOCX are double newlines
+        paragraph_spans = self._paragraph_spans(text)
 
-        chunks = []
-        current_chunk = ''
-        current_offset = 0
-        chunk_start_offset = 0
+        def starts_list(paragraph_index: int) -> bool:
+            # Keep an entire list together instead of opening it with overlap
+            start, end = paragraph_spans[paragraph_index]
+            return self._is_list_item(text[start:end])
 
-        for para in paragraphs:
-            if not para.strip():
-                current_offset += len(para) + 2  # +2 for \n\n
-                continue
+        return self._chunk_paragraphs(text, paragraph_spans, starts_list)
 
-            # Check if paragraph is a list item
-            is_list = self._is_list_item(para)
-
-            # If adding paragraph would exceed chunk size
-            potential_chunk = current_chunk + para + '\n\n'
-
-            if self._estimate_tokens(potential_chunk) > self.chunk_size and current_chunk.strip():
-                # Save current chunk
-                chunks.append(self._create_chunk(
-                    current_chunk,
-                    chunk_start_offset,
-                    len(chunks),
-                    {'source': 'docx'}
-                ))
-
-                # Start new chunk with overlap
-                if is_list:
-                    # Keep entire list together
-                    current_chunk = para + '\n\n'
-                    chunk_start_offset = current_offset
-                else:
-                    # Add overlap from previous paragraph
-                    overlap_paras = paragraphs[max(0, len(chunks) - 1):len(chunks)]
-                    current_chunk = '\n\n'.join(overlap_paras) + '\n\n' + para + '\n\n'
-                    chunk_start_offset = current_offset - sum(len(p) + 2 for p in overlap_paras)
-            else:
-                current_chunk += para + '\n\n'
+    def chunk_blocks(self, text: str, blocks: List[Dict], metadata: Optional[Dict] = None) -> List[Dict]:
+        """Chunk DOCX text by its paragraph, heading, list item and table blocks"""
+        if not text or not text.strip():
+            return []
+
+        logger.info(f"📝 DOCX Chunking: {len(text)} characters, {len(blocks)} blocks")
 
-            current_offset += len(para) + 2
+        block_spans = self._block_spans(text, blocks)
+        return self._chunk_paragraphs(
+            text,
+            [(start, end) for start, end, _ in block_spans],
+            lambda paragraph_index: block_spans[paragraph_index][2]['type'] == 'list_item'
+        )
 
-        # Add final chunk
-        if current_chunk.strip():
+    def _chunk_paragraphs(self, text: str, paragraph_spans: List[Tuple[int, int]],
+                          starts_list: Callable[[int], bool]) -> List[Dict]:
+        """Pack paragraph spans into chunks, starting lists without overlap"""
+        chunk_spans = self._pack_spans(text, paragraph_spans, fresh_start=starts_list)
+
+        chunks = []
+        for chunk_start, chunk_end in chunk_spans:
             chunks.append(self._create_chunk(
-                current_chunk,
-                chunk_start_offset,
+                text[chunk_start:chunk_end],
+                chunk_start,
                 len(chunks),
-                {'source': 'docx'}
+                {'source': 'docx'},
+                end_offset=chunk_end
             ))
 
         logger.info(f"✅ Created {len(chunks)} DOCX chunks")
@@ -328,8 +639,18 @@ class PPTXChunkingStrategy(ChunkingStrategy):
         logger.info(f"📊 PPTX Chunking: {len(text)} characters")
 
         # Detect slide boundaries (usually separated by "--- Slide X ---")
-        slides = self._detect_slides(text)
+        return self._chunk_slides(self._detect_slides(text))
+
+    def chunk_blocks(self, text: str, blocks: List[Dict], metadata: Optional[Dict] = None) -> List[Dict]:
+        """Chunk PPTX text by the extractor's slide blocks, grouping its list item blocks as bullets"""
+        if not text or not text.strip():
+            return []
 
+        logger.info(f"📊 PPTX Chunking: {len(text)} characters, {len(blocks)} blocks")
+        return self._chunk_slides(self._slides_from_blocks(text, blocks))
+
+    def _chunk_slides(self, slides: List[Dict]) -> List[Dict]:
+        """Chunk each slide in turn"""
         chunks = []
         for slide_idx, slide in enumerate(slides):
             # Each slide becomes one or more chunks
@@ -350,40 +671,65 @@ class PPTXChunkingStrategy(ChunkingStrategy):
 
         # Try to find slide separators
         for pattern in slide_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                # Split by this pattern
-                parts = re.split(pattern, text, flags=re.IGNORECASE)
-                slides = []
-                offset = 0
-
-                for i, part in enumerate(parts):
-                    if part.strip():
-                        slides.append({
-                            'text': part.strip(),
-                            'slide_number': i,
-                            'start_offset': offset
-                        })
-                    offset += len(part)
-
-                return slides
+            separators = [match.span() for match in re.finditer(pattern, text, re.IGNORECASE)]
+            if separators:
+                # Text before the first separator is slide 0
+                return self._slides_between(text, separators, first_number=0)
 
         # If no slide separators found, split by large gaps or treat as single slide
-        paragraphs = text.split('\n\n\n')  # Triple newline might indicate slide break
-        if len(paragraphs) > 1:
-            slides = []
-            offset = 0
-            for i, para in enumerate(paragraphs):
-                if para.strip():
-                    slides.append({
-                        'text': para.strip(),
-                        'slide_number': i + 1,
-                        'start_offset': offset
-                    })
-                offset += len(para) + 3
-            return slides
+        separators = [match.span() for match in re.finditer('\n\n\n', text)]  # Triple newline might indicate slide break
+        if separators:
+            return self._slides_between(text, separators, first_number=1)
 
         # Fallback: treat entire text as one slide
-        return [{'text': text, 'slide_number': 1, 'start_offset': 0}]
+        span = _trim_span(text, 0, len(text)) or (0, len(text))
+        return [{'text': text[span[0]:span[1]], 'slide_number': 1, 'start_offset': span[0]}]
+
+    def _slides_between(self, text: str, separators: List[Tuple[int, int]], first_number: int) -> List[Dict]:
+        """
+        Slides in the regions before, between and after separator spans, numbered
+        by region and trimmed so text[start_offset:start_offset + len(text)] is the slide
+        """
+        bounds = [0] + [position for span in separators for position in span] + [len(text)]
+        slides = []
+        for region in range(len(bounds) // 2):
+            span = _trim_span(text, bounds[2 * region], bounds[2 * region + 1])
+            if span:
+                slides.append({
+                    'text': text[span[0]:span[1]],
+                    'slide_number': first_number + region,
+                    'start_offset': span[0]
+                })
+        return slides
+
+    def _slides_from_blocks(self, text: str, blocks: List[Dict]) -> List[Dict]:
+        """
+        Slides spanning from the end of each slide block to the next one, with
+        their list item blocks as bullet spans relative to the slide
+        """
+        markers = [block for block in blocks if block['type'] == 'slide']
+        if not markers:
+            return [{'text': text, 'slide_number': 1, 'start_offset': 0}]
+
+        slides = []
+        for index, marker in enumerate(markers):
+            region_end = markers[index + 1]['start_offset'] if index + 1 < len(markers) else len(text)
+            span = _trim_span(text, marker['end_offset'], region_end)
+            if not span:
+                continue
+            start, end = span
+            bullet_spans = [
+                (block['start_offset'] - start, block['end_offset'] - start)
+                for block in blocks
+                if block['type'] == 'list_item' and start <= block['start_offset'] and block['end_offset'] <= end
+            ]
+            slides.append({
+                'text': text[start:end],
+                'slide_number': marker.get('slide_number', index + 1),
+                'start_offset': start,
+                'bullet_spans': bullet_spans
+            })
+        return slides
 
     def _chunk_slide(self, slide: Dict, slide_idx: int) -> List[Dict]:
         """Chunk a single slide (if it's too large)"""
@@ -399,90 +745,73 @@ class PPTXChunkingStrategy(ChunkingStrategy):
             )]
 
         # Slide is too large, split by bullet points or paragraphs
-        bullets = self._extract_bullets(text)
+        bullet_spans = slide.get('bullet_spans')
+        if bullet_spans is None:
+            bullet_spans = self._extract_bullets(text)
 
-        if bullets:
+        if bullet_spans:
             # Chunk by grouping bullet points
-            return self._chunk_bullets(bullets, slide['start_offset'], slide_idx, slide.get('slide_number'))
+            return self._chunk_bullets(text, bullet_spans, slide['start_offset'], slide_idx, slide.get('slide_number'))
         else:
             # Fallback to paragraph-based chunking
             return self._chunk_by_paragraphs(text, slide['start_offset'], slide_idx, slide.get('slide_number'))
 
-    def _extract_bullets(self, text: str) -> List[str]:
-        """Extract bullet points from slide text"""
-        lines = text.split('\n')
-        bullets = []
+    def _extract_bullets(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) spans of the bullet point lines in slide text"""
+        bullet_spans = []
 
         bullet_pattern = r'^\s*[\-\*\•]\s+'
 
-        for line in lines:
-            if re.match(bullet_pattern, line):
-                bullets.append(line.strip())
+        line_start = 0
+        while line_start <= len(text):
+            line_end = text.find('\n', line_start)
+            if line_end == -1:
+                line_end = len(text)
+            if re.match(bullet_pattern, text[line_start:line_end]):
+                span = _trim_span(text, line_start, line_end)
+                if span:
+                    bullet_spans.append(span)
+            line_start = line_end + 1
+
+        return bullet_spans
+
+    def _chunk_bullets(self, text: str, bullet_spans: List[Tuple[int, int]], start_offset: int,
+                       slide_idx: int, slide_number: int) -> List[Dict]:
+        """
+        Group bullets into chunks
 
-        return bullets
+        Each bullet unit runs up to the next bullet, so text between bullets
+        (sub-lines, the slide title before the first bullet) stays in its chunk
+        and every chunk is a contiguous slice of the slide.
+        """
+        bounds = sorted({0, *(start for start, _ in bullet_spans)}) + [len(text)]
+        units = [span for span in (_trim_span(text, start, end) for start, end in zip(bounds, bounds[1:])) if span]
+        chunk_spans = self._pack_spans(text, units, overlap=False)
 
-    def _chunk_bullets(self, bullets: List[str], start_offset: int, slide_idx: int, slide_number: int) -> List[Dict]:
-        """Group bullets into chunks"""
         chunks = []
-        current_chunk = ''
-        chunk_start = start_offset
-
-        for bullet in bullets:
-            potential = current_chunk + bullet + '\n'
-
-            if self._estimate_tokens(potential) > self.chunk_size and current_chunk:
-                chunks.append(self._create_chunk(
-                    current_chunk,
-                    chunk_start,
-                    slide_idx * 100 + len(chunks),  # Unique index
-                    {'slide_number': slide_number}
-                ))
-                current_chunk = bullet + '\n'
-                chunk_start = start_offset + len(current_chunk)
-            else:
-                current_chunk = potential
-
-        if current_chunk.strip():
+        for chunk_start, chunk_end in chunk_spans:
             chunks.append(self._create_chunk(
-                current_chunk,
-                chunk_start,
-                slide_idx * 100 + len(chunks),
-                {'slide_number': slide_number}
+                text[chunk_start:chunk_end],
+                start_offset + chunk_start,
+                slide_idx * 100 + len(chunks),  # Unique index
+                {'slide_number': slide_number},
+                end_offset=start_offset + chunk_end
             ))
 
         return chunks
 
     def _chunk_by_paragraphs(self, text: str, start_offset: int, slide_idx: int, slide_number: int) -> List[Dict]:
         """Fallback: chunk by paragraphs"""
-        paragraphs = text.split('\n\n')
-        chunks = []
-        current_chunk = ''
-        chunk_start = start_offset
-
-        for para in paragraphs:
-            if not para.strip():
-                continue
+        chunk_spans = self._pack_spans(text, self._paragraph_spans(text), overlap=False)
 
-            potential = current_chunk + para + '\n\n'
-
-            if self._estimate_tokens(potential) > self.chunk_size and current_chunk:
-                chunks.append(self._create_chunk(
-                    current_chunk,
-                    chunk_start,
-                    slide_idx * 100 + len(chunks),
-                    {'slide_number': slide_number}
-                ))
-                current_chunk = para + '\n\n'
-                chunk_start = start_offset + len(current_chunk)
-            else:
-                current_chunk = potential
-
-        if current_chunk.strip():
+        chunks = []
+        for chunk_start, chunk_end in chunk_spans:
             chunks.append(self._create_chunk(
-                current_chunk,
-                chunk_start,
+                text[chunk_start:chunk_end],
+                start_offset + chunk_start,
                 slide_idx * 100 + len(chunks),
-                {'slide_number': slide_number}
+                {'slide_number': slide_number},
+                end_offset=start_offset + chunk_end
             ))
 
         return chunks
@@ -546,3 +875,16 @@ if __name__ == "__main__":
         print(f"  Text: {chunk['text'][:100]}...")
         print(f"  Tokens: {chunk['token_count']}")
         print(f"  Metadata: {chunk['metadata']}\n")
+
+    # PPTX chunks are slices of the source text: their offsets must point at exactly their text
+    sample_pptx = "\n".join(
+        f"--- Slide {number} ---\nSlide {number} title\n- First point follows here.\n- Second point.\n"
+        for number in range(1, 6)
+    )
+    for size in (200, 5):
+        pptx_chunks = get_chunking_strategy('pptx', chunk_size=size, chunk_overlap=0).chunk(sample_pptx)
+        mismatched = [
+            chunk['chunk_index'] for chunk in pptx_chunks
+            if sample_pptx[chunk['start_offset']:chunk['end_offset']] != chunk['text']
+        ]
+        print(f"PPTX chunk_size={size}: {len(pptx_chunks)} chunks, offset mismatches: {mismatched or 'none'}")
@@ -0,0 +1,190 @@
+"""
+OCR Backends
+Interchangeable Tesseract engines behind one word-level recognition API
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from PIL import Image
+from loguru import logger
+import pytesseract
+
+# Columns of Tesseract's TSV output (image_to_data / GetTSVText)
+TSV_COLUMNS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+               'left', 'top', 'width', 'height', 'conf', 'text')
+
+
+def parse_tsv(tsv: str, has_header: bool = True) -> Dict[str, List[Any]]:
+    """Parse Tesseract TSV into the column dict returned by pytesseract's Output.DICT"""
+    data: Dict[str, List[Any]] = {column: [] for column in TSV_COLUMNS}
+    rows = tsv.splitlines()[1 if has_header else 0:]
+    for row in rows:
+        cells = row.split('\t')
+        if len(cells) < len(TSV_COLUMNS) - 1:
+            continue
+        # The text cell is missing entirely on rows without a word
+        if len(cells) == len(TSV_COLUMNS) - 1:
+            cells.append('')
+        for column, cell in zip(TSV_COLUMNS, cells):
+            if column == 'text':
+                data[column].append(cell)
+            else:
+                data[column].append(int(float(cell)))
+    return data
+
+
+class OCRBackend(ABC):
+    """Word-level recognition of one image"""
+
+    name = "base"
+
+    @abstractmethod
+    def available(self) -> bool:
+        pass
+
+    @abstractmethod
+    def version(self) -> Optional[str]:
+        """Tesseract version string, or None if it cannot be determined"""
+        pass
+
+    @abstractmethod
+    def languages(self) -> List[str]:
+        """Installed traineddata languages"""
+        pass
+
+    @abstractmethod
+    def image_to_data(self, image: Image.Image, lang: str = 'eng') -> Dict[str, List[Any]]:
+        """Recognize an image and return Tesseract's TSV rows as column lists"""
+        pass
+
+
+class PytesseractBackend(OCRBackend):
+    """Spawns the tesseract CLI for every image (reloads traineddata each call)"""
+
+    name = "pytesseract"
+
+    def available(self) -> bool:
+        try:
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception:
+            return False
+
+    def version(self) -> Optional[str]:
+        try:
+            return str(pytesseract.get_tesseract_version())
+        except Exception:
+            return None
+
+    def languages(self) -> List[str]:
+        try:
+            return sorted(pytesseract.get_languages(config=''))
+        except Exception:
+            return []
+
+    def image_to_data(self, image: Image.Image, lang: str = 'eng') -> Dict[str, List[Any]]:
+        return pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+
+class TesserocrBackend(OCRBackend):
+    """
+    In-process libtesseract through tesserocr
+
+    Each worker thread initializes its own engine once per language and reuses
+    it for every image, so there is no process start or model load per page.
+    tesserocr releases the GIL while recognizing, so OCR pool threads run in parallel.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._local = threading.local()
+
+    def available(self) -> bool:
+        try:
+            return 'eng' in self.languages()
+        except Exception:
+            return False
+
+    def version(self) -> Optional[str]:
+        try:
+            return self._tesserocr.tesseract_version().split()[1]
+        except Exception:
+            return None
+
+    def languages(self) -> List[str]:
+        try:
+            _, languages = self._tesserocr.get_languages()
+            return sorted(languages)
+        except Exception:
+            return []
+
+    def _engine(self, lang: str):
+        engines = getattr(self._local, 'engines', None)
+        if engines is None:
+            engines = self._local.engines = {}
+        engine = engines.get(lang)
+        if engine is None:
+            engine = self._tesserocr.PyTessBaseAPI(lang=lang)
+            engines[lang] = engine
+            logger.info(f"🔤 Initialized tesserocr engine ({lang}) in {threading.current_thread().name}")
+        return engine
+
+    def image_to_data(self, image: Image.Image, lang: str = 'eng') -> Dict[str, List[Any]]:
+        engine = self._engine(lang)
+        engine.SetImage(image)
+        engine.Recognize()
+        # Same rows as the CLI's TSV renderer, minus its header line
+        return parse_tsv(engine.GetTSVText(0), has_header=False)
+
+
+_BACKENDS = {
+    'pytesseract': PytesseractBackend,
+    'tesserocr': TesserocrBackend,
+}
+
+_backend: Optional[OCRBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_ocr_backend(name: str) -> OCRBackend:
+    """
+    Build the named backend
+
+    'auto' picks tesserocr when it is installed and has English data,
+    otherwise pytesseract.
+    """
+    if name == 'auto':
+        try:
+            backend = TesserocrBackend()
+            if backend.available():
+                return backend
+        except ImportError:
+            pass
+        return PytesseractBackend()
+
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{name}'. Use one of: auto, {', '.join(_BACKENDS)}")
+    return _BACKENDS[name]()
+
+
+def get_ocr_backend() -> OCRBackend:
+    """Process-wide backend selected by OCR_BACKEND (auto|tesserocr|pytesseract)"""
+    global _backend
+    if _backend is not None:
+        return _backend
+
+    with _backend_lock:
+        if _backend is None:
+            name = os.getenv('OCR_BACKEND', 'auto').lower()
+            try:
+                _backend = create_ocr_backend(name)
+            except (ImportError, ValueError) as e:
+                logger.warning(f"OCR backend '{name}' unavailable ({str(e)}), falling back to pytesseract")
+                _backend = PytesseractBackend()
+            logger.info(f"🔤 OCR backend: {_backend.name}")
+        return _backend
@@ -0,0 +1,220 @@
+"""
+Result Cache
+Content-addressed two-tier cache (in-memory LRU + on-disk) for processing results
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from loguru import logger
+
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest of raw upload bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache keyed by upload content
+
+    - Memory tier: LRU bounded by the encoded size of its entries
+    - Disk tier: one file per entry, evicted least-recently-used once the
+      directory grows past its byte quota
+
+    Values are JSON-serializable objects (codec='json') or raw bytes (codec='bytes').
+    """
+
+    def __init__(self, name: str, memory_max_bytes: int, disk_dir: Optional[str], disk_max_bytes: int,
+                 codec: str = 'json'):
+        self.name = name
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_dir = disk_dir if disk_dir and disk_max_bytes > 0 else None
+        self.disk_max_bytes = disk_max_bytes
+        self.codec = codec
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, size)
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def make_key(self, content: bytes, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Key for an upload processed by `endpoint` with `params`"""
+        params_part = json.dumps(params or {}, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f"{endpoint}|{content_hash(content)}|{params_part}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return entry[0]
+
+        data = self._read_disk(key)
+        if data is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        value = self._decode(data)
+        with self._lock:
+            self._stats['disk_hits'] += 1
+            self._remember(key, value, len(data))
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value in both tiers"""
+        data = self._encode(value)
+        with self._lock:
+            self._stats['stores'] += 1
+            self._remember(key, value, len(data))
+        self._write_disk(key, data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier occupancy"""
+        with self._lock:
+            lookups = self._stats['memory_hits'] + self._stats['disk_hits'] + self._stats['misses']
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            return {
+                **self._stats,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_max_bytes': self.memory_max_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'disk_max_bytes': self.disk_max_bytes if self.disk_dir else 0,
+            }
+
+    # ---- memory tier
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        """Insert into the memory tier (caller holds the lock)"""
+        if size > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[1]
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    # ---- disk tier
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _load_disk_index(self) -> None:
+        """Rebuild the LRU index from files left by earlier runs, oldest first"""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for filename in files:
+                if filename.endswith('.tmp'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, filename, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+        if entries:
+            logger.info(f"💾 {self.name} cache: {len(entries)} entries ({self._disk_bytes} bytes) on disk")
+        self._evict_disk()
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # mtime doubles as the access time when the index is rebuilt
+            os.utime(path, (time.time(), time.time()))
+            return data
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.disk_dir or len(data) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"{self.name} cache: failed to write entry {key[:12]}: {str(e)}")
+            return
+
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Drop least-recently-used files until under quota (caller holds the lock)"""
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._stats['evictions'] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    # ---- encoding
+
+    def _encode(self, value: Any) -> bytes:
+        if self.codec == 'bytes':
+            return value
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    def _decode(self, data: bytes) -> Any:
+        if self.codec == 'bytes':
+            return data
+        return json.loads(data)
+
+
+def cache_from_env(name: str, prefix: str, memory_mb: int, disk_mb: int, codec: str = 'json') -> ResultCache:
+    """
+    Build a ResultCache configured by <PREFIX>_MEMORY_MB, <PREFIX>_DISK_MB and <PREFIX>_DIR
+
+    Setting <PREFIX>_DISK_MB=0 keeps the cache in memory only.
+    """
+    default_dir = os.path.join(tempfile.gettempdir(), 'document_service_cache', name)
+    return ResultCache(
+        name=name,
+        memory_max_bytes=int(float(os.getenv(f"{prefix}_MEMORY_MB", memory_mb)) * 1024 * 1024),
+        disk_dir=os.getenv(f"{prefix}_DIR", default_dir),
+        disk_max_bytes=int(float(os.getenv(f"{prefix}_DISK_MB", disk_mb)) * 1024 * 1024),
+        codec=codec
+    )
@@ -1,13 +1,36 @@
 """
 Table Extraction Module - Task B
-Uses pdfplumber to extract tables from PDF documents and convert to Markdown format
+Uses pdfplumber to extract tables from PDF documents and convert to Markdown format,
+with optional cell-grid, column and CSV representations
 """
 
 import pdfplumber
+import csv
 import io
-from typing import List, Dict
+import os
+import re
+from typing import Any, List, Dict, Iterable, Optional, Set, Union
 from loguru import logger
 
+# Structured representations that can be requested next to table_markdown
+TABLE_FORMATS = ('grid', 'columns', 'csv')
+
+# Same token estimate as the chunker: 1 token ~= 4 characters
+CHARS_PER_TOKEN = 4
+
+_NUMBER = re.compile(r'^[-+]?(\d{1,3}(,\d{3})+|\d+)?(\.\d+)?$')
+
+# Skip full table detection on pages that cannot hold a ruled table (TABLE_PREFILTER=false
+# restores the exhaustive scan)
+TABLE_PREFILTER = os.getenv('TABLE_PREFILTER', 'true').lower() not in ('0', 'false', 'no')
+
+# Path-construction operators that produce the lines, rectangles and curves
+# pdfplumber turns into table edges (rectangle, line-to, three curve forms).
+# Any PDF delimiter may end the token, as in '0 0 10 10 re/GS0 gs' or '10 0 l[1 2]0 d'
+_PATH_OPERATORS = re.compile(rb'(?<![^\s/\[\]<>(){}%])(?:re|l|c|v|y)(?=[\s/\[\]<>(){}%]|$)')
+# Nesting limit when following Form XObjects that draw on the page
+_MAX_FORM_DEPTH = 8
+
 
 def table_to_markdown(table: List[List[str]]) -> str:
     """
@@ -24,9 +47,7 @@ def table_to_markdown(table: List[List[str]]) -> str:
 
     # Clean and format cells
     def clean_cell(cell):
-        if cell is None:
-            return ""
-        return str(cell).strip().replace('\n', ' ').replace('|', '\\|')
+        return normalize_cell(cell).replace('|', '\\|')
 
     markdown_lines = []
 
@@ -50,12 +71,328 @@ def table_to_markdown(table: List[List[str]]) -> str:
     return "\n".join(markdown_lines)
 
 
-def extract_tables_from_pdf(pdf_content: bytes) -> List[Dict]:
+def normalize_cell(cell: Optional[str]) -> str:
+    """Cell text on one line, with empty and merged-away cells as ''"""
+    if cell is None:
+        return ""
+    return str(cell).strip().replace('\n', ' ')
+
+
+def parse_number(value: str) -> Optional[Union[int, float]]:
+    """
+    Numeric value of a cell such as '1,234', '-3.5', '$12.00', '45%' or
+    '(1,200)' (accounting negative), or None if it is not a number
+    """
+    text = value.strip().replace(' ', '')
+    negative = text.startswith('(') and text.endswith(')')
+    if negative:
+        text = text[1:-1]
+    text = text.lstrip('$€£¥').rstrip('%')
+    if not text or not _NUMBER.match(text) or text in ('+', '-', '.'):
+        return None
+
+    text = text.replace(',', '')
+    number = float(text) if '.' in text else int(text)
+    return -number if negative else number
+
+
+def detect_header(rows: List[List[str]]) -> bool:
+    """
+    Whether the first row of a normalized table is a header: at least half
+    of its cells filled and none numeric, with labels that are distinct or
+    that sit above numbers
+    """
+    if len(rows) < 2:
+        return False
+    labels = [cell for cell in rows[0] if cell]
+    if len(labels) * 2 < len(rows[0]) or any(parse_number(label) is not None for label in labels):
+        return False
+    if len(set(labels)) == len(labels):
+        return True
+    # Repeated labels (e.g. spanning headers) still head numeric data
+    return any(parse_number(cell) is not None for row in rows[1:] for cell in row if cell)
+
+
+def _column_names(header: Optional[List[str]], width: int) -> List[str]:
+    """Unique column keys: header labels, or column_<n> for unlabelled columns"""
+    names = []
+    seen: Dict[str, int] = {}
+    for index in range(width):
+        name = (header[index] if header and index < len(header) else "") or f"column_{index + 1}"
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
+
+
+def table_columns(header: Optional[List[str]], body: List[List[str]]) -> Dict[str, List[Any]]:
+    """
+    Column-oriented arrays keyed by column name
+
+    A column whose filled cells are all numbers is returned as numbers, with
+    None for empty cells; any other column keeps its cell text.
+    """
+    width = max([len(header or [])] + [len(row) for row in body])
+    columns = {}
+    for index, name in enumerate(_column_names(header, width)):
+        values = [row[index] if index < len(row) else "" for row in body]
+        numbers = [parse_number(value) if value else None for value in values]
+        if any(value for value in values) and all(
+            number is not None or not value for number, value in zip(numbers, values)
+        ):
+            columns[name] = numbers
+        else:
+            columns[name] = values
+    return columns
+
+
+def table_to_csv(rows: List[List[str]]) -> str:
+    """RFC 4180 CSV of a normalized table (quotes and delimiters kept intact)"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def split_table_rows(rows: List[List[str]], has_header: bool, max_tokens: int) -> List[Dict[str, Any]]:
+    """
+    Split a table into row groups whose Markdown fits max_tokens, repeating
+    the header row at the top of every group
+
+    A row too large for the budget on its own still gets a group of its own.
+
+    Returns:
+        Dicts with row_start/row_end (0-based, end exclusive, counting the
+        header as row 0), table_markdown and token_count
+    """
+    header = rows[:1] if has_header else []
+    first_body_row = len(header)
+    header_tokens = _estimate_tokens(table_to_markdown(header)) if header else 0
+
+    groups = []
+    start = first_body_row
+    group_tokens = header_tokens
+    for index in range(first_body_row, len(rows)):
+        row_tokens = _estimate_tokens(table_to_markdown([rows[index]]).split('\n')[0]) + 1
+        if index > start and group_tokens + row_tokens > max_tokens:
+            groups.append((start, index))
+            start = index
+            group_tokens = header_tokens
+        group_tokens += row_tokens
+    if start < len(rows):
+        groups.append((start, len(rows)))
+
+    row_groups = []
+    for row_start, row_end in groups:
+        markdown = table_to_markdown(header + rows[row_start:row_end])
+        row_groups.append({
+            "row_start": row_start,
+            "row_end": row_end,
+            "table_markdown": markdown,
+            "token_count": _estimate_tokens(markdown)
+        })
+    return row_groups
+
+
+def structure_table(table: List[List[Optional[str]]], formats: Iterable[str] = (),
+                    max_group_tokens: int = 0) -> Dict[str, Any]:
+    """
+    Structured representations of one extracted table
+
+    Args:
+        table: Rows as returned by pdfplumber (None for empty or merged cells)
+        formats: Any of TABLE_FORMATS
+        max_group_tokens: Also split the table into row groups of at most
+            this many tokens (0 = no row groups)
+
+    Returns:
+        has_header plus one key per requested format: grid (row-major cell
+        text), columns (see table_columns) and csv; row_groups if requested
+    """
+    width = max(len(row) for row in table)
+    # Rectangular grid of plain strings; pdfplumber can return ragged rows
+    rows = [[normalize_cell(cell) for cell in row] + [""] * (width - len(row)) for row in table]
+    has_header = detect_header(rows)
+
+    structured: Dict[str, Any] = {"has_header": has_header}
+    if 'grid' in formats:
+        structured["grid"] = {"rows": len(rows), "columns": width, "cells": rows}
+    if 'columns' in formats:
+        structured["columns"] = table_columns(rows[0] if has_header else None, rows[1:] if has_header else rows)
+    if 'csv' in formats:
+        structured["csv"] = table_to_csv(rows)
+    if max_group_tokens > 0:
+        structured["row_groups"] = split_table_rows(rows, has_header, max_group_tokens)
+    return structured
+
+
+def _draws_paths(stream_data: bytes) -> bool:
+    return _PATH_OPERATORS.search(stream_data) is not None
+
+
+def _resources_draw_paths(resources, depth: int, seen: Set[int]) -> bool:
+    """Whether any Form XObject in a resource dict (or nested in one) draws paths"""
+    from pdfminer.pdftypes import resolve1
+
+    xobjects = resolve1((resolve1(resources) or {}).get('XObject')) or {}
+    for ref in xobjects.values():
+        object_id = getattr(ref, 'objid', None)
+        if object_id is not None:
+            if object_id in seen:
+                continue
+            seen.add(object_id)
+
+        xobject = resolve1(ref)
+        if getattr(xobject.get('Subtype'), 'name', None) != 'Form':
+            continue
+        # Too deeply nested to follow cheaply: let full detection decide
+        if depth >= _MAX_FORM_DEPTH:
+            return True
+        if _draws_paths(xobject.get_data()) or _resources_draw_paths(xobject.get('Resources'), depth + 1, seen):
+            return True
+    return False
+
+
+def page_may_contain_table(page) -> bool:
+    """
+    Cheap test of whether a pdfplumber page could hold a table
+
+    pdfplumber's default 'lines' strategy builds tables only from ruling
+    lines, rectangles and curves, so a page whose content streams (and the
+    Form XObjects they draw) contain no path operators cannot yield one.
+    This reads the raw streams without pdfplumber's layout analysis, which
+    is what makes extract_tables() expensive. It may let through pages with
+    decorative rules or text containing operator-like words, never the reverse.
+    """
+    from pdfminer.pdftypes import resolve1
+
+    page_obj = page.page_obj
+    try:
+        for stream in page_obj.contents:
+            if _draws_paths(resolve1(stream).get_data()):
+                return True
+        return _resources_draw_paths(page_obj.resources, 0, set())
+    except Exception as e:
+        # Unusual stream structure: fall back to full detection for this page
+        logger.debug(f"Table prefilter could not read page {page.page_number}: {str(e)}")
+        return True
+
+
+def _has_ruling_grid(page) -> bool:
+    """
+    At least two horizontal and two vertical edges, the minimum for one cell
+
+    Edges are counted before pdfplumber snaps and joins them, so dashed
+    rules made of many short segments still count.
+    """
+    horizontal = vertical = 0
+    for edge in page.edges:
+        if edge['orientation'] == 'h':
+            horizontal += 1
+        elif edge['orientation'] == 'v':
+            vertical += 1
+        if horizontal >= 2 and vertical >= 2:
+            return True
+    return False
+
+
+def find_table_candidate_pages(pdf) -> List[int]:
+    """
+    Page numbers (1-based) of an open pdfplumber PDF that may hold a table
+
+    Returns every page when TABLE_PREFILTER is off.
+    """
+    if not TABLE_PREFILTER:
+        return [page.page_number for page in pdf.pages]
+    return [page.page_number for page in pdf.pages if page_may_contain_table(page)]
+
+
+def extract_tables_from_page(page, formats: Iterable[str] = (), max_group_tokens: int = 0) -> List[Dict]:
+    """
+    Extract tables from a single pdfplumber page and convert to Markdown
+
+    Args:
+        page: pdfplumber Page object
+        formats: Structured representations to add (see structure_table)
+        max_group_tokens: Split tables into row groups of at most this many tokens
+
+    Returns:
+        List of dicts with page, table_index and table_markdown keys, plus
+        has_header and the requested representations when any are requested
+    """
+    page_num = page.page_number
+    page_tables = []
+
+    # Rule fragments (underlines, borders) without a grid cannot form a table
+    if TABLE_PREFILTER and not _has_ruling_grid(page):
+        return page_tables
+
+    # Extract tables from page
+    tables = page.extract_tables()
+
+    if not tables:
+        return page_tables
+
+    logger.info(f"Found {len(tables)} table(s) on page {page_num}")
+
+    for table_index, table in enumerate(tables, 1):
+        if not table or len(table) == 0:
+            continue
+
+        # Convert table to Markdown
+        markdown_table = table_to_markdown(table)
+
+        if markdown_table:
+            table_record = {
+                "page": page_num,
+                "table_index": table_index,
+                "table_markdown": markdown_table
+            }
+            if formats or max_group_tokens > 0:
+                table_record.update(structure_table(table, formats, max_group_tokens))
+            page_tables.append(table_record)
+
+            logger.debug(f"Extracted table {table_index} from page {page_num}: {len(markdown_table)} chars")
+
+    return page_tables
+
+
+def extract_tables_from_pages(pdf_path: str, page_numbers: List[int], formats: Iterable[str] = (),
+                              max_group_tokens: int = 0) -> List[Dict]:
+    """
+    Extract tables from selected pages of a PDF file (runs in a pool worker)
+
+    Args:
+        pdf_path: Path to PDF file
+        page_numbers: 1-based page numbers, typically from find_table_candidate_pages
+        formats, max_group_tokens: As for extract_tables_from_page
+
+    Returns:
+        List of extracted tables in Markdown format, in page order
+    """
+    extracted_tables = []
+    # Only the requested pages are loaded
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            extracted_tables.extend(extract_tables_from_page(page, formats, max_group_tokens))
+            page.close()
+    return extracted_tables
+
+
+def extract_tables_from_pdf(pdf_content: bytes, page_numbers: Optional[List[int]] = None,
+                            formats: Iterable[str] = (), max_group_tokens: int = 0) -> List[Dict]:
     """
     Extract tables from PDF and convert to Markdown
 
     Args:
         pdf_content: PDF file content as bytes
+        page_numbers: 1-based pages to scan; by default the pages passing the
+            table prefilter
+        formats: Structured representations to add: any of TABLE_FORMATS
+        max_group_tokens: Split tables into row groups of at most this many
+            tokens, header repeated in each (0 = no row groups)
 
     Returns:
         List of dicts with format:
@@ -63,7 +400,13 @@ def extract_tables_from_pdf(pdf_content: bytes) -> List[Dict]:
             {
                 "page": int,
                 "table_index": int,
-                "table_markdown": str
+                "table_markdown": str,
+                # only with formats / max_group_tokens:
+                "has_header": bool,
+                "grid": {"rows": int, "columns": int, "cells": [[str]]},
+                "columns": {name: [str | number | None]},
+                "csv": str,
+                "row_groups": [{"row_start", "row_end", "table_markdown", "token_count"}]
             },
             ...
         ]
@@ -74,30 +417,14 @@ def extract_tables_from_pdf(pdf_content: bytes) -> List[Dict]:
 
     try:
         with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                # Extract tables from page
-                tables = page.extract_tables()
-
-                if not tables:
-                    continue
-
-                logger.info(f"Found {len(tables)} table(s) on page {page_num}")
-
-                for table_index, table in enumerate(tables, 1):
-                    if not table or len(table) == 0:
-                        continue
-
-                    # Convert table to Markdown
-                    markdown_table = table_to_markdown(table)
-
-                    if markdown_table:
-                        extracted_tables.append({
-                            "page": page_num,
-                            "table_index": table_index,
-                            "table_markdown": markdown_table
-                        })
-
-                        logger.debug(f"Extracted table {table_index} from page {page_num}: {len(markdown_table)} chars")
+            if page_numbers is None:
+                page_numbers = find_table_candidate_pages(pdf)
+                logger.info(f"Table candidates: {len(page_numbers)} of {len(pdf.pages)} pages")
+
+            for page_number in page_numbers:
+                page = pdf.pages[page_number - 1]
+                extracted_tables.extend(extract_tables_from_page(page, formats, max_group_tokens))
+                page.close()
 
         logger.info(f"Total tables extracted: {len(extracted_tables)}")
         return extracted_tables
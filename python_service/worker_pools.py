@@ -0,0 +1,215 @@
+"""
+Worker Pools
+Bounded thread/process executors that keep blocking document work off the event loop
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Tuple
+from loguru import logger
+
+_CPU_COUNT = os.cpu_count() or 2
+# Read here as well as in libreoffice_pool, which imports this module
+_LIBREOFFICE_WORKERS = max(1, int(os.getenv('LIBREOFFICE_WORKERS', '2')))
+
+# Work classes and their defaults: (executor kind, max workers)
+# - parse:   pdfplumber / python-docx / python-pptx layout analysis (CPU-bound)
+# - ocr:     tesseract and rasterization (mostly spent in subprocesses)
+# - nlp:     spaCy segmentation and chunking
+# - convert: LibreOffice conversions (blocking subprocesses); twice the instances, so a
+#            timed-out job still unwinding never starves the restarted instance's next one
+# - pdf_pages: page ranges of large PDFs extracted in parallel
+# - embed:   micro-batches of the local embedding model (torch uses its own threads)
+# Override with POOL_<CLASS>_KIND=thread|process and POOL_<CLASS>_WORKERS=<n>
+POOL_DEFAULTS: Dict[str, Tuple[str, int]] = {
+    'parse': ('thread', min(4, _CPU_COUNT)),
+    'ocr': ('thread', _CPU_COUNT),
+    'nlp': ('thread', 2),
+    'convert': ('thread', 2 * _LIBREOFFICE_WORKERS),
+    'pdf_pages': ('process', _CPU_COUNT),
+    'embed': ('thread', 1),
+}
+
+
+_END_OF_STREAM = object()
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float, float]:
+    """Run fn in the worker and report when it started and finished (monotonic clock)"""
+    started = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, started, time.monotonic()
+
+
+class WorkerPool:
+    """An executor for one work class, with queue depth and wait-time accounting"""
+
+    def __init__(self, name: str, kind: str, max_workers: int):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor = self._create_executor()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    def _create_executor(self) -> Executor:
+        if self.kind == 'process':
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker")
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in this pool and await its result
+
+        For process pools fn, its arguments and its result must be picklable.
+        """
+        submitted = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+
+        try:
+            future = self._executor.submit(_timed_call, fn, args, kwargs)
+            result, started, finished = await asyncio.wrap_future(future)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+                self._failed += 1
+            raise
+
+        wait = max(0.0, started - submitted)
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._total_run += finished - started
+
+        if wait > 1.0:
+            logger.warning(f"⏳ {self.name} pool job waited {wait:.2f}s for a worker")
+        return result
+
+    async def iterate(self, gen_fn: Callable[..., Iterator], *args, max_buffered: int = 4,
+                      **kwargs) -> AsyncIterator[Any]:
+        """
+        Run a blocking generator in this pool and yield its items as they are produced
+
+        At most max_buffered items wait for the consumer; the producer blocks
+        beyond that, and stops early if the consumer goes away. Generators cannot
+        cross process boundaries, so process pools run them on a loop thread.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+        stopped = threading.Event()
+
+        def put(item: Any) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce() -> None:
+            items = gen_fn(*args, **kwargs)
+            try:
+                for item in items:
+                    put(item)
+                    if stopped.is_set():
+                        return
+            finally:
+                items.close()
+                if not stopped.is_set():
+                    put(_END_OF_STREAM)
+
+        if self.kind == 'thread':
+            producer = asyncio.ensure_future(self.run(produce))
+        else:
+            producer = loop.run_in_executor(None, produce)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                yield item
+            # Surface any exception raised by the generator
+            await producer
+        finally:
+            stopped.set()
+            # Unblock a producer waiting on a full queue so its worker is released
+            while not queue.empty():
+                queue.get_nowait()
+            # Errors after the consumer left have nobody to report to
+            producer.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight jobs and wait/run times for this pool"""
+        with self._lock:
+            completed = self._completed
+            return {
+                'kind': self.kind,
+                'max_workers': self.max_workers,
+                'in_flight': self._in_flight,
+                # Executors run jobs FIFO, so anything beyond the worker count is queued
+                'queue_depth': max(0, self._in_flight - self.max_workers),
+                'submitted': self._submitted,
+                'completed': completed,
+                'failed': self._failed,
+                'avg_wait_seconds': round(self._total_wait / completed, 4) if completed else 0.0,
+                'max_wait_seconds': round(self._max_wait, 4),
+                'avg_run_seconds': round(self._total_run / completed, 4) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_config(name: str) -> Tuple[str, int]:
+    default_kind, default_workers = POOL_DEFAULTS[name]
+    kind = os.getenv(f"POOL_{name.upper()}_KIND", default_kind).lower()
+    if kind not in ('thread', 'process'):
+        logger.warning(f"Unknown POOL_{name.upper()}_KIND '{kind}', using '{default_kind}'")
+        kind = default_kind
+    workers = max(1, int(os.getenv(f"POOL_{name.upper()}_WORKERS", default_workers)))
+    return kind, workers
+
+
+_pools: Dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str) -> WorkerPool:
+    """Return the shared pool for a work class, creating it on first use"""
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        if name not in _pools:
+            kind, workers = _pool_config(name)
+            _pools[name] = WorkerPool(name, kind, workers)
+            logger.info(f"🧵 Started {name} pool: {workers} {kind} worker(s)")
+        return _pools[name]
+
+
+async def run_in_pool(name: str, fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking callable in the pool for work class `name`"""
+    return await get_pool(name).run(fn, *args, **kwargs)
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every pool started so far"""
+    return {name: pool.stats() for name, pool in list(_pools.items())}
+
+
+def shutdown_pools() -> None:
+    """Stop all pools (called when the service shuts down)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()